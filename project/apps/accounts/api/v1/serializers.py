@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+
+from rest_framework import exceptions
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.tokens import add_user_claims
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """ Tokens with user flags read by `ClaimsJWTAuthentication`
+    """
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """ Access token gets current flags of user, 
+    tokens of deleted and inactive users are not refreshed
+    """
+    default_error_messages = {
+        'no_active_account': TokenObtainPairSerializer.default_error_messages['no_active_account']
+    }
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        user = get_user_model().objects.filter(**{
+            jwt_settings.USER_ID_FIELD: refresh.get(jwt_settings.USER_ID_CLAIM)
+        }).first()
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+        add_user_claims(refresh, user)
+
+        access = refresh.access_token
+        # Copied from refresh token otherwise, revocation compares it
+        access.set_iat()
+        data = {'access': str(access)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Blacklist app is not installed
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
@@ -1,11 +1,8 @@
 from django.urls import path, include
 
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from .views import ClaimsTokenObtainPairView, ClaimsTokenRefreshView
 
 urlpatterns = [
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/', ClaimsTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', ClaimsTokenRefreshView.as_view(), name='token_refresh'),
 ]
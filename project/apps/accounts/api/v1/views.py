@@ -0,0 +1,15 @@
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from .serializers import ClaimsTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
+
+
+class ClaimsTokenObtainPairView(TokenObtainPairView):
+    """ Get access and refresh tokens
+    """
+    serializer_class = ClaimsTokenObtainPairSerializer
+
+
+class ClaimsTokenRefreshView(TokenRefreshView):
+    """ Get access token with current user flags
+    """
+    serializer_class = ClaimsTokenRefreshSerializer
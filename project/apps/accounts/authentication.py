@@ -0,0 +1,27 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.accounts.tokens import USER_CLAIMS, is_token_revoked
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """ Authenticate by user flags in access token without a database query.
+    `request.user` is a `TokenUser` (`TOKEN_USER_CLASS`) with `id`,
+    `is_staff` and `is_superuser`.
+
+    Tokens issued before flags were added are authenticated
+    by `JWTAuthentication` with a query of user.
+    """
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        if not validated_token['is_active'] or is_token_revoked(validated_token):
+            raise AuthenticationFailed(_('Token is revoked'), code='token_revoked')
+
+        return jwt_settings.TOKEN_USER_CLASS(validated_token)
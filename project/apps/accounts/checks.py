@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from apps.utils.cache import is_shared_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_token_denylist_cache(app_configs, **kwargs):
+    """ Tokens revoked by one process should be rejected by others
+    """
+    alias = settings.TOKEN_DENYLIST['ALIAS']
+    if not is_shared_cache(alias):
+        backend = settings.CACHES[alias]['BACKEND']
+        return [Warning(
+            f'Revoked tokens are stored in {backend} which is not shared between processes.',
+            hint='Set TOKEN_DENYLIST_ALIAS to a Redis or Memcached cache.',
+            id='accounts.W001',
+        )]
+    return []
@@ -0,0 +1,20 @@
+""" OpenAPI extensions of drf-spectacular for classes of `apps.accounts`,
+same as for Simple JWT classes they extend
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    target_class = 'apps.accounts.authentication.ClaimsJWTAuthentication'
+
+
+class ClaimsTokenObtainPairSerializerExtension(TokenObtainPairSerializerExtension):
+    target_class = 'apps.accounts.api.v1.serializers.ClaimsTokenObtainPairSerializer'
+
+
+class ClaimsTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = 'apps.accounts.api.v1.serializers.ClaimsTokenRefreshSerializer'
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import CustomUser
+from apps.accounts.tokens import USER_CLAIMS, revoke_user_tokens
+
+
+@receiver(pre_save, sender=CustomUser)
+def revoke_tokens_on_flags_change(sender, instance, update_fields=None, **kwargs):
+    # Tokens carry flags of user, see `tokens.py`
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(USER_CLAIMS):
+        return
+
+    stored = CustomUser.objects.filter(pk=instance.pk).values(*USER_CLAIMS).first()
+    if stored is not None and any(stored[claim] != getattr(instance, claim) for claim in USER_CLAIMS):
+        transaction.on_commit(lambda: revoke_user_tokens(instance.pk))
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user_tokens(user_id))
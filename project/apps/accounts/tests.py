@@ -1,3 +1,123 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIRequestFactory, APITransactionTestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.accounts.authentication import ClaimsJWTAuthentication
+from apps.accounts.checks import check_token_denylist_cache
+from apps.accounts.models import CustomUser
+from apps.surveys.tests.base import clear_caches
+
+
+class ClaimsAuthenticationTestCase(APITransactionTestCase):
+    """ Tokens are revoked on commit, so transactions are not rolled back
+    """
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@mail.com', 'pass')
+
+    def obtain(self) -> dict:
+        """ Tokens issued a few seconds ago, `iat` is in whole seconds
+        """
+        with mock.patch(
+            'rest_framework_simplejwt.tokens.aware_utcnow',
+            return_value=aware_utcnow() - timedelta(seconds=5)
+        ):
+            response = self.client.post(
+                reverse('token_obtain_pair'), {'username': 'admin', 'password': 'pass'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def refresh(self, refresh: str):
+        return self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+
+    def authenticate(self, access: str):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def save_in_past(self, user, **kwargs):
+        """ Change user between obtained tokens and now, so tokens
+        refreshed right after the change are not rejected
+        """
+        with mock.patch('apps.accounts.tokens.time.time', return_value=time.time() - 2):
+            if kwargs.pop('delete', False):
+                user.delete()
+            else:
+                for field, value in kwargs.items():
+                    setattr(user, field, value)
+                user.save()
+
+    def test_claims(self):
+        token = AccessToken(self.obtain()['access'])
+        self.assertEqual(
+            (token['is_active'], token['is_staff'], token['is_superuser']),
+            (True, True, True)
+        )
+
+    def test_authenticate_without_query(self):
+        access = self.obtain()['access']
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(access)
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual(user.id, self.admin.pk)
+        self.assertTrue(user.is_staff)
+
+        response = self.client.get(reverse('all_surveys'), HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_token_without_claims(self):
+        # Issued before claims were added
+        user, _ = self.authenticate(str(AccessToken.for_user(self.admin)))
+        self.assertEqual(user, self.admin)
+
+    def test_flags_change(self):
+        tokens = self.obtain()
+        self.save_in_past(self.admin, is_staff=False, is_superuser=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(tokens['access'])
+
+        response = self.refresh(tokens['refresh'])
+        self.assertEqual(response.status_code, 200, response.data)
+        user, _ = self.authenticate(response.data['access'])
+        self.assertFalse(user.is_staff)
+        response = self.client.get(
+            reverse('all_surveys'), HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_other_fields_change(self):
+        access = self.obtain()['access']
+        self.admin.email = 'changed@mail.com'
+        self.admin.save()
+        user, _ = self.authenticate(access)
+        self.assertEqual(user.id, self.admin.pk)
+
+    def test_inactive_user(self):
+        tokens = self.obtain()
+        self.save_in_past(self.admin, is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(tokens['access'])
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+
+    def test_deleted_user(self):
+        tokens = self.obtain()
+        self.save_in_past(self.admin, delete=True)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(tokens['access'])
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_process_cache_check(self):
+        self.assertEqual([error.id for error in check_token_denylist_cache(None)], ['accounts.W001'])
@@ -0,0 +1,50 @@
+""" User flags embedded in JWT and revocation of tokens carrying them.
+
+Access tokens issued by `accounts/token/` views contain `is_active`,
+`is_staff` and `is_superuser` of user, so `ClaimsJWTAuthentication`
+doesn't load user from database. When flags of a user change or user is
+deleted, the time is stored in the cache for access token lifetime and
+tokens issued earlier are rejected (see `signals.py`).
+The cache should be shared by all processes (Redis, Memcached).
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+USER_CLAIMS = ('is_active', 'is_staff', 'is_superuser')
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def _denylist_cache():
+    return caches[settings.TOKEN_DENYLIST['ALIAS']]
+
+
+def _revoked_key(user_id) -> str:
+    return f'accounts:tokens_revoked:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """ Reject tokens of user issued until now
+    """
+    # `iat` is in whole seconds, so tokens issued in the same second
+    # after the change are rejected too, clients have to get a new one
+    _denylist_cache().set(
+        _revoked_key(user_id),
+        math.ceil(time.time()),
+        timeout=int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    )
+
+
+def is_token_revoked(token) -> bool:
+    revoked_at = _denylist_cache().get(_revoked_key(token[jwt_settings.USER_ID_CLAIM]))
+    return revoked_at is not None and token.get('iat', 0) < revoked_at
@@ -21,6 +21,16 @@ class FormAnswerInline(admin.TabularInline):
     model = FormAnswer
     extra = 0
 
+    # Answers of submitted forms are counted in survey stats
+    def has_add_permission(self, request, obj=None):
+        return not (obj and obj.submitted) and super().has_add_permission(request, obj)
+
+    def has_change_permission(self, request, obj=None):
+        return not (obj and obj.submitted) and super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        return not (obj and obj.submitted) and super().has_delete_permission(request, obj)
+
 class FormInline(admin.StackedInline):
     model = Form
     extra = 0
@@ -48,4 +58,6 @@ class RespondentAdmin(admin.ModelAdmin):
 class FormAdmin(admin.ModelAdmin):
     list_display = ['survey', 'respondent', 'submitted', 'submitted_date']
     list_filter = ['survey', 'submitted', 'submitted_date']
+    # Forms are submitted by API, which counts them in survey stats
+    readonly_fields = ['submitted', 'submitted_date']
     inlines = [FormAnswerInline]
@@ -0,0 +1,211 @@
+""" Breakdowns of submitted forms of a survey computed with NumPy.
+
+Submitted answers of a survey are loaded once into `SurveyResponses`:
+one row per form with respondent age and, for every CHOICE and CHECKBOX
+question, a bit-packed matrix of chosen answers (a bit per answer).
+Crosstabs, co-occurrences and filtered distributions are matrix
+products of these rows.
+
+Responses of closed surveys are taken from their columnar snapshots
+(see `columnar.py`) if they are built.
+Loaded responses are kept in an in-process LRU and computed results in
+the shared cache by survey definition version and results version.
+Results version is replaced after a form is submitted, a submitted form
+is deleted or stats are rebuilt, the same events that change stats
+counters (see `stats.py`).
+"""
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from apps.surveys import cache
+from apps.surveys.cache import SurveyDefinition
+from apps.surveys.columnar import get_survey_snapshot, read_chosen
+from apps.surveys.models import Question, Form
+from apps.utils.cache import LRUCache
+
+
+# Age of forms without respondent
+NO_AGE = -1
+
+_local_cache = LRUCache(settings.SURVEY_ANALYTICS['LOCAL_SIZE'])
+
+
+def _shared_cache():
+    return caches[settings.SURVEY_DEFINITION_CACHE['ALIAS']]
+
+
+class SurveyResponses:
+    """ Submitted forms of a survey as arrays, row `i` of every array
+    is the same form.
+    `answer_pks` maps CHOICE and CHECKBOX question ids to ids of their
+    answers in order of matrix columns.
+    """
+    def __init__(self, ages: np.ndarray, chosen: dict, answer_pks: dict):
+        self.ages = ages
+        self.answer_pks = answer_pks
+        # Question id to `len(self) x ceil(answers / 8)` uint8 matrix
+        self._chosen = chosen
+        self._columns = {
+            answer_pk: (question_pk, column)
+            for question_pk, pks in answer_pks.items()
+            for column, answer_pk in enumerate(pks)
+        }
+
+    def __len__(self):
+        return len(self.ages)
+
+    def chosen(self, question_pk: int) -> np.ndarray:
+        """ `len(self) x answers` bool matrix of answers chosen in forms
+        """
+        return np.unpackbits(
+            self._chosen[question_pk], axis=1, count=len(self.answer_pks[question_pk])
+        ).view(bool)
+
+    def mask(self, answer_pks=(), age_min: int = None, age_max: int = None) -> np.ndarray:
+        """ Forms where all `answer_pks` are chosen and respondent age is
+        in the range. Forms without respondent don't match an age range.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for answer_pk in answer_pks:
+            question_pk, column = self._columns[answer_pk]
+            mask &= self.chosen(question_pk)[:, column]
+        if age_min is not None:
+            mask &= self.ages >= age_min
+        if age_max is not None:
+            mask &= (self.ages <= age_max) & (self.ages != NO_AGE)
+        return mask
+
+    def distribution(self, question_pk: int, mask: np.ndarray) -> np.ndarray:
+        """ How many of masked forms chose every answer of question
+        """
+        return np.count_nonzero(self.chosen(question_pk)[mask], axis=0)
+
+    def crosstab(self, question_pk: int, by_question_pk: int, mask: np.ndarray) -> np.ndarray:
+        """ `answers x by answers` matrix of masked forms
+        which chose both answers
+        """
+        return _co_counts(
+            self.chosen(question_pk)[mask],
+            self.chosen(by_question_pk)[mask]
+        )
+
+    def age_crosstab(self, question_pk: int, brackets: list, mask: np.ndarray) -> np.ndarray:
+        """ `answers x (len(brackets) + 2)` matrix of masked forms by
+        respondent age: below the first bracket, in every bracket
+        (the last one is open) and without respondent
+        """
+        ages = self.ages[mask]
+        columns = np.where(ages == NO_AGE, len(brackets) + 1, np.digitize(ages, brackets))
+        by_age = np.eye(len(brackets) + 2, dtype=bool)[columns]
+        return _co_counts(self.chosen(question_pk)[mask], by_age)
+
+    def cooccurrence(self, question_pk: int, mask: np.ndarray) -> np.ndarray:
+        """ `answers x answers` matrix of masked forms which chose
+        both answers, the diagonal is the distribution
+        """
+        chosen = self.chosen(question_pk)[mask]
+        return _co_counts(chosen, chosen)
+
+
+def _co_counts(rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    # Float product uses BLAS and is exact for counts below 2 ** 53
+    return (rows.T.astype(np.float64) @ columns.astype(np.float64)).astype(np.int64)
+
+
+def load_responses(survey_id: int, questions: list) -> SurveyResponses:
+    """ Read submitted forms of a survey with three queries
+    """
+    # Ids are read as text, UUID objects would take most of loading time
+    forms = list(
+        Form.objects
+        .filter(survey_id=survey_id, submitted=True)
+        .annotate(key=Cast('pk', CharField()))
+        .values_list('key', 'respondent__age')
+    )
+    ages = np.array(
+        [NO_AGE if age is None else age for _, age in forms],
+        dtype=np.int16
+    )
+    answer_pks, chosen = read_chosen(survey_id, questions, [key for key, _ in forms])
+    return SurveyResponses(ages, chosen, answer_pks)
+
+
+def get_responses(definition: SurveyDefinition, results_version: str) -> SurveyResponses:
+    survey_id = definition.survey.pk
+    key = (survey_id, definition.version, results_version)
+    responses = _local_cache.get(key)
+    if responses is None:
+        snapshot = get_survey_snapshot(definition)
+        if snapshot is not None:
+            # Arrays stay memory mapped
+            responses = SurveyResponses(snapshot.ages, snapshot.packed_chosen, snapshot.answer_pks)
+        else:
+            responses = load_responses(survey_id, definition.questions)
+        _local_cache.set(key, responses)
+    return responses
+
+
+def get_survey_analytics(definition: SurveyDefinition, question_pk: int, by=None,
+                         answer_pks=(), age_min: int = None, age_max: int = None,
+                         age_brackets: list = None) -> dict:
+    """ Distribution of answers to a CHOICE or CHECKBOX question
+    in submitted forms matching filters, with:
+    - `crosstab` by answers of question `by` or by age if `by` is `'age'`,
+    - `cooccurrence` of answers for a CHECKBOX question.
+    Arguments should be validated against the definition.
+    """
+    survey_id = definition.survey.pk
+    results_version = cache.get_results_version(survey_id)
+    if age_brackets is None:
+        age_brackets = settings.SURVEY_ANALYTICS['AGE_BRACKETS']
+    arguments = (question_pk, by, sorted(answer_pks), age_min, age_max, list(age_brackets))
+    key = _analytics_key(survey_id, definition.version, results_version, arguments)
+
+    shared_cache = _shared_cache()
+    analytics = shared_cache.get(key)
+    if analytics is not None:
+        return analytics
+
+    responses = get_responses(definition, results_version)
+    mask = responses.mask(answer_pks, age_min, age_max)
+    analytics = {
+        'question': question_pk,
+        'forms_amount': int(np.count_nonzero(mask)),
+        'answers': responses.answer_pks[question_pk],
+        'distribution': responses.distribution(question_pk, mask).tolist(),
+    }
+    if by == 'age':
+        analytics['by'] = by
+        analytics['columns'] = _age_labels(age_brackets)
+        analytics['crosstab'] = responses.age_crosstab(question_pk, age_brackets, mask).tolist()
+    elif by is not None:
+        analytics['by'] = by
+        analytics['columns'] = responses.answer_pks[by]
+        analytics['crosstab'] = responses.crosstab(question_pk, by, mask).tolist()
+
+    question_type = next(
+        question.type for question in definition.questions
+        if question.pk == question_pk
+    )
+    if question_type == Question.CHECKBOX:
+        analytics['cooccurrence'] = responses.cooccurrence(question_pk, mask).tolist()
+
+    shared_cache.set(key, analytics, timeout=settings.SURVEY_ANALYTICS['TIMEOUT'])
+    return analytics
+
+
+def _analytics_key(survey_id: int, version: str, results_version: str, arguments: tuple) -> str:
+    digest = hashlib.md5(repr(arguments).encode()).hexdigest()
+    return f'surveys:analytics:{survey_id}:{version}:{results_version}:{digest}'
+
+
+def _age_labels(brackets: list) -> list:
+    labels = [f'<{brackets[0]}']
+    labels += [f'{start}-{end - 1}' for start, end in zip(brackets, brackets[1:])]
+    labels += [f'{brackets[-1]}+', 'unknown']
+    return labels
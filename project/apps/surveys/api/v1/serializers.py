@@ -2,6 +2,9 @@ from django.db import transaction
 from django.utils import timezone
 
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 
 from apps.surveys.models import (
     Survey, 
@@ -11,6 +14,10 @@ from apps.surveys.models import (
     Form,
     FormAnswer
 )
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.drafts import delete_drafts, drafts_enabled, get_drafts, save_drafts
+from apps.surveys.snapshots import refresh_form_snapshot, snapshot_form_answers
+from apps.surveys.stats import record_form_submission
 
 
 class SurveySerializer(serializers.ModelSerializer):
@@ -43,6 +50,7 @@ class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Question
         fields = ('pk', 'survey', 'type', 'text', 'answers')
+        prefetch_related = ('answers',)
 
     def to_internal_value(self, data):
         if not self.instance:
@@ -83,6 +91,7 @@ class AnswerSerializer(serializers.ModelSerializer):
         )
         extra_kwargs = {'question': {'required': True}}
         read_only_fields = ('form_choice', 'form_choices')
+        prefetch_related = ('form_choice', 'form_choices')
 
 
 class RespondentSerializer(serializers.ModelSerializer):
@@ -104,7 +113,8 @@ class RespondentSerializer(serializers.ModelSerializer):
         form = self.validated_data.pop('form')
         respondent = super().save(**kwargs)
         form.respondent = respondent
-        form.save()
+        # Counters and snapshot of the form are not overwritten
+        form.save(update_fields=['respondent', 'updated_at'])
         return respondent
 
 
@@ -154,6 +164,7 @@ class FormAnswerSerializer(serializers.ModelSerializer):
                 message='form should have only one answer per question'
             )
         ]
+        prefetch_related = ('choices',)
 
     def validate(self, attrs):
         # TODO improve this ass long validation
@@ -167,10 +178,12 @@ class FormAnswerSerializer(serializers.ModelSerializer):
             }
             obj_attrs.update(attrs)
             attrs = obj_attrs
+            # `validate_form` isn't called on partial update
+            self.validate_form(attrs['form'])
 
         question = attrs.get('question')
 
-        if attrs.get('form').survey != question.survey:
+        if attrs.get('form').survey_id != question.survey_id:
             raise serializers.ValidationError(
                 'answer to question should be in survey'
             )
@@ -184,11 +197,22 @@ class FormAnswerSerializer(serializers.ModelSerializer):
         
         return attrs
 
+    # Choices are set after the answer is saved, the answer
+    # snapshot is refreshed after commit when both are saved
+    @transaction.atomic
+    def create(self, validated_data):
+        return super().create(validated_data)
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        return super().update(instance, validated_data)
+
     def validate_form(self, form):
         if form.submitted:
             raise serializers.ValidationError(
                 'form is already submitted'
             )
+        return form
 
     def validate_text_type(self, attrs):
         self.validate_fields_are_empty(attrs, ['choice', 'choices'])
@@ -205,7 +229,7 @@ class FormAnswerSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 '`choice` field is required' 
             )
-        if choice not in question.answers.all():
+        if choice.pk not in self.get_allowed_answer_pks(question):
             raise serializers.ValidationError(
                 '`choice` should be in question choices' 
             )
@@ -219,18 +243,165 @@ class FormAnswerSerializer(serializers.ModelSerializer):
             )
 
         question = attrs.get('question') or getattr(self.instance, 'question')
-        not_allowed_choices = set(choices) - set(question.answers.all())
+        allowed_answer_pks = self.get_allowed_answer_pks(question)
+        not_allowed_choices = [choice.pk for choice in choices if choice.pk not in allowed_answer_pks]
         if not_allowed_choices:
             raise serializers.ValidationError(
-                f'`choices` should be in question choices. Unwanted answers: {list(map(lambda obj: obj.pk, not_allowed_choices))}' 
+                f'`choices` should be in question choices. Unwanted answers: {not_allowed_choices}' 
             )
 
+    def get_allowed_answer_pks(self, question: Question) -> frozenset:
+        """ Pks of answers to question from cached survey definition,
+        bulk serializer passes definition of its form in context
+        """
+        definition = self.context.get('survey_definition')
+        if definition is None or definition.survey.pk != question.survey_id:
+            definition = get_survey_definition(question.survey_id)
+
+        answer_pks = definition and definition.answer_pks.get(question.pk)
+        if answer_pks is None:
+            # Question is created in current transaction
+            answer_pks = frozenset(question.answers.values_list('pk', flat=True))
+        return answer_pks
+
     def validate_fields_are_empty(self, attrs: dict, empty_fields: list):
         for field in empty_fields:
             if attrs.get(field):
                 raise serializers.ValidationError(f'`{field}` is not allowed to be provided')
 
 
+class _FormAnswerItemSerializer(serializers.Serializer):
+    """ Parses one item of a bulk payload without touching the database
+    """
+    question = serializers.IntegerField()
+    text = serializers.CharField(max_length=512, required=False, allow_blank=True)
+    choice = serializers.IntegerField(required=False, allow_null=True)
+    choices = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class FormAnswerBulkCreateSerializer(serializers.ListSerializer):
+    """ Validate and create many answers to one form at once.
+
+    Form and already answered questions are fetched once for the whole
+    payload, questions with their answers are taken from cached survey
+    definition, answers are created with `bulk_create`.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='not_a_list')
+
+        if not self.allow_empty and len(data) == 0:
+            message = self.error_messages['empty']
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='empty')
+
+        form = self.get_form()
+        if form.submitted:
+            raise serializers.ValidationError({
+                'form': ['form is already submitted']
+            })
+
+        items = [_FormAnswerItemSerializer(data=item) for item in data]
+        question_pks = {
+            item.validated_data['question'] 
+            for item in items if item.is_valid()
+        }
+        definition = get_survey_definition(form.survey_id)
+        self.context['survey_definition'] = definition
+        questions = {question.pk: question for question in definition.questions}
+        answers = {
+            answer.pk: answer
+            for question in definition.questions
+            for answer in question.answers.all()
+        }
+        # Questions of other surveys fail validation later
+        other_question_pks = question_pks - questions.keys()
+        if other_question_pks:
+            questions.update(Question.objects.in_bulk(other_question_pks))
+
+        answered_question_pks = self.get_answered_question_pks(form, question_pks)
+
+        ret = []
+        errors = []
+        for item in items:
+            if item.errors:
+                ret.append({})
+                errors.append(item.errors)
+                continue
+
+            try:
+                validated = self.to_answer_attrs(form, item.validated_data, questions, answers)
+                if validated['question'].pk in answered_question_pks:
+                    raise serializers.ValidationError(
+                        'form should have only one answer per question'
+                    )
+                validated = self.child.validate(validated)
+            except serializers.ValidationError as exc:
+                ret.append({})
+                errors.append(serializers.as_serializer_error(exc))
+                continue
+
+            answered_question_pks.add(validated['question'].pk)
+            ret.append(validated)
+            errors.append({})
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return ret
+
+    def get_form(self) -> Form:
+        # Form is passed in context when serializer is used outside of a view
+        form = self.context.get('form')
+        if form is None:
+            view = self.context['view']
+            lookup_field = view.lookup_url_kwarg or view.lookup_field
+            form = get_object_or_404(Form, pk=view.kwargs[lookup_field])
+        return form
+
+    def get_answered_question_pks(self, form: Form, question_pks: set) -> set:
+        return set(
+            FormAnswer.objects
+            .filter(form=form, question__in=question_pks)
+            .values_list('question_id', flat=True)
+        )
+
+    def to_answer_attrs(self, form: Form, data: dict, questions: dict, answers: dict) -> dict:
+        question = questions.get(data['question'])
+        if question is None:
+            message = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+            raise serializers.ValidationError({
+                'question': [message.format(pk_value=data['question'])]
+            })
+
+        # Unknown answer pks are kept as unsaved objects 
+        # to fail membership checks of `validate_*_type`
+        choice = data.get('choice')
+        return {
+            'form': form,
+            'question': question,
+            'text': data.get('text', ''),
+            'choice': answers.get(choice, Answer(pk=choice)) if choice else None,
+            # Repeated pks would break unique choices of the answer
+            'choices': [
+                answers.get(pk, Answer(pk=pk)) 
+                for pk in dict.fromkeys(data.get('choices', []))
+            ],
+        }
+
+    def create(self, validated_data):
+        if not validated_data:
+            return []
+        form = validated_data[0]['form']
+        return FormAnswer.objects.bulk_create_for_form(form, validated_data)
+
+
 class FormAnswerCreateSerializer(FormAnswerSerializer):
     class Meta:
         model = FormAnswer
@@ -238,6 +409,7 @@ class FormAnswerCreateSerializer(FormAnswerSerializer):
             'pk', 'form', 'question', 
             'text', 'choice', 'choices'
         )
+        list_serializer_class = FormAnswerBulkCreateSerializer
         validators = [
             serializers.UniqueTogetherValidator(
                 queryset=model.objects.all(),
@@ -245,6 +417,7 @@ class FormAnswerCreateSerializer(FormAnswerSerializer):
                 message='form should have only one answer per question'
             )
         ]
+        prefetch_related = ('choices',)
 
     def to_internal_value(self, data):
         view = self.context['view']
@@ -262,6 +435,79 @@ class FormAnswerCreateSerializer(FormAnswerSerializer):
         return data
 
 
+class FormAnswerDraftListSerializer(FormAnswerBulkCreateSerializer):
+    """ Validate draft answers like answers created in bulk 
+    and store them in drafts buffer instead of database.
+    Drafts replace saved answers to the same questions.
+    """
+    def get_answered_question_pks(self, form: Form, question_pks: set) -> set:
+        return set()
+
+    def create(self, validated_data):
+        save_drafts(self.get_form().pk, [
+            {
+                'question': attrs['question'].pk,
+                'text': attrs['text'],
+                'choice': attrs['choice'] and attrs['choice'].pk,
+                'choices': [choice.pk for choice in attrs['choices']],
+            }
+            for attrs in validated_data
+        ])
+        return validated_data
+
+
+class FormAnswerDraftSerializer(FormAnswerSerializer):
+    """ Should be used with `many=True`
+    """
+    class Meta:
+        model = FormAnswer
+        fields = ('question', 'text', 'choice', 'choices')
+        list_serializer_class = FormAnswerDraftListSerializer
+        validators = []
+
+
+class _FormAnswerFillListSerializer(FormAnswerBulkCreateSerializer):
+    """ Validate answers to a not saved form, which has no answers yet
+    """
+    def get_answered_question_pks(self, form: Form, question_pks: set) -> set:
+        return set()
+
+
+class FormAnswerFillSerializer(FormAnswerSerializer):
+    """ Should be used with `many=True`
+    """
+    class Meta:
+        model = FormAnswer
+        fields = ('question', 'text', 'choice', 'choices')
+        list_serializer_class = _FormAnswerFillListSerializer
+        validators = []
+
+
+def flush_form_drafts(form: Form) -> list:
+    """ Validate drafts of a form and save them to database
+    replacing answers to the same questions.
+    Form should be locked by current transaction.
+    Drafts are deleted from buffer after commit.
+    """
+    if not drafts_enabled():
+        return []
+    definition = get_survey_definition(form.survey_id)
+    drafts = get_drafts(form.pk, [question.pk for question in definition.questions])
+    if not drafts:
+        return []
+
+    serializer = FormAnswerDraftSerializer(data=drafts, many=True, context={'form': form})
+    if not serializer.is_valid():
+        raise serializers.ValidationError({'drafts': serializer.errors})
+    answers = FormAnswer.objects.replace_for_form(form, serializer.validated_data)
+
+    # `answered_count` is updated in database
+    form.refresh_from_db(fields=['answered_count'])
+    question_pks = [draft['question'] for draft in drafts]
+    transaction.on_commit(lambda: delete_drafts(form.pk, question_pks))
+    return answers
+
+
 class SubmitFormSerializer(serializers.ModelSerializer):
     class Meta:
         model = Form
@@ -274,9 +520,14 @@ class SubmitFormSerializer(serializers.ModelSerializer):
                 'form is already submitted'
             )
 
-        form_answers = form.answers.all()
-        form_survey_questions = form.survey.questions.all()
-        unanswered_questions_amount = len(form_survey_questions) - len(form_answers)
+        flush_form_drafts(form)
+
+        # `questions_amount` is annotated by `SubmitFormView` queryset
+        questions_amount = getattr(form, 'questions_amount', None)
+        if questions_amount is None:
+            questions_amount = Question.objects.filter(survey_id=form.survey_id).count()
+
+        unanswered_questions_amount = questions_amount - form.answered_count
         if unanswered_questions_amount:
             raise serializers.ValidationError(
                 f'survey form should answer to all questions. {unanswered_questions_amount} left.'
@@ -284,9 +535,207 @@ class SubmitFormSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.submitted = True
         instance.submitted_date = timezone.now()
-        instance.save()
+        instance.save(update_fields=['submitted', 'submitted_date', 'updated_at'])
+        record_form_submission(instance)
+        # Final snapshot is committed together with submit
+        refresh_form_snapshot(instance.pk)
         return instance
 
+
+class _RespondentFillSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Respondent
+        fields = ('pk', 'first_name', 'last_name', 'age')
+
+
+class SurveyFillSerializer(serializers.ModelSerializer):
+    """ Create a submitted form of survey with respondent and 
+    answers to all questions in one transaction. 
+    Answers are validated against cached survey definition.
+    """
+    respondent = _RespondentFillSerializer(required=False, allow_null=True)
+    answers = FormAnswerFillSerializer(many=True, write_only=True)
+
+    class Meta:
+        model = Form
+        fields = (
+            'pk', 'respondent', 'survey', 
+            'submitted', 'submitted_date', 'answers'
+        )
+        read_only_fields = ('survey', 'submitted', 'submitted_date')
+
+    def to_internal_value(self, data):
+        view = self.context['view']
+        lookup_field = view.lookup_url_kwarg or view.lookup_field
+        definition = get_survey_definition(view.kwargs[lookup_field])
+        if definition is None:
+            raise NotFound
+
+        # Answers are validated for the form before it is saved
+        self.context['form'] = Form(survey=definition.survey)
+        self.context['survey_definition'] = definition
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        definition = self.context['survey_definition']
+        if not definition.survey.is_active():
+            raise serializers.ValidationError(
+                'survey to take should be active'
+            )
+
+        unanswered_questions_amount = len(definition.questions) - len(attrs['answers'])
+        if unanswered_questions_amount:
+            raise serializers.ValidationError(
+                f'survey form should answer to all questions. {unanswered_questions_amount} left.'
+            )
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        form = self.context['form']
+        respondent = validated_data.get('respondent')
+        if respondent:
+            form.respondent = Respondent.objects.create(**respondent)
+        form.submitted = True
+        form.submitted_date = timezone.now()
+        form.save(force_insert=True)
+
+        # Created answers are all answers of the form
+        form_answers = FormAnswer.objects.bulk_create_for_form(
+            form, validated_data['answers'], refresh_snapshot=False
+        )
+        form.answered_count = len(form_answers)
+        record_form_submission(form, form_answers)
+        refresh_form_snapshot(form.pk, snapshot_form_answers(form_answers))
+        return form
+
+
+class FormFullSerializer(serializers.ModelSerializer):
+    """ Form with its survey, questions and answers taken 
+    from cached survey definition and answers snapshot
+    """
+    class Meta:
+        model = Form
+        fields = ('pk', 'respondent', 'submitted', 'submitted_date')
+
+    def to_representation(self, form):
+        data = super().to_representation(form)
+        definition = get_survey_definition(form.survey_id)
+        snapshot = form.answers_snapshot or {}
+
+        data['survey'] = SurveySerializer(definition.survey, context=self.context).data
+        questions = QuestionSerializer(definition.questions, many=True, context=self.context).data
+        for question in questions:
+            question['answer'] = snapshot.get(str(question['pk']))
+        data['questions'] = questions
+        return data
+
+
+class _AnswerStatsSerializer(serializers.ModelSerializer):
+    chosen_amount = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Answer
+        fields = ('pk', 'text', 'chosen_amount')
+
+
+class _QuestionStatsSerializer(serializers.ModelSerializer):
+    answers_amount = serializers.IntegerField(read_only=True)
+    answers = _AnswerStatsSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ('pk', 'type', 'text', 'answers_amount', 'answers')
+
+
+class SurveyStatsSerializer(serializers.ModelSerializer):
+    forms_amount = serializers.IntegerField(read_only=True)
+    questions = _QuestionStatsSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Survey
+        fields = ('pk', 'title', 'forms_amount', 'questions')
+
+
+
+class SurveyAnalyticsQuerySerializer(serializers.Serializer):
+    """ Query params of survey analytics validated against 
+    `survey_definition` from context. 
+    `by` is `age` or id of a CHOICE or CHECKBOX question,
+    `answers` are ids of answers every counted form has chosen.
+    """
+    question = serializers.IntegerField()
+    by = serializers.CharField(required=False)
+    answers = serializers.ListField(child=serializers.IntegerField(), required=False)
+    age_min = serializers.IntegerField(min_value=0, required=False)
+    age_max = serializers.IntegerField(min_value=0, required=False)
+    age_brackets = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), 
+        required=False, 
+        min_length=1
+    )
+
+    def _get_question_types(self) -> dict:
+        return {
+            question.pk: question.type 
+            for question in self.context['survey_definition'].questions
+        }
+
+    def _validate_analysed_question(self, question_pk: int) -> int:
+        question_type = self._get_question_types().get(question_pk)
+        if question_type is None:
+            raise serializers.ValidationError(
+                'should be a question of survey'
+            )
+        if question_type == Question.TEXT:
+            raise serializers.ValidationError(
+                'TEXT questions can\'t be analysed'
+            )
+        return question_pk
+
+    def validate_question(self, value):
+        return self._validate_analysed_question(value)
+
+    def validate_by(self, value):
+        if value == 'age':
+            return value
+        try:
+            question_pk = int(value)
+        except ValueError:
+            raise serializers.ValidationError(
+                'should be `age` or a question id'
+            )
+        return self._validate_analysed_question(question_pk)
+
+    def validate_answers(self, value):
+        definition = self.context['survey_definition']
+        answer_pks = set().union(*(
+            definition.answer_pks[question.pk]
+            for question in definition.questions
+            if question.type != Question.TEXT
+        ))
+        unknown_answers = set(value) - answer_pks
+        if unknown_answers:
+            raise serializers.ValidationError(
+                f'should be answers of survey questions. Unknown answers: {sorted(unknown_answers)}'
+            )
+        return value
+
+    def validate_age_brackets(self, value):
+        if any(start >= end for start, end in zip(value, value[1:])):
+            raise serializers.ValidationError(
+                'should be ascending'
+            )
+        return value
+
+    def validate(self, attrs):
+        age_min, age_max = attrs.get('age_min'), attrs.get('age_max')
+        if age_min is not None and age_max is not None and age_min > age_max:
+            raise serializers.ValidationError(
+                '`age_min` should not be greater than `age_max`'
+            )
+        return attrs
@@ -6,6 +6,8 @@ from apps.surveys.api.v1.views import (
     FormAnswerListView,
     FormAnswerRUDView,
     FormAnswerListCreateView,
+    FormDraftView,
+    FormFullView,
     FormRespondent,
     FormSurveyQuestionsListView,
     FormSurveyRetrieveView,
@@ -16,10 +18,14 @@ from apps.surveys.api.v1.views import (
     SurveyListCreateView,
     ActiveSurveyListView,
     SurveyQuestionsListCreateView,
+    SurveyAnalyticsView,
+    SurveyExportView,
     SurveyRUDView,
+    SurveyStatsView,
     FormListView,
     FormRetrieveView,
     SurveyStartView,
+    SurveyFillView,
 )
 
 urlpatterns = [
@@ -29,9 +35,12 @@ urlpatterns = [
         
         path('<int:pk>/', SurveyRUDView.as_view(), name='survey_detail'),
         path('<int:pk>/questions/', SurveyQuestionsListCreateView.as_view(), name='survey_questions'),
-        # # TODO endpoint to get stats about a survey
+        path('<int:pk>/stats/', SurveyStatsView.as_view(), name='survey_stats'),
+        path('<int:pk>/export/', SurveyExportView.as_view(), name='survey_export'),
+        path('<int:pk>/analytics/', SurveyAnalyticsView.as_view(), name='survey_analytics'),
 
         path('<int:pk>/start/', SurveyStartView.as_view(), name='start_survey'),
+        path('<int:pk>/fill/', SurveyFillView.as_view(), name='fill_survey'),
 
     ])),
 
@@ -48,20 +57,23 @@ urlpatterns = [
 
     path('forms/', include([
         path('', FormListView.as_view(), name='all_forms'),
+        # Should be before `<slug:pk>/` which matches `answers/` too
+        path('answers/', include([
+            path('', FormAnswerListView.as_view(), name='all_answers'),
+            path('<int:pk>/', FormAnswerRUDView.as_view(), name='answer_detail'),
+        ])),
+
         path('<slug:pk>/', FormRetrieveView.as_view(), name='form_detail'),
+        path('<slug:pk>/full/', FormFullView.as_view(), name='form_full'),
         path('<slug:pk>/respondent/', FormRespondent.as_view(), name='form_respondent'),
 
         path('<slug:pk>/survey/', FormSurveyRetrieveView.as_view(), name='form_survey'),
         path('<slug:pk>/survey/questions/', FormSurveyQuestionsListView.as_view(), name='form_survey_questions'),
 
         path('<slug:pk>/answers/', FormAnswerListCreateView.as_view(), name='form_answers'),
+        path('<slug:pk>/drafts/', FormDraftView.as_view(), name='form_drafts'),
 
         path('<slug:pk>/submit/', SubmitFormView.as_view(), name='form_submit'),
-
-        path('answers/', include([
-            path('', FormAnswerListView.as_view(), name='all_answers'),
-            path('<int:pk>/', FormAnswerRUDView.as_view(), name='answer_detail'),
-        ])),
     ])),
 
 ]
\ No newline at end of file
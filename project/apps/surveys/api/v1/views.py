@@ -1,4 +1,11 @@
-from django.http import Http404
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
 from rest_framework.generics import (
     get_object_or_404,
@@ -10,6 +17,7 @@ from rest_framework.generics import (
     RetrieveUpdateDestroyAPIView,
     UpdateAPIView
 )
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import (
     IsAuthenticated, 
@@ -23,21 +31,42 @@ from apps.surveys.models import (
     Form,
     FormAnswer
 )
+from apps.surveys.analytics import get_survey_analytics
+from apps.surveys.cache import get_active_surveys, get_form_survey_id, get_survey_definition
+from apps.surveys.columnar import get_survey_snapshot
+from apps.surveys.drafts import drafts_enabled, get_drafts
+from apps.surveys.snapshots import refresh_form_snapshot
+from apps.surveys.stats import get_snapshot_stats
+from apps.surveys.export import EXPORT_FORMATS, iter_export
 from apps.surveys.permissions import IsAdminOrCreateOnly, IsAdminOrReadOnly
-from apps.surveys.filters import ActiveSurveysFilter
 from apps.utils.filters import URLRelatedFilter
+from apps.utils.pagination import KeysetPagination
+from apps.utils.views import ConditionalGetMixin, RelatedQuerysetMixin, patch_public_cache_control
 from .serializers import (
     AnswerSerializer,
     FormAnswerCreateSerializer,
+    FormAnswerDraftSerializer,
+    FormFullSerializer,
     FormCreateSerizlier,
     RespondentSerializer,
     SubmitFormSerializer,
+    SurveyAnalyticsQuerySerializer,
+    SurveyFillSerializer,
     SurveySerializer,
+    SurveyStatsSerializer,
     QuestionSerializer,
     FormSerializer,
     FormAnswerSerializer,
 )
 
+def changes_state(queryset) -> tuple:
+    """ Amount and last update of rows, changes when rows are 
+    added, changed or deleted
+    """
+    state = queryset.order_by().aggregate(amount=Count('pk'), updated_at=Max('updated_at'))
+    return state['amount'], state['updated_at']
+
+
 class CreateRetrieveUpdateDestroyAPIView(
     RetrieveUpdateDestroyAPIView,
     CreateAPIView
@@ -64,15 +93,35 @@ class SurveyListCreateView(ListCreateAPIView):
 
 
 class ActiveSurveyListView(ListAPIView):
-    """ Show all active surveys
+    """ Show all active surveys.
+    List is cached until the next start or end of any survey
     """
     serializer_class = SurveySerializer
-    queryset = Survey.objects.all()
 
-    filter_backends = (ActiveSurveysFilter,)
+    def get_queryset(self):
+        return self.active_surveys.surveys
 
+    def list(self, request, *args, **kwargs):
+        self.active_surveys = get_active_surveys()
+        etag = quote_etag(self.active_surveys.etag)
 
-class SurveyRUDView(RetrieveUpdateDestroyAPIView):
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        patch_public_cache_control(response, self.get_max_age())
+        return response
+
+    def get_max_age(self) -> int:
+        # Clients can't be told about changed surveys
+        max_age = settings.ACTIVE_SURVEYS_MAX_AGE
+        expires_at = self.active_surveys.expires_at
+        if expires_at is not None:
+            max_age = min(max_age, int((expires_at - timezone.now()).total_seconds()))
+        return max(max_age, 0)
+
+
+class SurveyRUDView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Change survey
     """
     permission_classes = (IsAuthenticated, IsAdminUser)
@@ -80,9 +129,16 @@ class SurveyRUDView(RetrieveUpdateDestroyAPIView):
     serializer_class = SurveySerializer
     queryset = Survey.objects.all()
 
+    def get_conditional_state(self):
+        survey = self.get_object()
+        return survey.updated_at, survey.is_active()
+
+    def get_last_modified(self):
+        return self.get_object().last_modified()
+
 
 # Survey related
-class SurveyQuestionsListCreateView(ListCreateAPIView):
+class SurveyQuestionsListCreateView(ConditionalGetMixin, RelatedQuerysetMixin, ListCreateAPIView):
     """ Show all or Create Question for survey
     """
     permission_classes = (IsAdminOrReadOnly, )
@@ -94,6 +150,110 @@ class SurveyQuestionsListCreateView(ListCreateAPIView):
     url_related_field = 'survey_id'
     url_related_kwarg = 'pk'
 
+    def get_conditional_state(self):
+        survey_id = self.kwargs['pk']
+        return (
+            changes_state(Question.objects.filter(survey_id=survey_id)),
+            changes_state(Answer.objects.filter(question__survey_id=survey_id)),
+        )
+
+
+class SurveyStatsView(RetrieveAPIView):
+    """ Survey stats. Counters are updated when a form is submitted,
+    closed surveys are counted from their snapshots if they are built
+    """
+    permission_classes = (IsAuthenticated, IsAdminUser)
+
+    serializer_class = SurveyStatsSerializer
+    queryset = Survey.objects.annotate(
+        forms_amount=Coalesce('stats__forms_amount', Value(0))
+    ).prefetch_related(
+        Prefetch(
+            'questions', 
+            queryset=Question.objects.annotate(
+                answers_amount=Coalesce('stats__answers_amount', Value(0))
+            ).order_by('pk')
+        ),
+        Prefetch(
+            'questions__answers', 
+            queryset=Answer.objects.annotate(
+                chosen_amount=Coalesce('stats__chosen_amount', Value(0))
+            ).order_by('pk')
+        ),
+    )
+
+    def retrieve(self, request, *args, **kwargs):
+        definition = get_survey_definition(self.kwargs['pk'])
+        snapshot = definition and get_survey_snapshot(definition)
+        if snapshot is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(get_snapshot_stats(definition, snapshot))
+
+
+class SurveyAnalyticsView(GenericAPIView):
+    """ Distribution of answers to a question in submitted forms,
+    crosstab by answers to another question or by respondent age 
+    and co-occurrence of CHECKBOX answers. 
+    Forms can be filtered by chosen answers and respondent age.
+    """
+    permission_classes = (IsAuthenticated, IsAdminUser)
+
+    serializer_class = SurveyAnalyticsQuerySerializer
+
+    def get_survey_definition(self):
+        definition = get_survey_definition(self.kwargs['pk'])
+        if definition is None:
+            raise Http404
+        return definition
+
+    def get(self, request, *args, **kwargs):
+        definition = self.get_survey_definition()
+        serializer = self.get_serializer(
+            data=request.query_params, 
+            context={**self.get_serializer_context(), 'survey_definition': definition}
+        )
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        return Response(get_survey_analytics(
+            definition,
+            params['question'],
+            by=params.get('by'),
+            answer_pks=params.get('answers', ()),
+            age_min=params.get('age_min'),
+            age_max=params.get('age_max'),
+            age_brackets=params.get('age_brackets'),
+        ))
+
+
+class SurveyExportView(GenericAPIView):
+    """ Stream submitted forms of survey, one row per form.
+    `output` query param is `csv` (default) or `ndjson`
+    """
+    permission_classes = (IsAuthenticated, IsAdminUser)
+
+    def get(self, request, *args, **kwargs):
+        survey_id = self.kwargs['pk']
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({
+                'output': f'should be one of: {", ".join(EXPORT_FORMATS)}'
+            })
+
+        try:
+            content = iter_export(survey_id, export_format)
+        except LookupError:
+            raise Http404
+
+        response = StreamingHttpResponse(
+            content, 
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="survey-{survey_id}.{export_format}"'
+        )
+        return response
+
 
 class SurveyStartView(CreateAPIView):
     """ Start a survey
@@ -102,8 +262,15 @@ class SurveyStartView(CreateAPIView):
     queryset = Form.objects.all()
 
 
+class SurveyFillView(CreateAPIView):
+    """ Fill a survey at once: create submitted form 
+    with respondent and answers to all questions
+    """
+    serializer_class = SurveyFillSerializer
+
+
 # Question
-class QuestionListView(ListAPIView):
+class QuestionListView(ConditionalGetMixin, RelatedQuerysetMixin, ListAPIView):
     """ All questions
     """
     permission_classes = (IsAdminUser, )
@@ -111,8 +278,11 @@ class QuestionListView(ListAPIView):
     serializer_class = QuestionSerializer
     queryset = Question.objects.all()
 
+    def get_conditional_state(self):
+        return changes_state(Question.objects.all()), changes_state(Answer.objects.all())
+
 
-class QuestionRUDView(RetrieveUpdateDestroyAPIView):
+class QuestionRUDView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """ Change question
     """
     permission_classes = (IsAdminUser, )
@@ -120,9 +290,13 @@ class QuestionRUDView(RetrieveUpdateDestroyAPIView):
     serializer_class = QuestionSerializer
     queryset = Question.objects.all()
 
+    def get_conditional_state(self):
+        question = self.get_object()
+        return question.updated_at, changes_state(question.answers.all())
+
 
 # Question related
-class QuestionAnswersListCreateView(ListCreateAPIView):
+class QuestionAnswersListCreateView(RelatedQuerysetMixin, ListCreateAPIView):
     """ Question answers
     """
     permission_classes = (IsAdminUser, )
@@ -132,7 +306,7 @@ class QuestionAnswersListCreateView(ListCreateAPIView):
 
 
 # Answer
-class AnswerListView(ListAPIView):
+class AnswerListView(RelatedQuerysetMixin, ListAPIView):
     """ All questions
     """
     permission_classes = (IsAdminUser, )
@@ -140,6 +314,9 @@ class AnswerListView(ListAPIView):
     serializer_class = AnswerSerializer
     queryset = Answer.objects.all()
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('pk',)
+
 
 class AnswerRUDView(RetrieveUpdateDestroyAPIView):
     """ Change question
@@ -151,23 +328,49 @@ class AnswerRUDView(RetrieveUpdateDestroyAPIView):
 
 
 # Form
-class FormListView(ListCreateAPIView):
+class FormListView(RelatedQuerysetMixin, ListCreateAPIView):
     """ Show all forms
     """
     permission_classes = (IsAdminUser, )
 
     serializer_class = FormSerializer
-    queryset = Form.objects.all()
+    # Snapshot isn't serialized and may be large
+    queryset = Form.objects.defer('answers_snapshot')
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-submitted_date', '-pk')
 
-class FormRetrieveView(RetrieveAPIView):
+
+class FormRetrieveView(ConditionalGetMixin, RetrieveAPIView):
     """ Get form detail
     """
     serializer_class = FormSerializer
-    queryset = Form.objects.all()
+    queryset = Form.objects.defer('answers_snapshot')
+
+    def get_conditional_state(self):
+        form = self.get_object()
+        # Respondent is unset on its delete without saving form
+        return form.updated_at, form.respondent_id
+
+    def get_last_modified(self):
+        return self.get_object().updated_at
 
 
 # Form related
+class FormFullView(RetrieveAPIView):
+    """ View form with survey, questions and answers 
+    """
+    serializer_class = FormFullSerializer
+    queryset = Form.objects.all()
+
+    def get_object(self):
+        form = super().get_object()
+        if form.answers_snapshot is None:
+            # Forms answered before snapshots were added
+            form.answers_snapshot = refresh_form_snapshot(form.pk)
+        return form
+
+
 class FormRespondent(CreateRetrieveUpdateDestroyAPIView):
     """ Create or change respondent
     """
@@ -179,29 +382,50 @@ class FormRespondent(CreateRetrieveUpdateDestroyAPIView):
         return get_object_or_404(Respondent, form__pk=form_pk)
 
 
-class FormSurveyRetrieveView(RetrieveAPIView):
+class FormSurveyDefinitionMixin:
+    """ Get survey definition of current form from cache
+    """
+    def get_survey_definition(self):
+        lookup_field = self.lookup_url_kwarg or self.lookup_field
+        survey_id = get_form_survey_id(self.kwargs[lookup_field])
+        definition = survey_id and get_survey_definition(survey_id)
+        if not definition:
+            raise Http404
+        return definition
+
+
+class FormSurveyRetrieveView(ConditionalGetMixin, FormSurveyDefinitionMixin, RetrieveAPIView):
     """ View survey of current form
     """
     serializer_class = SurveySerializer
     
     def get_object(self):
-        lookup_field = self.lookup_url_kwarg or self.lookup_field
-        form_pk = self.kwargs[lookup_field]
-        return get_object_or_404(Survey, forms__pk=form_pk)
+        return self.get_survey_definition().survey
 
+    def get_conditional_state(self):
+        definition = self.get_survey_definition()
+        return definition.version, definition.survey.is_active()
 
-class FormSurveyQuestionsListView(ListAPIView):
+    def get_max_age(self):
+        return settings.FORM_SURVEY_MAX_AGE
+
+
+class FormSurveyQuestionsListView(ConditionalGetMixin, FormSurveyDefinitionMixin, ListAPIView):
     """ View questions of survey of current form
     """
     serializer_class = QuestionSerializer
-    queryset = Question.objects.all()
-    
-    filter_backends = [URLRelatedFilter]
-    url_related_field = 'survey__forms__pk'
-    url_related_kwarg = 'pk'
 
+    def get_queryset(self):
+        return self.get_survey_definition().questions
+
+    def get_conditional_state(self):
+        return self.get_survey_definition().version
+
+    def get_max_age(self):
+        return settings.FORM_SURVEY_MAX_AGE
 
-class FormAnswerListCreateView(ListCreateAPIView):
+
+class FormAnswerListCreateView(RelatedQuerysetMixin, ListCreateAPIView):
     """ Show all form answers or create (one or many are avaliable)
     """
     serializer_class = FormAnswerCreateSerializer
@@ -217,15 +441,63 @@ class FormAnswerListCreateView(ListCreateAPIView):
         return super().get_serializer(*args, **kwargs)
 
 
+class FormDraftView(FormSurveyDefinitionMixin, GenericAPIView):
+    """ Show or save (one or many) not submitted answers.
+    Drafts are saved to database on form submit
+    """
+    serializer_class = FormAnswerDraftSerializer
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not drafts_enabled():
+            raise NotFound('form drafts are disabled')
+
+    def get(self, request, *args, **kwargs):
+        definition = self.get_survey_definition()
+        question_pks = [question.pk for question in definition.questions]
+        return Response(get_drafts(kwargs['pk'], question_pks))
+
+    def post(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data if many else [request.data], 
+            many=True
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if not many and isinstance(errors, list):
+                errors = errors[0]
+            raise ValidationError(errors)
+        serializer.save()
+        return Response(serializer.data if many else serializer.data[0])
+
+
 class SubmitFormView(UpdateAPIView):
     """ Submit form
     """
     serializer_class = SubmitFormSerializer
-    queryset = Form.objects.all()
+    # Form row is locked so concurrent submits are handled one by one
+    queryset = Form.objects.select_for_update().annotate(
+        questions_amount=Coalesce(
+            Subquery(
+                Question.objects
+                .filter(survey=OuterRef('survey'))
+                .order_by()
+                .values('survey')
+                .annotate(amount=Count('pk'))
+                .values('amount')
+            ),
+            Value(0)
+        )
+    )
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
 
 
 # FormAnswer
-class FormAnswerListView(ListAPIView):
+class FormAnswerListView(RelatedQuerysetMixin, ListAPIView):
     """ Show all answers to form
     """
     permission_classes = (IsAuthenticated, IsAdminUser)
@@ -233,6 +505,9 @@ class FormAnswerListView(ListAPIView):
     serializer_class = FormAnswerSerializer
     queryset = FormAnswer.objects.all()
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('pk',)
+
 
 class FormAnswerRUDView(RetrieveUpdateDestroyAPIView):
     """ Change form answer
@@ -240,3 +515,9 @@ class FormAnswerRUDView(RetrieveUpdateDestroyAPIView):
     serializer_class = FormAnswerSerializer
     queryset = FormAnswer.objects.all()
 
+    def perform_destroy(self, instance):
+        # Answers of submitted forms are counted in survey stats
+        if instance.form.submitted:
+            raise ValidationError('form is already submitted')
+        super().perform_destroy(instance)
+
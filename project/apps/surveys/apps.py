@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SurveysConfig(AppConfig):
     name = 'apps.surveys'
+
+    def ready(self):
+        from apps.surveys import checks, signals  # noqa: F401
@@ -0,0 +1,175 @@
+""" ASGI application serving the high-fanout respondent reads
+(survey and questions of a form) without a worker thread per request.
+
+Django 2.2 has neither async views nor async ORM, so the handlers here
+await database and cache calls run on a bounded thread pool, and
+survey, questions and answers of a not cached definition are loaded
+concurrently. Every other request is served by the WSGI application
+on the same pool. That includes answer writes and form submits: each of
+them is one transaction on one connection, so it holds a thread anyway,
+and nginx sends them to `web` (gunicorn) instead.
+Responses get headers of the WSGI views and middlewares from the same
+helpers (`patch_conditional_headers`, `CorsMiddleware`).
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from corsheaders.middleware import CorsMiddleware
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.surveys.api.v1.serializers import QuestionSerializer, SurveySerializer
+from apps.surveys.cache import (
+    build_definition,
+    cache_definition,
+    get_cached_definition,
+    get_form_survey_id,
+    load_answers,
+    load_questions,
+    load_survey,
+)
+from apps.utils.asgi import (
+    WSGIFallback,
+    build_environ,
+    handle_lifespan,
+    run_with_connections,
+    send_response,
+)
+from apps.utils.middleware import QueryTimer, format_server_timing, registry
+from apps.utils.views import make_etag, patch_conditional_headers
+
+
+def _run_timed(timer: QueryTimer, function, args: tuple):
+    with connection.execute_wrapper(timer):
+        return run_with_connections(function, *args)
+
+
+class RespondentApplication:
+    # URL names served here, other URLs go to WSGI application
+    handlers = {
+        'form_survey': 'get_form_survey',
+        'form_survey_questions': 'get_form_survey_questions',
+    }
+
+    def __init__(self, wsgi_application, threads: int):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+        self.fallback = WSGIFallback(wsgi_application, self.executor)
+        self.renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        self.cors = CorsMiddleware()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await handle_lifespan(receive, send)
+            return
+
+        resolver_match = self.resolve(scope)
+        if resolver_match is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timer = QueryTimer(settings.REQUEST_METRICS['SLOW_QUERY_MS'])
+        request = Request(WSGIRequest(build_environ(scope, b'')))
+        handler = getattr(self, self.handlers[resolver_match.url_name])
+        etag = None
+        not_modified = None
+        try:
+            # Same validators as `ConditionalGetMixin` of the WSGI views
+            state, serialize = await handler(request, timer, **resolver_match.kwargs)
+            etag = make_etag(state, self.renderer.format)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is None:
+                status, data = 200, serialize()
+        except Http404:
+            status, data = 404, {'detail': 'Not found.'}
+        except APIException as exc:
+            status = exc.status_code
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+
+        render_started = time.perf_counter()
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = HttpResponse(
+                self.renderer.render(data), status=status, content_type=self.renderer.media_type
+            )
+            response['Content-Length'] = str(len(response.content))
+        render_duration = time.perf_counter() - render_started
+        duration = time.perf_counter() - started
+
+        registry.observe(
+            resolver_match.view_name, duration, timer.count, timer.duration, render_duration
+        )
+        # Same headers as WSGI views and middlewares set,
+        # DRF views vary by `Accept` for renderer negotiation
+        patch_vary_headers(response, ['Accept'])
+        if etag is not None:
+            patch_conditional_headers(response, etag, max_age=settings.FORM_SURVEY_MAX_AGE)
+        self.cors.process_response(request._request, response)
+        if settings.REQUEST_METRICS['SERVER_TIMING']:
+            response['Server-Timing'] = format_server_timing(timer, render_duration, duration)
+        await send_response(send, response.status_code, response.content, list(response.items()))
+
+    def resolve(self, scope: dict):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None
+        try:
+            resolver_match = resolve(scope['path'])
+        except Resolver404:
+            return None
+        if resolver_match.url_name not in self.handlers:
+            return None
+        return resolver_match
+
+    async def run(self, timer: QueryTimer, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_timed, timer, function, args)
+
+    async def get_survey_definition(self, timer: QueryTimer, form_pk: str):
+        survey_id = await self.run(timer, get_form_survey_id, form_pk)
+        if survey_id is None:
+            raise Http404
+
+        version, definition = await self.run(timer, get_cached_definition, survey_id)
+        if definition is None:
+            survey, questions, answers = await asyncio.gather(
+                self.run(timer, load_survey, survey_id),
+                self.run(timer, load_questions, survey_id),
+                self.run(timer, load_answers, survey_id),
+            )
+            definition = build_definition(version, survey, questions, answers)
+            if definition is None:
+                raise Http404
+            await self.run(timer, cache_definition, survey_id, definition)
+        return definition
+
+    # Handlers return state of the response for its ETag and 
+    # a function building the data, called if client has no fresh copy
+
+    async def get_form_survey(self, request: Request, timer: QueryTimer, pk: str):
+        definition = await self.get_survey_definition(timer, pk)
+
+        def serialize():
+            return SurveySerializer(definition.survey, context={'request': request}).data
+
+        return (definition.version, definition.survey.is_active()), serialize
+
+    async def get_form_survey_questions(self, request: Request, timer: QueryTimer, pk: str):
+        definition = await self.get_survey_definition(timer, pk)
+
+        def serialize():
+            paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+            page = paginator.paginate_queryset(definition.questions, request)
+            serializer = QuestionSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data).data
+
+        return definition.version, serialize
@@ -0,0 +1,268 @@
+""" Cache of survey definitions (survey, questions and their answers).
+
+Every survey has a version token stored in the shared Django cache,
+it is replaced on each save/delete of the survey, its questions or answers
+(see `signals.py`). Definitions are cached by `(survey id, version)` in an
+in-process LRU and, optionally, in the shared cache, so stale entries
+are never read and simply expire.
+
+The list of active surveys is cached the same way with one version
+for all surveys.
+"""
+import hashlib
+import math
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from apps.utils.cache import LRUCache
+from apps.surveys.models import Survey, Question, Answer, Form
+
+
+# `answer_pks` maps question ids to frozensets of their answer ids
+SurveyDefinition = namedtuple('SurveyDefinition', ['version', 'survey', 'questions', 'answer_pks'])
+# `expires_at` is the next start or end of any survey, None if there is no such
+ActiveSurveys = namedtuple('ActiveSurveys', ['etag', 'surveys', 'expires_at'])
+
+_ACTIVE_VERSION_KEY = 'surveys:active_version'
+
+_local_cache = LRUCache(settings.SURVEY_DEFINITION_CACHE['LOCAL_SIZE'])
+
+
+def _shared_cache():
+    return caches[settings.SURVEY_DEFINITION_CACHE['ALIAS']]
+
+
+def _version_key(survey_id: int) -> str:
+    return f'surveys:definition_version:{survey_id}'
+
+
+def _definition_key(survey_id: int, version: str) -> str:
+    # Prefix changes with `SurveyDefinition` fields
+    return f'surveys:definition_v2:{survey_id}:{version}'
+
+
+def _results_version_key(survey_id: int) -> str:
+    return f'surveys:results_version:{survey_id}'
+
+
+def _form_survey_key(form_pk) -> str:
+    return f'surveys:form_survey:{form_pk}'
+
+
+def _get_token(key: str) -> str:
+    cache = _shared_cache()
+    token = cache.get(key)
+    if token is None:
+        # `add` keeps a token set by a concurrent request
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        token = cache.get(key)
+    return token
+
+
+def get_version(survey_id: int) -> str:
+    return _get_token(_version_key(survey_id))
+
+
+def bump_version(survey_id: int):
+    """ Make cached definitions of a survey outdated.
+    A new random token is used, so a version is never reused
+    even if the previous one was evicted.
+    """
+    _shared_cache().set(_version_key(survey_id), uuid.uuid4().hex, timeout=None)
+
+
+def get_results_version(survey_id: int) -> str:
+    """ Version of submitted forms of a survey, see `analytics.py`
+    """
+    return _get_token(_results_version_key(survey_id))
+
+
+def bump_results_version(survey_id: int):
+    _shared_cache().set(_results_version_key(survey_id), uuid.uuid4().hex, timeout=None)
+
+
+def get_survey_definition(survey_id: int) -> SurveyDefinition:
+    """ Return cached definition of a survey
+    or None if survey does not exist.
+    Questions are ordered by pk and have `answers` prefetched.
+    """
+    version, definition = get_cached_definition(survey_id)
+    if definition is None:
+        definition = build_definition(
+            version,
+            load_survey(survey_id),
+            load_questions(survey_id),
+            load_answers(survey_id)
+        )
+        if definition is not None:
+            cache_definition(survey_id, definition)
+    return definition
+
+
+def get_cached_definition(survey_id: int) -> tuple:
+    """ Return current version of survey and its cached definition or None
+    """
+    version = get_version(survey_id)
+    definition = _local_cache.get((survey_id, version))
+    if definition is not None:
+        return version, definition
+
+    if settings.SURVEY_DEFINITION_CACHE['SHARED']:
+        definition = _shared_cache().get(_definition_key(survey_id, version))
+        if definition is not None:
+            _local_cache.set((survey_id, version), definition)
+    return version, definition
+
+
+def cache_definition(survey_id: int, definition: SurveyDefinition):
+    _local_cache.set((survey_id, definition.version), definition)
+    if settings.SURVEY_DEFINITION_CACHE['SHARED']:
+        _shared_cache().set(
+            _definition_key(survey_id, definition.version),
+            definition,
+            timeout=settings.SURVEY_DEFINITION_CACHE['TIMEOUT']
+        )
+
+
+# Loaders are independent, so they can be run concurrently
+def load_survey(survey_id: int) -> Survey:
+    return Survey.objects.filter(pk=survey_id).first()
+
+
+def load_questions(survey_id: int) -> list:
+    return list(Question.objects.filter(survey_id=survey_id).order_by('pk'))
+
+
+def load_answers(survey_id: int) -> list:
+    return list(Answer.objects.filter(question__survey_id=survey_id).order_by('pk'))
+
+
+def build_definition(version: str, survey: Survey, questions: list, answers: list) -> SurveyDefinition:
+    """ Attach answers to questions as prefetched `answers`
+    """
+    if survey is None:
+        return None
+
+    question_answers = {question.pk: [] for question in questions}
+    for answer in answers:
+        if answer.question_id in question_answers:
+            question_answers[answer.question_id].append(answer)
+
+    for question in questions:
+        # Same as `prefetch_related` does
+        queryset = question.answers.all()
+        queryset._result_cache = question_answers[question.pk]
+        queryset._prefetch_done = True
+        question._prefetched_objects_cache = {'answers': queryset}
+
+    answer_pks = {
+        question_pk: frozenset(answer.pk for answer in answers_of_question)
+        for question_pk, answers_of_question in question_answers.items()
+    }
+    return SurveyDefinition(version, survey, questions, answer_pks)
+
+
+def get_active_surveys() -> ActiveSurveys:
+    """ Return active surveys ordered by pk.
+    The list can change only when a survey starts, ends or is changed,
+    so it is cached until the next start or end date of any survey
+    and its version is bumped on every survey save and delete.
+    """
+    version = _get_token(_ACTIVE_VERSION_KEY)
+    now = timezone.now()
+
+    active = _local_cache.get(('active', version))
+    if active is None and settings.SURVEY_DEFINITION_CACHE['SHARED']:
+        active = _shared_cache().get(_active_key(version))
+    if active is not None and (active.expires_at is None or now < active.expires_at):
+        return active
+
+    active = _load_active_surveys(now)
+    _local_cache.set(('active', version), active)
+    if settings.SURVEY_DEFINITION_CACHE['SHARED']:
+        timeout = settings.SURVEY_DEFINITION_CACHE['TIMEOUT']
+        if active.expires_at is not None:
+            timeout = min(timeout, math.ceil((active.expires_at - now).total_seconds()))
+        _shared_cache().set(_active_key(version), active, timeout=max(timeout, 1))
+    return active
+
+
+def bump_active_version():
+    _shared_cache().set(_ACTIVE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _active_key(version: str) -> str:
+    return f'surveys:active:{version}'
+
+
+def _load_active_surveys(now) -> ActiveSurveys:
+    surveys = list(
+        Survey.objects
+        .filter(start_date__lt=now, end_date__gt=now)
+        .order_by('pk')
+    )
+    # A survey starting right now becomes active after `now`
+    boundaries = Survey.objects.aggregate(
+        next_start=Min('start_date', filter=Q(start_date__gte=now)),
+        next_end=Min('end_date', filter=Q(end_date__gt=now))
+    )
+    expires_at = min(
+        (boundary for boundary in boundaries.values() if boundary is not None),
+        default=None
+    )
+
+    # Same content gives the same ETag in every process
+    content = repr([
+        (survey.pk, survey.title, survey.start_date.isoformat(), survey.end_date.isoformat())
+        for survey in surveys
+    ])
+    etag = hashlib.md5(content.encode()).hexdigest()
+    return ActiveSurveys(etag, surveys, expires_at)
+
+
+def get_form_survey_id(form_pk) -> int:
+    """ Return survey id of a form or None if form does not exist.
+    Form survey never changes, so it is cached without versions.
+    """
+    form_pk = str(form_pk)
+    local_key = ('form_survey', form_pk)
+
+    survey_id = _local_cache.get(local_key)
+    if survey_id is not None:
+        return survey_id
+
+    cache = _shared_cache()
+    survey_id = cache.get(_form_survey_key(form_pk))
+    if survey_id is None:
+        try:
+            survey_id = (
+                Form.objects
+                .filter(pk=form_pk)
+                .values_list('survey_id', flat=True)
+                .first()
+            )
+        except ValidationError:
+            # Not a valid UUID
+            return None
+        if survey_id is None:
+            return None
+        cache.set(
+            _form_survey_key(form_pk),
+            survey_id,
+            timeout=settings.SURVEY_DEFINITION_CACHE['TIMEOUT']
+        )
+
+    _local_cache.set(local_key, survey_id)
+    return survey_id
+
+
+def forget_form(form_pk):
+    form_pk = str(form_pk)
+    _local_cache.delete(('form_survey', form_pk))
+    _shared_cache().delete(_form_survey_key(form_pk))
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from apps.utils.cache import is_shared_cache
+
+
+@register(Tags.caches)
+def check_drafts_cache(app_configs, **kwargs):
+    """ Drafts saved by one process should be seen by others,
+    or they are disabled
+    """
+    alias = settings.SURVEY_DRAFTS['ALIAS']
+    if not is_shared_cache(alias):
+        backend = settings.CACHES[alias]['BACKEND']
+        return [Warning(
+            f'Form drafts are disabled, {backend} is not shared between processes.',
+            hint='Set SURVEY_DRAFTS_ALIAS to a Redis, Memcached or file based cache.',
+            id='surveys.W001',
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_definition_cache(app_configs, **kwargs):
+    """ Versions bumped by one process should be seen by others,
+    or they serve stale definitions, active surveys and analytics
+    """
+    alias = settings.SURVEY_DEFINITION_CACHE['ALIAS']
+    if not is_shared_cache(alias):
+        backend = settings.CACHES[alias]['BACKEND']
+        return [Warning(
+            f'Survey versions are stored in {backend} which is not shared between processes.',
+            hint='Set SURVEY_CACHE_ALIAS to a Redis or Memcached cache, e.g. CACHE_BACKEND of .env.prod-sample.',
+            id='surveys.W002',
+        )]
+    return []
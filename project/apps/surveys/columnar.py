@@ -0,0 +1,393 @@
+""" Columnar files of submitted forms of closed surveys.
+
+Responses to a survey don't change after its `end_date`, so
+`build_survey_snapshot` writes them to `SURVEY_SNAPSHOTS['ROOT']/<survey id>/`
+as NumPy arrays, one row per form ordered by form id:
+- `forms`: form ids as 16 bytes,
+- `submitted_dates`: microseconds since epoch,
+- `first_names`, `last_names`: indexes of the string table, -1 without respondent,
+- `ages`: respondent ages, -1 without respondent,
+- `q<question id>_texts`: indexes of answer texts, -1 if not answered,
+- `q<question id>_chosen`: chosen answers of CHOICE and CHECKBOX
+  questions, a bit per answer (see `numpy.packbits`),
+- `strings`, `string_offsets`: UTF-8 string table.
+
+Arrays are opened with `mmap_mode='r'`, so processes reading a snapshot
+share its pages in the OS page cache. Stats, export and analytics read
+a snapshot instead of the database while it matches the survey
+definition (see `get_survey_snapshot`). Snapshot is deleted when a form
+of the survey is submitted or deleted, answers or respondent of a form
+change.
+"""
+import itertools
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, Count, Max
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from apps.surveys.cache import SurveyDefinition
+from apps.surveys.models import Question, Form, FormAnswer
+from apps.utils.arrays import positions
+from apps.utils.cache import LRUCache
+
+
+FORMAT_VERSION = 1
+# No respondent, not answered or no date
+MISSING = -1
+_NO_DATE = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_local_cache = LRUCache(settings.SURVEY_SNAPSHOTS['LOCAL_SIZE'])
+
+
+def _survey_path(survey_id: int) -> str:
+    return os.path.join(settings.SURVEY_SNAPSHOTS['ROOT'], str(survey_id))
+
+
+def _meta_path(survey_id: int) -> str:
+    return os.path.join(_survey_path(survey_id), 'meta.json')
+
+
+def _layout(questions: list) -> list:
+    # Same as stored in JSON
+    return [
+        [question.pk, question.type, [answer.pk for answer in question.answers.all()]]
+        for question in questions
+    ]
+
+
+class SurveySnapshot:
+    """ Memory mapped arrays of a survey snapshot
+    """
+    def __init__(self, path: str, meta: dict):
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        self.forms_amount = meta['forms_amount']
+        self.form_ids = load('forms')
+        self.submitted_dates = load('submitted_dates')
+        self.first_names = load('first_names')
+        self.last_names = load('last_names')
+        self.ages = load('ages')
+        self._strings = load('strings')
+        self._string_offsets = load('string_offsets')
+
+        self.answer_pks = {
+            question_pk: answer_pks
+            for question_pk, question_type, answer_pks in meta['questions']
+            if question_type != Question.TEXT
+        }
+        self.texts = {
+            question_pk: load(f'q{question_pk}_texts')
+            for question_pk, _, _ in meta['questions']
+        }
+        # `forms_amount x ceil(answers / 8)` uint8 matrices
+        self.packed_chosen = {
+            question_pk: load(f'q{question_pk}_chosen')
+            for question_pk in self.answer_pks
+        }
+
+    def string(self, index: int) -> str:
+        if index == MISSING:
+            return None
+        start, end = self._string_offsets[index:index + 2]
+        return self._strings[start:end].tobytes().decode()
+
+    def chosen(self, question_pk: int, start: int = 0, end: int = None) -> np.ndarray:
+        """ `forms x answers` bool matrix of answers chosen in forms
+        """
+        return np.unpackbits(
+            self.packed_chosen[question_pk][start:end],
+            axis=1,
+            count=len(self.answer_pks[question_pk])
+        ).view(bool)
+
+    def iter_responses(self, questions: list, chunk_size: int = 2000):
+        """ Same as `export.iter_survey_responses`
+        """
+        answer_texts = {
+            answer.pk: answer.text
+            for question in questions
+            for answer in question.answers.all()
+        }
+        for start in range(0, self.forms_amount, chunk_size):
+            end = start + chunk_size
+            # Columns of a chunk as lists, reading items of arrays is slow
+            form_columns = zip(
+                [uuid.UUID(bytes=form_id.tobytes()) for form_id in self.form_ids[start:end]],
+                [_to_datetime(value) for value in self.submitted_dates[start:end].tolist()],
+                [self.string(index) for index in self.first_names[start:end].tolist()],
+                [self.string(index) for index in self.last_names[start:end].tolist()],
+                [None if age == MISSING else age for age in self.ages[start:end].tolist()],
+            )
+            answer_columns = [
+                self._answer_column(question, answer_texts, start, end)
+                for question in questions
+            ]
+            # Without questions every form has no answers
+            answer_rows = zip(*answer_columns) if answer_columns else itertools.repeat(())
+            for form, answers in zip(form_columns, answer_rows):
+                yield form, {
+                    question.pk: answer
+                    for question, answer in zip(questions, answers)
+                    if answer is not None
+                }
+
+    def _answer_column(self, question: Question, answer_texts: dict, start: int, end: int) -> list:
+        # Answers of forms to a question, None if not answered
+        texts = self.texts[question.pk][start:end].tolist()
+        if question.type == Question.TEXT:
+            return [None if index == MISSING else self.string(index) for index in texts]
+
+        answer_pks = np.array(self.answer_pks[question.pk])
+        chosen_texts = [
+            [answer_texts.get(pk, '') for pk in answer_pks[chosen]]
+            for chosen in self.chosen(question.pk, start, end)
+        ]
+        if question.type == Question.CHECKBOX:
+            return [
+                None if index == MISSING else chosen
+                for index, chosen in zip(texts, chosen_texts)
+            ]
+        return [
+            None if index == MISSING else chosen[0] if chosen else self.string(index)
+            for index, chosen in zip(texts, chosen_texts)
+        ]
+
+
+def _to_datetime(microseconds: int) -> datetime:
+    if microseconds == _NO_DATE:
+        return None
+    return _EPOCH + timedelta(microseconds=microseconds)
+
+
+def _read_meta(survey_id: int) -> dict:
+    try:
+        with open(_meta_path(survey_id), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def get_survey_snapshot(definition: SurveyDefinition) -> SurveySnapshot:
+    """ Return snapshot of a closed survey or None if it isn't built
+    or survey, its questions or answers were changed after build
+    """
+    survey = definition.survey
+    if survey.end_date > timezone.now():
+        return None
+
+    meta = _read_meta(survey.pk)
+    if (
+        meta is None
+        or meta['format'] != FORMAT_VERSION
+        or meta['end_date'] != survey.end_date.isoformat()
+        or meta['questions'] != _layout(definition.questions)
+    ):
+        return None
+
+    key = (survey.pk, meta['directory'])
+    snapshot = _local_cache.get(key)
+    if snapshot is None:
+        try:
+            snapshot = SurveySnapshot(os.path.join(_survey_path(survey.pk), meta['directory']), meta)
+        except (OSError, ValueError):
+            # Replaced or deleted while being opened
+            return None
+        _local_cache.set(key, snapshot)
+    return snapshot
+
+
+def _forms_state(forms) -> tuple:
+    # Changes when forms are submitted or deleted
+    state = forms.order_by().aggregate(amount=Count('pk'), updated_at=Max('updated_at'))
+    return state['amount'], state['updated_at']
+
+
+def build_survey_snapshot(definition: SurveyDefinition) -> dict:
+    """ Write submitted forms of a closed survey to a new snapshot
+    replacing the previous one. Return metadata of the snapshot.
+    Raises `ValueError` if survey isn't closed or its forms changed
+    while being read.
+    """
+    survey = definition.survey
+    if survey.end_date > timezone.now():
+        raise ValueError(f'survey {survey.pk} is not closed')
+
+    forms_queryset = Form.objects.filter(survey_id=survey.pk, submitted=True)
+    state = _forms_state(forms_queryset)
+    # Server-side cursors live in a transaction, see `export.iter_survey_responses`
+    with transaction.atomic():
+        columns = _read_columns(survey.pk, definition.questions)
+
+    directory = uuid.uuid4().hex
+    path = os.path.join(_survey_path(survey.pk), directory)
+    os.makedirs(path)
+    for name, array in columns.items():
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+    meta = {
+        'format': FORMAT_VERSION,
+        'survey': survey.pk,
+        'end_date': survey.end_date.isoformat(),
+        'forms_amount': len(columns['forms']),
+        'questions': _layout(definition.questions),
+        'directory': directory,
+        'built_at': timezone.now().isoformat(),
+    }
+    # Readers see either the previous or the new metadata
+    meta_path = _meta_path(survey.pk)
+    with open(f'{meta_path}.{directory}', 'w', encoding='utf-8') as file:
+        json.dump(meta, file)
+    os.replace(f'{meta_path}.{directory}', meta_path)
+
+    if _forms_state(forms_queryset) != state:
+        delete_survey_snapshot(survey.pk)
+        raise ValueError(f'forms of survey {survey.pk} changed while building snapshot')
+
+    # Processes which mapped previous files keep reading them until closed
+    for name in os.listdir(_survey_path(survey.pk)):
+        if name not in (directory, 'meta.json'):
+            shutil.rmtree(os.path.join(_survey_path(survey.pk), name), ignore_errors=True)
+    return meta
+
+
+def _read_columns(survey_id: int, questions: list) -> dict:
+    strings = {}
+
+    def string_index(value):
+        if value is None:
+            return MISSING
+        return strings.setdefault(value, len(strings))
+
+    # Ids are read as text, UUID objects would take most of reading time
+    forms = list(
+        Form.objects
+        .filter(survey_id=survey_id, submitted=True)
+        .annotate(key=Cast('pk', CharField()))
+        .order_by('pk')
+        .values_list(
+            'key',
+            'submitted_date',
+            'respondent__first_name',
+            'respondent__last_name',
+            'respondent__age'
+        )
+    )
+    form_keys = [form[0] for form in forms]
+    columns = {
+        'forms': np.array(
+            [uuid.UUID(key).bytes for key in form_keys], dtype='S16'
+        ).view(np.uint8).reshape(len(forms), 16),
+        'submitted_dates': np.array([
+            _NO_DATE if date is None else (date - _EPOCH) // timedelta(microseconds=1)
+            for _, date, _, _, _ in forms
+        ], dtype=np.int64),
+        'first_names': np.array([string_index(form[2]) for form in forms], dtype=np.int32),
+        'last_names': np.array([string_index(form[3]) for form in forms], dtype=np.int32),
+        'ages': np.array([MISSING if form[4] is None else form[4] for form in forms], dtype=np.int16),
+    }
+
+    question_pks = [question.pk for question in questions]
+    texts = np.full((len(forms), len(questions)), MISSING, dtype=np.int32)
+    answers = list(
+        FormAnswer.objects
+        .filter(form__survey_id=survey_id, form__submitted=True)
+        .annotate(form_key=Cast('form_id', CharField()))
+        .values_list('form_key', 'question_id', 'text', 'choice_id')
+        .iterator()
+    )
+    choice_cells = []
+    if forms and answers and question_pks:
+        answer_forms, answer_questions, answer_texts, answer_choices = zip(*answers)
+        rows = positions(form_keys, answer_forms)
+        question_columns = positions(question_pks, answer_questions)
+        found = (rows >= 0) & (question_columns >= 0)
+        text_indexes = np.array([string_index(text) for text in answer_texts], dtype=np.int32)
+        texts[rows[found], question_columns[found]] = text_indexes[found]
+
+        choice_cells = [
+            (form_key, choice_pk) for form_key, choice_pk in zip(answer_forms, answer_choices)
+            if choice_pk is not None
+        ]
+
+    for column, question_pk in enumerate(question_pks):
+        columns[f'q{question_pk}_texts'] = np.ascontiguousarray(texts[:, column])
+    _, chosen = read_chosen(survey_id, questions, form_keys, choice_cells)
+    for question_pk, packed in chosen.items():
+        columns[f'q{question_pk}_chosen'] = packed
+
+    encoded = [value.encode() for value in strings]
+    columns['strings'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    columns['string_offsets'] = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+    return columns
+
+
+def read_chosen(survey_id: int, questions: list, form_keys: list, choice_cells: list = None) -> tuple:
+    """ Read answers chosen in submitted forms of a survey.
+    Return answer ids by question and chosen answers by question, packed bits
+    of rows in order of `form_keys` (form ids as text) and columns of its answers.
+    Chosen answers of CHOICE questions are read unless given as
+    `choice_cells`, pairs of form key and answer id.
+    """
+    answer_pks = {
+        question.pk: [answer.pk for answer in question.answers.all()]
+        for question in questions
+        if question.type != Question.TEXT
+    }
+    # Columns of all answers in one matrix, split per question below
+    columns = []
+    bounds = {}
+    for question_pk, pks in answer_pks.items():
+        bounds[question_pk] = (len(columns), len(columns) + len(pks))
+        columns += pks
+
+    querysets = [
+        FormAnswer.choices.through.objects
+        .filter(formanswer__form__survey_id=survey_id, formanswer__form__submitted=True)
+        .annotate(form_key=Cast('formanswer__form_id', CharField()))
+        .values_list('form_key', 'answer_id')
+    ]
+    if choice_cells is None:
+        choice_cells = []
+        querysets.append(
+            FormAnswer.objects
+            .filter(form__survey_id=survey_id, form__submitted=True, choice__isnull=False)
+            .annotate(form_key=Cast('form_id', CharField()))
+            .values_list('form_key', 'choice_id')
+        )
+    # Server-side cursors live in a transaction, see `export.iter_survey_responses`
+    with transaction.atomic():
+        cells = list(choice_cells) + [cell for queryset in querysets for cell in queryset.iterator()]
+
+    matrix = np.zeros((len(form_keys), len(columns)), dtype=bool)
+    if cells and form_keys and columns:
+        cell_forms, cell_answers = zip(*cells)
+        rows = positions(form_keys, cell_forms)
+        cell_columns = positions(columns, cell_answers)
+        # Forms submitted or answers added after forms were read are skipped
+        found = (rows >= 0) & (cell_columns >= 0)
+        matrix[rows[found], cell_columns[found]] = True
+    chosen = {
+        question_pk: np.packbits(matrix[:, start:end], axis=1)
+        for question_pk, (start, end) in bounds.items()
+    }
+    return answer_pks, chosen
+
+
+def delete_survey_snapshot(survey_id: int):
+    path = _survey_path(survey_id)
+    try:
+        os.remove(_meta_path(survey_id))
+    except FileNotFoundError:
+        if not os.path.isdir(path):
+            return
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,53 @@
+""" Buffer of not submitted answers (drafts) of forms.
+
+Every draft is stored in the cache by `(form, question)`, so concurrent
+saves of different questions don't overwrite each other. Drafts are
+written to `FormAnswer` on form submit or by `flush_form_drafts` command.
+Drafts are disabled if the cache is not shared by all processes
+(Redis, Memcached), a draft saved by one worker would be lost to others.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.utils.cache import is_shared_cache
+
+
+def drafts_enabled() -> bool:
+    return is_shared_cache(settings.SURVEY_DRAFTS['ALIAS'])
+
+
+def _drafts_cache():
+    return caches[settings.SURVEY_DRAFTS['ALIAS']]
+
+
+def _draft_key(form_pk, question_pk: int) -> str:
+    return f'surveys:draft:{form_pk}:{question_pk}'
+
+
+def save_drafts(form_pk, drafts: list):
+    """ Store drafts, which are dicts with `question`, `text`,
+    `choice` and `choices` pks
+    """
+    _drafts_cache().set_many(
+        {_draft_key(form_pk, draft['question']): draft for draft in drafts},
+        timeout=settings.SURVEY_DRAFTS['TIMEOUT']
+    )
+
+
+def get_drafts(form_pk, question_pks: list) -> list:
+    """ Return drafts of form ordered like `question_pks`
+    """
+    stored = _drafts_cache().get_many([
+        _draft_key(form_pk, question_pk) for question_pk in question_pks
+    ])
+    return [
+        stored[_draft_key(form_pk, question_pk)]
+        for question_pk in question_pks
+        if _draft_key(form_pk, question_pk) in stored
+    ]
+
+
+def delete_drafts(form_pk, question_pks: list):
+    _drafts_cache().delete_many([
+        _draft_key(form_pk, question_pk) for question_pk in question_pks
+    ])
@@ -0,0 +1,151 @@
+import csv
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.columnar import get_survey_snapshot
+from apps.surveys.models import Question, Form
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+FORM_COLUMNS = ('form', 'submitted_date', 'first_name', 'last_name', 'age')
+
+
+def iter_survey_responses(survey_id: int, questions: list, chunk_size: int = 2000):
+    """ Yield `(form, answers)` for every submitted form of a survey,
+    where `form` is a tuple of `FORM_COLUMNS` values and `answers`
+    maps question id to answer text (list of texts for CHECKBOX).
+
+    Forms with their answers are read with one server-side cursor
+    ordered by form, so memory usage doesn't depend on amount of forms.
+    Answers are joined to forms, forms without answers are yielded too.
+    """
+    checkbox_questions = {
+        question.pk for question in questions
+        if question.type == Question.CHECKBOX
+    }
+    rows = (
+        Form.objects
+        .filter(survey_id=survey_id, submitted=True)
+        .order_by('pk', 'answers__question_id', 'answers__choices__id')
+        .values_list(
+            'pk',
+            'submitted_date',
+            'respondent__first_name',
+            'respondent__last_name',
+            'respondent__age',
+            'answers__question_id',
+            'answers__text',
+            'answers__choice__text',
+            'answers__choices__text'
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    # Cursor of `iterator` lives in a transaction, so it works behind
+    # PgBouncer in transaction pooling mode
+    with transaction.atomic():
+        form = None
+        answers = {}
+        for row in rows:
+            row_form, (question_id, text, choice, checkbox_choice) = row[:5], row[5:]
+            if form is not None and row_form[0] != form[0]:
+                yield form, answers
+                answers = {}
+            form = row_form
+
+            if question_id is None:
+                # Form without answers
+                continue
+            if question_id in checkbox_questions:
+                choices = answers.setdefault(question_id, [])
+                if checkbox_choice is not None:
+                    choices.append(checkbox_choice)
+            else:
+                answers[question_id] = choice if choice is not None else text
+
+        if form is not None:
+            yield form, answers
+
+
+def iter_export(survey_id: int, export_format: str, chunk_size: int = 2000):
+    """ Yield chunks of exported survey responses.
+    Raises `KeyError` if format is unknown or `LookupError` if survey doesn't exist.
+    """
+    write_rows = {
+        'csv': _iter_csv,
+        'ndjson': _iter_ndjson,
+    }[export_format]
+
+    definition = get_survey_definition(survey_id)
+    if definition is None:
+        raise LookupError(f'survey {survey_id} does not exist')
+
+    snapshot = get_survey_snapshot(definition)
+    if snapshot is not None:
+        responses = snapshot.iter_responses(definition.questions, chunk_size)
+    else:
+        responses = iter_survey_responses(survey_id, definition.questions, chunk_size)
+    return _buffered(write_rows(definition.questions, responses))
+
+
+class _Echo:
+    """ File-like object which returns written value instead of storing it
+    """
+    def write(self, value):
+        return value
+
+
+def _iter_csv(questions: list, responses):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(
+        list(FORM_COLUMNS) + [f'{question.pk}. {question.text}' for question in questions]
+    )
+    for form, answers in responses:
+        values = []
+        for question in questions:
+            value = answers.get(question.pk, '')
+            if isinstance(value, list):
+                value = '; '.join(value)
+            values.append(value)
+        form_id, submitted_date, *respondent = form
+        yield writer.writerow(
+            [form_id, submitted_date.isoformat()] + respondent + values
+        )
+
+
+def _iter_ndjson(questions: list, responses):
+    for form, answers in responses:
+        row = dict(zip(FORM_COLUMNS, form))
+        row['answers'] = {str(question_id): value for question_id, value in answers.items()}
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def _buffered(lines, size: int = 64 * 1024, rows: int = 500, seconds: float = 1.0):
+    # Join small lines so streaming doesn't make a write per form.
+    # First line (the CSV header) is sent at once, so the client
+    # sees the download start before rows are read
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+
+    chunk = []
+    chunk_size = 0
+    flushed = time.monotonic()
+    for line in lines:
+        chunk.append(line)
+        chunk_size += len(line)
+        if chunk_size >= size or len(chunk) >= rows or time.monotonic() - flushed >= seconds:
+            yield ''.join(chunk)
+            chunk = []
+            chunk_size = 0
+            flushed = time.monotonic()
+    if chunk:
+        yield ''.join(chunk)
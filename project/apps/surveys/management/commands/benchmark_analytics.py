@@ -0,0 +1,108 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from apps.surveys.analytics import load_responses
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.models import Question, FormAnswer
+from apps.surveys.seed import seed
+from apps.utils.benchmark import format_table, summarize
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time loading a seeded survey into `SurveyResponses` and computing '
+        'analytics on it, compared with an ORM query of the same crosstab. '
+        'Seeded data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forms', type=int, default=20000, help='Submitted forms')
+        parser.add_argument('--questions', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per computation')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                (survey_id, ) = seed(
+                    surveys=1, questions=options['questions'],
+                    forms=options['forms'], submitted_ratio=1
+                )
+                rows = self.run(survey_id, options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(format_table(['computation', 'runs', 'p50 ms', 'max ms'], rows))
+
+    def run(self, survey_id: int, repeat: int) -> list:
+        definition = get_survey_definition(survey_id)
+        choice_questions = [
+            question.pk for question in definition.questions
+            if question.type == Question.CHOICE
+        ]
+        checkbox_questions = [
+            question.pk for question in definition.questions
+            if question.type == Question.CHECKBOX
+        ]
+        if len(choice_questions) < 2 or not checkbox_questions:
+            raise CommandError('survey should have 2 CHOICE questions and a CHECKBOX one, add questions')
+        question_pk, by_question_pk = choice_questions[:2]
+        checkbox_pk = checkbox_questions[0]
+
+        responses = load_responses(survey_id, definition.questions)
+        mask = responses.mask()
+        crosstab = responses.crosstab(question_pk, by_question_pk, mask)
+        if self.orm_crosstab(question_pk, by_question_pk) != self.to_counts(responses, crosstab, question_pk, by_question_pk):
+            raise CommandError('crosstab differs from ORM query')
+
+        computations = [
+            ('load responses', lambda: load_responses(survey_id, definition.questions)),
+            ('ORM crosstab', lambda: self.orm_crosstab(question_pk, by_question_pk)),
+            ('crosstab', lambda: responses.crosstab(question_pk, by_question_pk, mask)),
+            ('age crosstab', lambda: responses.age_crosstab(question_pk, [18, 25, 35, 45, 55, 65], mask)),
+            ('cooccurrence', lambda: responses.cooccurrence(checkbox_pk, mask)),
+            ('filtered distribution', lambda: responses.distribution(
+                question_pk, responses.mask(responses.answer_pks[checkbox_pk][:1], age_min=25)
+            )),
+        ]
+        rows = []
+        for name, compute in computations:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                compute()
+                timings.append(time.perf_counter() - started)
+            stats = summarize(timings)
+            rows.append([name, repeat, stats['p50'], stats['max']])
+        return rows
+
+    def orm_crosstab(self, question_pk: int, by_question_pk: int) -> dict:
+        return dict(
+            ((choice_pk, by_choice_pk), amount)
+            for choice_pk, by_choice_pk, amount in (
+                FormAnswer.objects
+                .filter(
+                    question_id=question_pk,
+                    form__submitted=True,
+                    form__answers__question_id=by_question_pk
+                )
+                .values_list('choice_id', 'form__answers__choice_id')
+                .annotate(Count('pk'))
+                .order_by()
+            )
+        )
+
+    def to_counts(self, responses, crosstab, question_pk: int, by_question_pk: int) -> dict:
+        return {
+            (choice_pk, by_choice_pk): int(crosstab[row, column])
+            for row, choice_pk in enumerate(responses.answer_pks[question_pk])
+            for column, by_choice_pk in enumerate(responses.answer_pks[by_question_pk])
+            if crosstab[row, column]
+        }
@@ -0,0 +1,176 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.api.v1.serializers import ClaimsTokenObtainPairSerializer
+from apps.accounts.models import CustomUser
+from apps.surveys.models import Survey, Question, Answer
+from apps.surveys.seed import delete_seeded, seed
+from apps.utils.benchmark import format_table, summarize
+
+
+# Max queries per request, checked with `--check`.
+# Admin is authenticated by token claims without a query.
+QUERY_BUDGETS = {
+    'active surveys': 2,
+    'start survey': 2,
+    'form survey': 4,
+    'form survey questions': 4,
+    # Both include answers snapshot rebuild under a lock of the form
+    'bulk answer': 14,
+    'submit form': 19,
+    'full form': 1,
+    # Same journey as one request
+    'fill survey': 20,
+    'list forms': 1,
+    'list form answers': 2,
+    'survey stats': 3,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run respondent journey (start survey, fetch questions, answer, submit) '
+        'and admin lists through the Django test client, report latency '
+        'percentiles and queries per endpoint. Requests run against committed data, '
+        'so on commit hooks are measured too. Created data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Journeys to run')
+        parser.add_argument('--questions', type=int, default=50, help='Questions of benchmarked survey')
+        parser.add_argument('--seed-surveys', type=int, default=5)
+        parser.add_argument('--seed-forms', type=int, default=1000, help='Forms per seeded survey')
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Fail if an endpoint makes more queries than its budget'
+        )
+
+    def handle(self, *args, **options):
+        self.timings = {}
+        self.queries = {}
+        self.stdout.write('Seeding...')
+        survey_ids = seed(surveys=options['seed_surveys'], forms=options['seed_forms'])
+        survey = self.create_survey(options['questions'])
+        admin = CustomUser.objects.create_user(
+            'benchmark-admin', password='benchmark', is_staff=True
+        )
+        try:
+            self.run(options['requests'], options['questions'], survey, admin)
+        finally:
+            delete_seeded(survey_ids + [survey.pk])
+            admin.delete()
+
+        rows = []
+        for name, timings in self.timings.items():
+            stats = summarize(timings)
+            rows.append([
+                name, len(timings),
+                stats['p50'], stats['p95'], stats['p99'], stats['max'],
+                max(self.queries[name]),
+            ])
+        self.stdout.write(format_table(
+            ['endpoint', 'requests', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'queries'],
+            rows
+        ))
+
+        if options['check']:
+            exceeded = [
+                f'{name}: {max(self.queries[name])} > {budget}'
+                for name, budget in QUERY_BUDGETS.items()
+                if name in self.queries and max(self.queries[name]) > budget
+            ]
+            if exceeded:
+                raise CommandError('Query budgets exceeded:\n' + '\n'.join(exceeded))
+
+    def run(self, requests: int, questions: int, survey: Survey, admin: CustomUser):
+        respondent = Client()
+        access_token = ClaimsTokenObtainPairSerializer.get_token(admin).access_token
+        admin_client = Client(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+
+        for _ in range(requests):
+            self.call(respondent, 'active surveys', 'get', reverse('all_active_surveys'))
+
+            response = self.call(
+                respondent, 'start survey', 'post',
+                reverse('start_survey', args=[survey.pk])
+            )
+            form_pk = response.json()['pk']
+
+            self.call(respondent, 'form survey', 'get', reverse('form_survey', args=[form_pk]))
+            response = self.call(
+                respondent, 'form survey questions', 'get',
+                reverse('form_survey_questions', args=[form_pk]),
+                {'page_size': questions}
+            )
+            answers = [
+                self.make_answer(question)
+                for question in response.json()['results']
+            ]
+            self.call(
+                respondent, 'bulk answer', 'post',
+                reverse('form_answers', args=[form_pk]), answers
+            )
+            self.call(respondent, 'submit form', 'put', reverse('form_submit', args=[form_pk]), {})
+            self.call(respondent, 'full form', 'get', reverse('form_full', args=[form_pk]))
+            self.call(
+                respondent, 'fill survey', 'post',
+                reverse('fill_survey', args=[survey.pk]), {'answers': answers}
+            )
+
+            self.call(admin_client, 'list forms', 'get', reverse('all_forms'))
+            self.call(admin_client, 'list form answers', 'get', '/api/v1/forms/answers/')
+            self.call(admin_client, 'survey stats', 'get', reverse('survey_stats', args=[survey.pk]))
+
+    def call(self, client: Client, name: str, method: str, url: str, data=None):
+        kwargs = {}
+        if method == 'get':
+            kwargs['data'] = data
+        elif data is not None:
+            kwargs['data'] = json.dumps(data)
+            kwargs['content_type'] = 'application/json'
+
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            elapsed = time.perf_counter() - started
+
+        if response.status_code >= 400:
+            raise CommandError(f'{name}: {response.status_code} {response.content[:500]}')
+        self.timings.setdefault(name, []).append(elapsed)
+        self.queries.setdefault(name, []).append(len(context.captured_queries))
+        return response
+
+    def create_survey(self, questions: int) -> Survey:
+        now = timezone.now()
+        survey = Survey.objects.create(
+            title='benchmark',
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1)
+        )
+        types = [Question.TEXT, Question.CHOICE, Question.CHECKBOX]
+        for i in range(questions):
+            question = Question.objects.create(survey=survey, type=types[i % 3], text=f'question {i}')
+            if question.type != Question.TEXT:
+                Answer.objects.bulk_create([
+                    Answer(question=question, text=f'answer {j}') for j in range(4)
+                ])
+        return survey
+
+    def make_answer(self, question: dict) -> dict:
+        if question['type'] == Question.TEXT:
+            return {'question': question['pk'], 'text': 'benchmark'}
+        if question['type'] == Question.CHOICE:
+            return {'question': question['pk'], 'choice': question['answers'][0]['pk']}
+        return {
+            'question': question['pk'],
+            'choices': [answer['pk'] for answer in question['answers'][:2]]
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from apps.surveys.asgi import RespondentApplication
+from apps.surveys.models import Form
+from apps.surveys.seed import delete_seeded, seed
+from apps.utils.asgi import run_with_connections
+from apps.utils.benchmark import call_wsgi, format_table, http_scope, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare latency and throughput of respondent survey reads served '
+        'by WSGI application with a thread per request and by ASGI application '
+        'of `config.asgi` under the same concurrency. Seeded data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight')
+        parser.add_argument('--threads', type=int, default=8, help='Threads of both applications')
+        parser.add_argument('--seed-surveys', type=int, default=20)
+        parser.add_argument('--seed-forms', type=int, default=50, help='Forms per seeded survey')
+
+    def handle(self, *args, **options):
+        # Threads see committed data only, so data is not rolled back but deleted
+        survey_ids = seed(surveys=options['seed_surveys'], forms=options['seed_forms'])
+        try:
+            form_pks = list(Form.objects.filter(survey_id__in=survey_ids).values_list('pk', flat=True))
+            rand = random.Random(0)
+            paths = [
+                reverse(rand.choice(['form_survey', 'form_survey_questions']), args=[rand.choice(form_pks)])
+                for _ in range(options['requests'])
+            ]
+
+            rows = []
+            for mode, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                started = time.perf_counter()
+                timings = run(paths, options['concurrency'], options['threads'])
+                elapsed = time.perf_counter() - started
+                stats = summarize(timings)
+                rows.append([
+                    mode, len(timings), len(timings) / elapsed,
+                    stats['p50'], stats['p95'], stats['p99'], stats['max'],
+                ])
+        finally:
+            delete_seeded(survey_ids)
+
+        self.stdout.write(format_table(
+            ['app', 'requests', 'requests/s', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'],
+            rows
+        ))
+
+    def run_wsgi(self, paths: list, concurrency: int, threads: int) -> list:
+        """ Like a threaded sync worker: a request waits for a free thread
+        """
+        application = get_wsgi_application()
+
+        def call_sync(path):
+            return call_wsgi(application, path, 'page_size=1000')
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            async def call(path):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, run_with_connections, call_sync, path)
+
+            return asyncio.run(self.drive(call, paths, concurrency))
+
+    def run_asgi(self, paths: list, concurrency: int, threads: int) -> list:
+        application = RespondentApplication(get_wsgi_application(), threads)
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def call(path):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await application(http_scope(path, 'page_size=1000'), receive, send)
+            return messages[0]['status']
+
+        try:
+            return asyncio.run(self.drive(call, paths, concurrency))
+        finally:
+            application.executor.shutdown()
+
+    async def drive(self, call, paths: list, concurrency: int) -> list:
+        """ Run `call` for every path keeping `concurrency` requests in flight,
+        return latencies
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed_call(path):
+            async with semaphore:
+                started = time.perf_counter()
+                status = await call(path)
+                elapsed = time.perf_counter() - started
+            if status != 200:
+                raise CommandError(f'{path}: {status}')
+            return elapsed
+
+        return await asyncio.gather(*(timed_call(path) for path in paths))
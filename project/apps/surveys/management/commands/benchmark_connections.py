@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from apps.surveys.models import Form
+from apps.surveys.seed import delete_seeded, seed
+from apps.utils.benchmark import call_wsgi, format_table, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare latency of small requests when database connection '
+        'is opened per request (CONN_MAX_AGE=0) and when it is kept. '
+        'Seeded data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and mode')
+        parser.add_argument('--conn-max-age', type=int, default=60, help='CONN_MAX_AGE of persistent mode')
+
+    def handle(self, *args, **options):
+        # Connections are closed between requests, so data can't be rolled back
+        survey_ids = seed(surveys=1, questions=5, forms=10)
+        conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+        try:
+            form_pk = Form.objects.filter(survey_id__in=survey_ids).values_list('pk', flat=True)[0]
+            paths = {
+                'active surveys': reverse('all_active_surveys'),
+                'form': reverse('form_detail', args=[form_pk]),
+            }
+            rows = [
+                row
+                for mode, max_age in (('per request', 0), ('persistent', options['conn_max_age']))
+                for row in self.run(mode, max_age, paths, options['requests'])
+            ]
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+            delete_seeded(survey_ids)
+
+        self.stdout.write(format_table(
+            ['connection', 'endpoint', 'requests', 'connects', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'],
+            rows
+        ))
+
+    def run(self, mode: str, max_age: int, paths: dict, requests: int) -> list:
+        # Age is read when connection is opened
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        application = get_wsgi_application()
+
+        connects = []
+
+        def count_connect(sender, **kwargs):
+            connects.append(1)
+
+        rows = []
+        connection_created.connect(count_connect)
+        try:
+            for name, path in paths.items():
+                connects.clear()
+                timings = []
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    status = call_wsgi(application, path)
+                    timings.append(time.perf_counter() - started)
+                    if status != 200:
+                        raise CommandError(f'{path}: {status}')
+                stats = summarize(timings)
+                rows.append([
+                    mode, name, requests, len(connects),
+                    stats['p50'], stats['p95'], stats['p99'], stats['max'],
+                ])
+        finally:
+            connection_created.disconnect(count_connect)
+        return rows
@@ -0,0 +1,109 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, models, transaction
+
+from apps.utils.benchmark import format_table
+from apps.utils.uuids import uuid7
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare insert throughput and index sizes of form ids made by uuid4 '
+        'and time ordered uuid7 in tables shaped like `Form` and `FormAnswer`. '
+        'Tables are created in a transaction and rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--existing', type=int, default=200000, help='Forms inserted before measuring')
+        parser.add_argument('--rows', type=int, default=50000, help='Forms inserted while measuring')
+        parser.add_argument('--answers', type=int, default=5, help='Answers per form')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = []
+        for name, generate in GENERATORS.items():
+            try:
+                with transaction.atomic():
+                    rows.append([name, *self.run(name, generate, options)])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        self.stdout.write(format_table(
+            ['ids', 'forms/s', 'form pk index KiB', 'answer form index KiB'],
+            rows
+        ))
+        if any(row[-1] == '-' for row in rows):
+            self.stdout.write('Index sizes are measured on PostgreSQL and SQLite with dbstat only.')
+
+    def run(self, name: str, generate, options: dict) -> list:
+        id_field = models.UUIDField()
+        forms_table = f'benchmark_form_{name}'
+        answers_table = f'benchmark_form_answer_{name}'
+        id_type = id_field.db_type(connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE {forms_table} (id {id_type} PRIMARY KEY, survey_id integer NOT NULL)')
+            cursor.execute(f'CREATE TABLE {answers_table} (form_id {id_type} NOT NULL, question_id integer NOT NULL)')
+            cursor.execute(f'CREATE INDEX {answers_table}_form_idx ON {answers_table} (form_id)')
+
+            def insert(amount):
+                rand = random.Random(0)
+                for offset in range(0, amount, options['batch_size']):
+                    ids = [
+                        id_field.get_db_prep_value(generate(), connection)
+                        for _ in range(min(options['batch_size'], amount - offset))
+                    ]
+                    cursor.executemany(
+                        f'INSERT INTO {forms_table} (id, survey_id) VALUES (%s, %s)',
+                        [(pk, rand.randint(1, 20)) for pk in ids]
+                    )
+                    cursor.executemany(
+                        f'INSERT INTO {answers_table} (form_id, question_id) VALUES (%s, %s)',
+                        [(pk, question) for pk in ids for question in range(options['answers'])]
+                    )
+
+            insert(options['existing'])
+            started = time.perf_counter()
+            insert(options['rows'])
+            elapsed = time.perf_counter() - started
+
+            return [
+                options['rows'] / elapsed,
+                self.get_index_size(cursor, forms_table, primary=True),
+                self.get_index_size(cursor, answers_table),
+            ]
+
+    def get_index_size(self, cursor, table: str, primary: bool = False):
+        """ Size of index of table in KiB or `-` if it can't be measured
+        """
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT pg_relation_size(indexrelid) FROM pg_index '
+                'WHERE indrelid = %s::regclass AND indisprimary = %s',
+                [table, primary]
+            )
+            return cursor.fetchone()[0] // 1024
+
+        if connection.vendor == 'sqlite':
+            index = f'sqlite_autoindex_{table}_1' if primary else f'{table}_form_idx'
+            try:
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [index])
+            except DatabaseError:
+                # SQLite is built without dbstat
+                return '-'
+            return cursor.fetchone()[0] // 1024
+        return '-'
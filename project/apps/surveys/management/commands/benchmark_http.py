@@ -0,0 +1,117 @@
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from apps.surveys.models import Form
+from apps.surveys.seed import delete_seeded, seed
+from apps.utils.benchmark import format_table, summarize
+
+
+# Services of `docker-compose.prod.yml`
+DEFAULT_TARGETS = ['nginx=http://nginx', 'gunicorn=http://web:8000']
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test running servers over HTTP with keep-alive connections '
+        '(e.g. nginx with its cache and gunicorn behind it) and report throughput, '
+        'latency, response size and nginx cache hits of anonymous reads. '
+        'Servers should use the same database, seeded data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            dest='targets',
+            metavar='NAME=URL',
+            help=f'Server to test, can be repeated. Default: {" ".join(DEFAULT_TARGETS)}'
+        )
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and target')
+        parser.add_argument('--concurrency', type=int, default=32, help='Connections per target')
+        parser.add_argument('--seed-forms', type=int, default=20, help='Forms to request questions of')
+
+    def handle(self, *args, **options):
+        targets = dict(self.parse_target(value) for value in options['targets'] or DEFAULT_TARGETS)
+
+        # Servers see committed data only
+        survey_ids = seed(surveys=1, forms=options['seed_forms'])
+        try:
+            form_pks = list(Form.objects.filter(survey_id__in=survey_ids).values_list('pk', flat=True))
+            endpoints = {
+                'active surveys': [reverse('all_active_surveys')],
+                'form survey questions': [reverse('form_survey_questions', args=[pk]) for pk in form_pks],
+            }
+            rows = [
+                [name, endpoint, *self.run(url, paths, options['requests'], options['concurrency'])]
+                for name, url in targets.items()
+                for endpoint, paths in endpoints.items()
+            ]
+        finally:
+            delete_seeded(survey_ids)
+
+        self.stdout.write(format_table(
+            ['target', 'endpoint', 'requests', 'requests/s', 'p50 ms', 'p95 ms', 'p99 ms', 'bytes', 'cache hits'],
+            rows
+        ))
+
+    def parse_target(self, value: str) -> tuple:
+        name, sep, url = value.partition('=')
+        parts = urlsplit(url)
+        if not sep or parts.scheme != 'http' or not parts.hostname:
+            raise CommandError(f'Expected NAME=http://host[:port], got {value!r}')
+        return name, url
+
+    def run(self, url: str, paths: list, requests: int, concurrency: int) -> list:
+        """ Make `requests` GET requests cycling through `paths`
+        """
+        parts = urlsplit(url)
+        local = threading.local()
+        connections = []
+        lock = threading.Lock()
+
+        def get(path):
+            if not hasattr(local, 'connection'):
+                local.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+                with lock:
+                    connections.append(local.connection)
+            headers = {'Accept': 'application/json', 'Accept-Encoding': 'gzip'}
+
+            started = time.perf_counter()
+            try:
+                local.connection.request('GET', parts.path.rstrip('/') + path, headers=headers)
+                response = local.connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # Idle keep-alive connection closed by server
+                local.connection.close()
+                local.connection.request('GET', parts.path.rstrip('/') + path, headers=headers)
+                response = local.connection.getresponse()
+            body = response.read()
+            elapsed = time.perf_counter() - started
+
+            if response.status != 200:
+                raise CommandError(f'{url}{path}: {response.status}')
+            return elapsed, len(body), response.getheader('X-Cache-Status') == 'HIT'
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(get, (paths[i % len(paths)] for i in range(requests))))
+        finally:
+            for connection in connections:
+                connection.close()
+        elapsed = time.perf_counter() - started
+
+        timings = [timing for timing, _, _ in results]
+        stats = summarize(timings)
+        return [
+            requests, requests / elapsed,
+            stats['p50'], stats['p95'], stats['p99'],
+            sum(size for _, size, _ in results) // requests,
+            sum(hit for _, _, hit in results),
+        ]
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.surveys.models import Survey, Question, Form
+from apps.surveys.seed import seed
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Show query plans and timings of API access paths with and without '
+        'indexes of `Survey` and `Form`. Seeded data and dropped indexes are '
+        'rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveys', type=int, default=20)
+        parser.add_argument(
+            '--forms',
+            type=int,
+            default=5000,
+            help='Forms per seeded survey. Use 0 to benchmark existing data only.'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['forms']:
+                    self.stdout.write('Seeding...')
+                    seed(surveys=options['surveys'], questions=5, forms=options['forms'])
+                self.analyze()
+
+                access_paths = self.get_access_paths()
+                with_indexes = self.measure(access_paths, options['repeat'])
+                self.drop_indexes()
+                self.analyze()
+                without_indexes = self.measure(access_paths, options['repeat'])
+
+                for name in access_paths:
+                    self.report(name, without_indexes[name], with_indexes[name])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def get_access_paths(self) -> dict:
+        now = timezone.now()
+        form = Form.objects.filter(submitted=True).order_by('pk').first()
+        survey_id = getattr(form, 'survey_id', None)
+        return {
+            'active surveys': Survey.objects.filter(
+                start_date__lt=now, end_date__gt=now
+            ),
+            'submitted forms of survey by date': Form.objects.filter(
+                survey_id=survey_id, submitted=True
+            ).order_by('submitted_date'),
+            'forms of survey submitted in last week': Form.objects.filter(
+                survey_id=survey_id,
+                submitted=True,
+                submitted_date__gte=now - timedelta(days=7)
+            ),
+            'unsubmitted forms of survey': Form.objects.filter(
+                survey_id=survey_id, submitted=False
+            ),
+            'questions of form survey': Question.objects.filter(
+                survey__forms__pk=getattr(form, 'pk', None)
+            ),
+        }
+
+    def measure(self, access_paths: dict, repeat: int) -> dict:
+        results = {}
+        for name, queryset in access_paths.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            results[name] = (queryset.explain(), min(timings))
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in (Survey, Form):
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def report(self, name: str, before: tuple, after: tuple):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for label, (plan, timing) in (('without indexes', before), ('with indexes', after)):
+            self.stdout.write(f'  {label}: {timing * 1000:.2f} ms')
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
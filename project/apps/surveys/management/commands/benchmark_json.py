@@ -0,0 +1,84 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.surveys.api.v1.serializers import FormAnswerSerializer, QuestionSerializer
+from apps.surveys.models import FormAnswer, Question
+from apps.surveys.seed import seed
+from apps.utils import renderers
+from apps.utils.benchmark import format_table, summarize
+from apps.utils.parsers import ORJSONParser
+from apps.utils.renderers import ORJSONRenderer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare render and parse time of DRF JSON classes and `orjson` based '
+        'classes of `apps.utils` on serialized question and form answer lists. '
+        'Seeded data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--form-answers', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20, help='Renders and parses per list and class')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson is not installed, both classes would use stdlib json')
+
+        try:
+            with transaction.atomic():
+                # Submitted forms answer every question
+                forms = max(options['form_answers'] // options['questions'], 1)
+                seed(surveys=1, questions=options['questions'], forms=forms, submitted_ratio=1)
+                lists = {
+                    'questions': QuestionSerializer(
+                        Question.objects.prefetch_related('answers').order_by('pk')[:options['questions']],
+                        many=True
+                    ).data,
+                    'form answers': FormAnswerSerializer(
+                        FormAnswer.objects.prefetch_related('choices').order_by('pk')[:options['form_answers']],
+                        many=True
+                    ).data,
+                }
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        rows = []
+        for name, data in lists.items():
+            content = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != content:
+                raise CommandError(f'{name}: rendered content differs')
+
+            for operation, classes in (
+                ('render', (JSONRenderer, ORJSONRenderer)),
+                ('parse', (JSONParser, ORJSONParser)),
+            ):
+                for cls in classes:
+                    instance = cls()
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        if operation == 'render':
+                            instance.render(data)
+                        else:
+                            instance.parse(io.BytesIO(content))
+                        timings.append(time.perf_counter() - started)
+                    stats = summarize(timings)
+                    rows.append([name, len(data), len(content), operation, cls.__name__, stats['p50'], stats['max']])
+
+        self.stdout.write(format_table(
+            ['list', 'items', 'bytes', 'operation', 'class', 'p50 ms', 'max ms'],
+            rows
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.columnar import build_survey_snapshot, get_survey_snapshot
+from apps.surveys.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        'Write submitted forms of closed surveys to columnar snapshots '
+        'read by stats, export and analytics'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'survey_ids',
+            nargs='*',
+            type=int,
+            help='Surveys to build. All closed surveys are built if omitted.'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild snapshots which are up to date'
+        )
+
+    def handle(self, *args, **options):
+        survey_ids = options['survey_ids'] or list(
+            Survey.objects
+            .filter(end_date__lte=timezone.now())
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        for survey_id in survey_ids:
+            definition = get_survey_definition(survey_id)
+            if definition is None:
+                self.stderr.write(f'Survey {survey_id} does not exist')
+                continue
+            if not options['force'] and get_survey_snapshot(definition) is not None:
+                continue
+
+            try:
+                meta = build_survey_snapshot(definition)
+            except ValueError as exc:
+                self.stderr.write(str(exc))
+                continue
+            self.stdout.write(f'Survey {survey_id}: {meta["forms_amount"]} forms')
+
+        self.stdout.write(self.style.SUCCESS('Survey snapshots are built'))
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.surveys.export import EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Export submitted forms of a survey, one row per form'
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey_id', type=int)
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=list(EXPORT_FORMATS),
+            default='csv'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to. Standard output is used if omitted.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            content = iter_export(
+                options['survey_id'],
+                options['export_format'],
+                options['chunk_size']
+            )
+        except LookupError as exc:
+            raise CommandError(exc)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as file:
+                file.writelines(content)
+        else:
+            sys.stdout.writelines(content)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rest_framework.exceptions import ValidationError
+
+from apps.surveys.api.v1.serializers import flush_form_drafts
+from apps.surveys.drafts import drafts_enabled
+from apps.surveys.models import Form
+
+
+class Command(BaseCommand):
+    help = (
+        'Save buffered draft answers of not submitted forms to database. '
+        'Drafts which are not valid anymore are kept until they expire.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'survey_ids',
+            nargs='*',
+            type=int,
+            help='Surveys to flush. Forms of all surveys are flushed if omitted.'
+        )
+
+    def handle(self, *args, **options):
+        if not drafts_enabled():
+            raise CommandError('form drafts are disabled, set SURVEY_DRAFTS_ALIAS to a shared cache')
+
+        forms = Form.objects.filter(submitted=False)
+        if options['survey_ids']:
+            forms = forms.filter(survey_id__in=options['survey_ids'])
+
+        flushed = failed = 0
+        # Read at once, a server-side cursor behind PgBouncer ends with
+        # the first transaction of a flushed form
+        for form_pk in list(forms.values_list('pk', flat=True)):
+            try:
+                with transaction.atomic():
+                    # Locked like on submit, skipped if submitted meanwhile
+                    form = Form.objects.select_for_update().filter(pk=form_pk, submitted=False).first()
+                    if form is not None and flush_form_drafts(form):
+                        flushed += 1
+            except ValidationError as exc:
+                failed += 1
+                self.stderr.write(f'Form {form_pk}: {exc.detail}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Drafts of {flushed} forms are flushed, {failed} failed'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.surveys.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalculate survey stats counters from submitted forms'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'survey_ids', 
+            nargs='*', 
+            type=int,
+            help='Surveys to rebuild. All surveys are rebuilt if omitted.'
+        )
+
+    def handle(self, *args, **options):
+        survey_ids = options['survey_ids'] or None
+        rebuild_stats(survey_ids)
+        self.stdout.write(self.style.SUCCESS('Survey stats are rebuilt'))
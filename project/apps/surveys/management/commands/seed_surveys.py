@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.surveys.seed import seed
+
+
+class Command(BaseCommand):
+    help = 'Create surveys with questions, answers, forms and form answers for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveys', type=int, default=10)
+        parser.add_argument('--questions', type=int, default=10, help='Questions per survey')
+        parser.add_argument('--answers', type=int, default=4, help='Answer options per question')
+        parser.add_argument('--forms', type=int, default=1000, help='Forms per survey')
+        parser.add_argument('--submitted-ratio', type=float, default=0.8)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--random-seed', type=int)
+
+    def handle(self, *args, **options):
+        survey_ids = seed(
+            surveys=options['surveys'],
+            questions=options['questions'],
+            answers=options['answers'],
+            forms=options['forms'],
+            submitted_ratio=options['submitted_ratio'],
+            batch_size=options['batch_size'],
+            random_seed=options['random_seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(survey_ids)} surveys: {survey_ids[0]}..{survey_ids[-1]}'
+            if survey_ids else 'Nothing is created'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.10 on 2026-10-18 11:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_answered_count(apps, schema_editor):
+    Form = apps.get_model('surveys', 'Form')
+    FormAnswer = apps.get_model('surveys', 'FormAnswer')
+
+    answers_amount = (
+        FormAnswer.objects
+        .filter(form=OuterRef('pk'))
+        .order_by()
+        .values('form')
+        .annotate(amount=Count('pk'))
+        .values('amount')
+    )
+    Form.objects.update(
+        answered_count=Coalesce(Subquery(answers_amount), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='form',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_answered_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.10 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0008_form_answered_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='form',
+            index=models.Index(fields=['survey', 'submitted', 'submitted_date'], name='form_survey_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='form',
+            index=models.Index(condition=models.Q(submitted=False), fields=['survey'], name='form_unsubmitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['start_date', 'end_date'], name='survey_dates_idx'),
+        ),
+    ]
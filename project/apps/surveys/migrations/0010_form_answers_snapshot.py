@@ -0,0 +1,19 @@
+# Generated by Django 2.2.10 on 2026-10-18 11:59
+
+import apps.utils.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0009_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='form',
+            name='answers_snapshot',
+            field=apps.utils.fields.JSONTextField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.10 on 2026-10-18 12:12
+
+import apps.utils.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0011_updated_at'),
+    ]
+
+    # Only new forms get time ordered ids. Ids of existing forms are
+    # known to respondents, so they are kept; space of their index pages
+    # is reclaimed with `REINDEX INDEX CONCURRENTLY` (PostgreSQL 12+)
+    operations = [
+        migrations.AlterField(
+            model_name='form',
+            name='id',
+            field=models.UUIDField(default=apps.utils.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
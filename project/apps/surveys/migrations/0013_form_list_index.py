@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+# Order of keyset pages of `FormListView`. `Index` of Django 2.2 can't
+# declare NULLS LAST, and SQLite can't index it, so it's PostgreSQL only
+CREATE_INDEX = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS form_list_idx '
+    'ON surveys_form (submitted_date DESC NULLS LAST, id DESC)'
+)
+DROP_INDEX = 'DROP INDEX CONCURRENTLY IF EXISTS form_list_idx'
+
+
+def run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+    # Built without blocking writes to forms
+    atomic = False
+
+    dependencies = [
+        ('surveys', '0012_form_uuid7'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgresql(CREATE_INDEX), run_on_postgresql(DROP_INDEX)),
+    ]
@@ -1,16 +1,27 @@
-import uuid
-
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+
+from apps.utils.fields import JSONTextField
+from apps.utils.uuids import uuid7
 
 
 class Survey(models.Model):
     title = models.CharField(max_length=128)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
     # FK questions 
     # FK forms
 
+    class Meta:
+        indexes = [
+            # Active surveys filter
+            models.Index(
+                fields=['start_date', 'end_date'],
+                name='survey_dates_idx'
+            ),
+        ]
+
     def is_active(self) -> bool:
         current_time = timezone.now()
         return (
@@ -18,10 +29,28 @@ class Survey(models.Model):
             self.end_date >= current_time
         )
 
+    def last_modified(self):
+        """ Time of the last change of survey including 
+        `is_active` switches at start and end
+        """
+        current_time = timezone.now()
+        switches = [date for date in (self.start_date, self.end_date) if date <= current_time]
+        return max([self.updated_at, *switches])
+
     def __str__(self) -> str:
         return f'{self.title[:15]}, {self.start_date.date()}'
 
 
+class QuestionQuerySet(models.QuerySet):
+    def delete(self):
+        from apps.surveys.stats import record_form_answers_removal
+        with transaction.atomic(using=self.db):
+            form_answers = FormAnswer.objects.filter(question__in=self)
+            record_form_answers_removal(form_answers, list(self.values_list('survey_id', flat=True).distinct()))
+            form_answers.subtract_from_forms()
+            return super().delete()
+
+
 class Question(models.Model):
     TEXT = 1
     CHOICE = 2
@@ -42,12 +71,39 @@ class Question(models.Model):
         default=TEXT
     )
     text = models.CharField(max_length=512)
+    updated_at = models.DateTimeField(auto_now=True)
     # FK answers
     # FK form_answers
 
+    objects = QuestionQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f'{self.get_type_display()}: {self.text[:15]}'
 
+    def delete(self, using=None, keep_parents=False):
+        # Questions deleted with their survey don't pass here,
+        # forms of the survey are deleted too
+        from apps.surveys.stats import record_form_answers_removal
+        with transaction.atomic(using=using):
+            form_answers = FormAnswer.objects.filter(question=self)
+            record_form_answers_removal(form_answers, [self.survey_id])
+            form_answers.subtract_from_forms()
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class AnswerQuerySet(models.QuerySet):
+    def delete(self):
+        from apps.surveys.stats import record_form_answers_removal
+        with transaction.atomic(using=self.db):
+            form_answers = FormAnswer.objects.filter(choice__in=self)
+            record_form_answers_removal(
+                form_answers, list(self.values_list('question__survey_id', flat=True).distinct())
+            )
+            form_answers.subtract_from_forms()
+            # Forms which chose them as `choices` keep the answer
+            Form.objects.filter(answers__choices__in=self).update(answers_snapshot=None)
+            return super().delete()
+
 
 class Answer(models.Model):
     question = models.ForeignKey(
@@ -58,12 +114,25 @@ class Answer(models.Model):
         related_name='answers'
     )
     text = models.CharField(max_length=128)
+    updated_at = models.DateTimeField(auto_now=True)
     # FK form_choice 
     # M2M form_choices
 
+    objects = AnswerQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.text[:15]
 
+    def delete(self, using=None, keep_parents=False):
+        from apps.surveys.stats import record_form_answers_removal
+        with transaction.atomic(using=using):
+            form_answers = FormAnswer.objects.filter(choice=self)
+            survey_ids = list(Question.objects.filter(pk=self.question_id).values_list('survey_id', flat=True))
+            record_form_answers_removal(form_answers, survey_ids)
+            form_answers.subtract_from_forms()
+            Form.objects.filter(answers__choices=self).update(answers_snapshot=None)
+            return super().delete(using=using, keep_parents=keep_parents)
+
 
 class Respondent(models.Model):
     first_name = models.CharField(max_length=128)
@@ -75,10 +144,21 @@ class Respondent(models.Model):
         return f'{self.first_name} {self.last_name}, {self.age}'
 
 
+class FormQuerySet(models.QuerySet):
+    def delete(self):
+        """ Submitted forms are subtracted from survey stats first
+        """
+        from apps.surveys.stats import record_forms_removal
+        with transaction.atomic(using=self.db):
+            record_forms_removal(self)
+            return super().delete()
+
+
 class Form(models.Model):
+    # Time ordered, so new rows go to the end of indexes
     id = models.UUIDField(
         primary_key=True, 
-        default=uuid.uuid4, 
+        default=uuid7, 
         editable=False
     )
     respondent = models.OneToOneField(
@@ -100,12 +180,145 @@ class Form(models.Model):
         null=True, 
         blank=True
     )
+    # Amount of `answers`, kept in sync by signals and
+    # deletes of answers, questions and chosen answers
+    answered_count = models.PositiveIntegerField(
+        default=0,
+        editable=False
+    )
+    # Answers by question id, see `snapshots.py`. 
+    # Null until built
+    answers_snapshot = JSONTextField(
+        null=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(auto_now=True)
     # FK answers
 
+    objects = FormQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Submitted forms of a survey and their dates
+            models.Index(
+                fields=['survey', 'submitted', 'submitted_date'],
+                name='form_survey_submitted_idx'
+            ),
+            # Forms in progress, a small part of all forms
+            models.Index(
+                fields=['survey'],
+                name='form_unsubmitted_idx',
+                condition=models.Q(submitted=False)
+            ),
+            # Keyset pages of all forms use `form_list_idx`
+            # of migration 0013, which orders nulls last
+        ]
+
     def __str__(self) -> str:
         respondent_name = getattr(self.respondent, "first_name", "----")
         return f'{respondent_name} : {self.survey}'
 
+    def delete(self, using=None, keep_parents=False):
+        # Forms deleted with their survey don't pass here,
+        # stats of the survey are deleted too
+        from apps.surveys.stats import record_forms_removal
+        with transaction.atomic(using=using):
+            record_forms_removal(Form.objects.filter(pk=self.pk))
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class FormAnswerQuerySet(models.QuerySet):
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            self.subtract_from_forms()
+            return super().delete()
+
+    def subtract_from_forms(self):
+        """ Decrease `answered_count` of forms by amount of their answers
+        in queryset with one query, before the answers are deleted.
+        Snapshots of the forms are reset and rebuilt when requested.
+        Deleted answers don't send signals, so Django deletes them and
+        their `choices` in batches.
+        """
+        Form.objects.filter(pk__in=self.values('form_id')).update(
+            answered_count=models.F('answered_count') - models.Subquery(
+                self
+                .filter(form=models.OuterRef('pk'))
+                .order_by()
+                .values('form')
+                .annotate(amount=models.Count('pk'))
+                .values('amount')
+            ),
+            answers_snapshot=None
+        )
+
+
+class FormAnswerManager(models.Manager.from_queryset(FormAnswerQuerySet)):
+    def bulk_create_for_form(self, form: Form, answers: list, refresh_snapshot: bool = True) -> list:
+        """ Create many answers to one form with their `choices` 
+        in a constant amount of queries.
+        `answers` are dicts of validated `FormAnswer` fields.
+        Signals are not sent, so `form.answered_count` is updated here
+        and the answers snapshot is refreshed after commit 
+        unless caller does it.
+        """
+        if not answers:
+            return []
+
+        with transaction.atomic(using=self.db):
+            self.bulk_create([
+                self.model(
+                    form=form,
+                    question=answer['question'],
+                    text=answer.get('text', ''),
+                    choice=answer.get('choice')
+                )
+                for answer in answers
+            ])
+            # Not every database returns pks from bulk insert
+            created_pks = dict(
+                self.filter(
+                    form=form, 
+                    question__in=[answer['question'] for answer in answers]
+                ).values_list('question_id', 'pk')
+            )
+
+            through_model = self.model.choices.through
+            through_model.objects.bulk_create([
+                through_model(
+                    formanswer_id=created_pks[answer['question'].pk],
+                    answer_id=choice.pk
+                )
+                for answer in answers
+                for choice in answer.get('choices', [])
+            ])
+
+            Form.objects.filter(pk=form.pk).update(
+                answered_count=models.F('answered_count') + len(answers)
+            )
+            if refresh_snapshot:
+                # Signals are not sent, so snapshot is scheduled here
+                from apps.surveys.snapshots import schedule_snapshot_refresh
+                schedule_snapshot_refresh(form.pk)
+
+        return list(
+            self.filter(pk__in=created_pks.values())
+            .prefetch_related('choices')
+            .order_by('pk')
+        )
+
+    def replace_for_form(self, form: Form, answers: list) -> list:
+        """ Like `bulk_create_for_form`, but existing answers 
+        to the same questions are deleted first.
+        """
+        with transaction.atomic(using=self.db):
+            # Forms are updated by `FormAnswerQuerySet.delete`
+            self.filter(
+                form=form, 
+                question__in=[answer['question'] for answer in answers]
+            ).delete()
+            return self.bulk_create_for_form(form, answers)
+
 
 class FormAnswer(models.Model):
     form = models.ForeignKey(
@@ -140,6 +353,8 @@ class FormAnswer(models.Model):
         related_name='form_choices'
     )
 
+    objects = FormAnswerManager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -149,4 +364,60 @@ class FormAnswer(models.Model):
         ]
 
     def __str__(self) -> str:
-        return str(self.question)
\ No newline at end of file
+        return str(self.question)
+
+    def delete(self, using=None, keep_parents=False):
+        from apps.surveys.stats import record_form_answer_removal
+        with transaction.atomic(using=using):
+            if self.form.submitted:
+                record_form_answer_removal(self)
+            FormAnswer.objects.filter(pk=self.pk).subtract_from_forms()
+            return super().delete(using=using, keep_parents=keep_parents)
+
+class SurveyStats(models.Model):
+    """ Amount of submitted forms of a survey.
+    Updated when a form is submitted or deleted.
+    """
+    survey = models.OneToOneField(
+        to=Survey,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    forms_amount = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.survey}: {self.forms_amount}'
+
+
+class QuestionStats(models.Model):
+    """ Amount of submitted answers to a question.
+    Updated when a form is submitted or deleted.
+    """
+    question = models.OneToOneField(
+        to=Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    answers_amount = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.question}: {self.answers_amount}'
+
+
+class AnswerStats(models.Model):
+    """ Amount of submitted forms where an answer was chosen 
+    (as `choice` or one of `choices`).
+    Updated when a form is submitted or deleted.
+    """
+    answer = models.OneToOneField(
+        to=Answer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    chosen_amount = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.answer}: {self.chosen_amount}'
@@ -0,0 +1,182 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.surveys.models import (
+    Survey,
+    Question,
+    Answer,
+    Respondent,
+    Form,
+    FormAnswer
+)
+from apps.surveys.cache import bump_active_version
+from apps.surveys.stats import rebuild_stats
+from apps.utils.uuids import uuid7
+
+
+@transaction.atomic
+def seed(
+    surveys: int = 10,
+    questions: int = 10,
+    answers: int = 4,
+    forms: int = 1000,
+    submitted_ratio: float = 0.8,
+    batch_size: int = 5000,
+    random_seed: int = None
+) -> list:
+    """ Create surveys with questions of mixed types, answer options,
+    respondents, forms and form answers using `bulk_create`.
+    `questions`, `answers` and `forms` are amounts per survey (question).
+    Submitted forms answer all questions, others answer a part of them.
+
+    Return ids of created surveys.
+    """
+    rand = random.Random(random_seed)
+    now = timezone.now()
+    # Marks created rows, since not every database returns pks from bulk insert
+    marker = f'seed-{uuid.uuid4().hex[:8]}'
+
+    survey_objs = []
+    for i in range(surveys):
+        # Past, active and future surveys
+        start_date = now + timedelta(days=rand.randint(-60, 10))
+        end_date = start_date + timedelta(days=rand.randint(1, 60))
+        survey_objs.append(Survey(
+            title=f'{marker} {i}',
+            start_date=start_date,
+            end_date=end_date
+        ))
+    _bulk_create(Survey, survey_objs, batch_size)
+    survey_objs = list(Survey.objects.filter(title__startswith=marker))
+
+    _bulk_create(Question, [
+        Question(
+            survey=survey,
+            type=rand.choice([Question.TEXT, Question.CHOICE, Question.CHECKBOX]),
+            text=f'question {i}'
+        )
+        for survey in survey_objs
+        for i in range(questions)
+    ], batch_size)
+    question_objs = list(
+        Question.objects
+        .filter(survey__title__startswith=marker)
+        .order_by('pk')
+    )
+
+    _bulk_create(Answer, [
+        Answer(question=question, text=f'answer {i}')
+        for question in question_objs
+        if question.type != Question.TEXT
+        for i in range(answers)
+    ], batch_size)
+    question_answers = {}
+    for answer_pk, question_pk in (
+        Answer.objects
+        .filter(question__survey__title__startswith=marker)
+        .values_list('pk', 'question_id')
+    ):
+        question_answers.setdefault(question_pk, []).append(answer_pk)
+
+    survey_questions = {}
+    for question in question_objs:
+        survey_questions.setdefault(question.survey_id, []).append(question)
+
+    _bulk_create(Respondent, [
+        Respondent(
+            first_name=marker,
+            last_name=str(i),
+            age=rand.randint(14, 90)
+        )
+        for i in range(surveys * forms)
+    ], batch_size)
+    respondent_pks = iter(
+        Respondent.objects
+        .filter(first_name=marker)
+        .values_list('pk', flat=True)
+    )
+
+    form_objs = []
+    form_answer_objs = []
+    checkbox_choices = {}
+    for survey in survey_objs:
+        questions_of_survey = survey_questions.get(survey.pk, [])
+        for _ in range(forms):
+            submitted = rand.random() < submitted_ratio
+            if submitted:
+                answered = questions_of_survey
+                submitted_date = survey.start_date + timedelta(
+                    seconds=rand.randint(0, int((survey.end_date - survey.start_date).total_seconds()))
+                )
+            else:
+                answered = rand.sample(questions_of_survey, rand.randint(0, len(questions_of_survey)))
+                submitted_date = None
+
+            form = Form(
+                id=uuid7(),
+                survey=survey,
+                respondent_id=next(respondent_pks),
+                submitted=submitted,
+                submitted_date=submitted_date,
+                answered_count=len(answered)
+            )
+            form_objs.append(form)
+
+            for question in answered:
+                options = question_answers.get(question.pk, [])
+                form_answer = FormAnswer(form_id=form.pk, question_id=question.pk)
+                if question.type == Question.TEXT or not options:
+                    form_answer.text = f'text {rand.randint(0, 1000)}'
+                elif question.type == Question.CHOICE:
+                    form_answer.choice_id = rand.choice(options)
+                else:
+                    checkbox_choices[(form.pk, question.pk)] = rand.sample(
+                        options, rand.randint(1, len(options))
+                    )
+                form_answer_objs.append(form_answer)
+
+    _bulk_create(Form, form_objs, batch_size)
+    _bulk_create(FormAnswer, form_answer_objs, batch_size)
+
+    through_model = FormAnswer.choices.through
+    through_objs = []
+    created_form_answers = (
+        FormAnswer.objects
+        .filter(form__survey__title__startswith=marker, question__type=Question.CHECKBOX)
+        .values_list('pk', 'form_id', 'question_id')
+        .iterator()
+    )
+    for form_answer_pk, form_pk, question_pk in created_form_answers:
+        for answer_pk in checkbox_choices.get((form_pk, question_pk), []):
+            through_objs.append(through_model(formanswer_id=form_answer_pk, answer_id=answer_pk))
+    _bulk_create(through_model, through_objs, batch_size)
+
+    survey_ids = [survey.pk for survey in survey_objs]
+    rebuild_stats(survey_ids)
+    # `bulk_create` doesn't send signals
+    transaction.on_commit(bump_active_version)
+    return survey_ids
+
+
+def _bulk_create(model, objs: list, batch_size: int):
+    # Explicit batch size isn't limited by database restrictions (sqlite)
+    fields = model._meta.concrete_fields
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, objs) or batch_size)
+    model.objects.bulk_create(objs, batch_size=max(batch_size, 1))
+
+
+@transaction.atomic
+def delete_seeded(survey_ids: list):
+    """ Delete surveys created by `seed` with their respondents
+    """
+    respondent_pks = list(
+        Form.objects
+        .filter(survey_id__in=survey_ids)
+        .values_list('respondent_id', flat=True)
+    )
+    Survey.objects.filter(pk__in=survey_ids).delete()
+    Respondent.objects.filter(pk__in=respondent_pks).delete()
@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from apps.surveys import cache
+from apps.surveys.columnar import delete_survey_snapshot
+from apps.surveys.models import Survey, Question, Answer, Respondent, Form, FormAnswer
+from apps.surveys.snapshots import schedule_snapshot_refresh
+
+
+@receiver(post_save, sender=FormAnswer)
+def increase_form_answered_count(sender, instance, created, **kwargs):
+    if created:
+        Form.objects.filter(pk=instance.form_id).update(
+            answered_count=F('answered_count') + 1
+        )
+
+
+def _delete_survey_snapshot(survey_id):
+    if survey_id is not None:
+        transaction.on_commit(lambda: delete_survey_snapshot(survey_id))
+
+
+# Deleted answers don't send signals, so they and their choices are
+# deleted in batches, forms are updated by `FormAnswerQuerySet`.
+# Choices are set by atomic serializers and admin forms, so the snapshot
+# refreshed after commit of the saved answer includes them
+@receiver(post_save, sender=FormAnswer)
+def form_answer_changed(sender, instance, **kwargs):
+    schedule_snapshot_refresh(instance.form_id)
+    _delete_survey_snapshot(cache.get_form_survey_id(instance.form_id))
+
+
+def _survey_results_changed(survey_id):
+    if survey_id is not None:
+        transaction.on_commit(lambda: cache.bump_results_version(survey_id))
+    _delete_survey_snapshot(survey_id)
+
+
+def _bump_definition_version(survey_id):
+    # Bumped after commit so the new version is never 
+    # cached with data of the old one
+    if survey_id is not None:
+        transaction.on_commit(lambda: cache.bump_version(survey_id))
+
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def survey_changed(sender, instance, **kwargs):
+    _bump_definition_version(instance.pk)
+    transaction.on_commit(cache.bump_active_version)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    _bump_definition_version(instance.survey_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    if instance.question_id is None:
+        return
+    survey_id = (
+        Question.objects
+        .filter(pk=instance.question_id)
+        .values_list('survey_id', flat=True)
+        .first()
+    )
+    _bump_definition_version(survey_id)
+
+
+@receiver(post_delete, sender=Form)
+def form_deleted(sender, instance, **kwargs):
+    cache.forget_form(instance.pk)
+    if instance.submitted:
+        _survey_results_changed(instance.survey_id)
+
+
+# Respondents of submitted forms are stored in survey snapshots
+# and analytics cached by results version
+@receiver(post_save, sender=Form)
+def form_saved(sender, instance, **kwargs):
+    if instance.submitted:
+        _survey_results_changed(instance.survey_id)
+
+
+def _respondent_results_changed(respondent):
+    survey_id = (
+        Form.objects
+        .filter(respondent=respondent, submitted=True)
+        .values_list('survey_id', flat=True)
+        .first()
+    )
+    _survey_results_changed(survey_id)
+
+
+@receiver(post_save, sender=Respondent)
+def respondent_changed(sender, instance, created, **kwargs):
+    # New respondents are set to a form by its save
+    if not created:
+        _respondent_results_changed(instance)
+
+
+# Form is unset before `post_delete`
+@receiver(pre_delete, sender=Respondent)
+def respondent_deleted(sender, instance, **kwargs):
+    _respondent_results_changed(instance)
@@ -0,0 +1,66 @@
+""" Answers of a form denormalised to `Form.answers_snapshot`:
+`{question id: {'pk', 'text', 'choice', 'choices'}}`.
+
+Snapshot is rebuilt after commit of every answer change and in the
+transaction submitting the form, so a filled form is read as one row.
+Rebuilds lock the form row, so a stale snapshot can't overwrite a newer one.
+"""
+from django.db import transaction
+
+from apps.surveys.models import Form, FormAnswer
+
+
+def _snapshot_item(pk: int, text: str, choice_pk: int, choice_pks: list) -> dict:
+    return {'pk': pk, 'text': text, 'choice': choice_pk, 'choices': choice_pks}
+
+
+def build_form_snapshot(form_pk) -> dict:
+    choices = {}
+    for form_answer_pk, answer_pk in (
+        FormAnswer.choices.through.objects
+        .filter(formanswer__form_id=form_pk)
+        .order_by('answer_id')
+        .values_list('formanswer_id', 'answer_id')
+    ):
+        choices.setdefault(form_answer_pk, []).append(answer_pk)
+
+    return {
+        str(question_pk): _snapshot_item(pk, text, choice_pk, choices.get(pk, []))
+        for pk, question_pk, text, choice_pk in (
+            FormAnswer.objects
+            .filter(form_id=form_pk)
+            .values_list('pk', 'question_id', 'text', 'choice_id')
+        )
+    }
+
+
+def snapshot_form_answers(form_answers: list) -> dict:
+    """ Snapshot of all answers of a form with prefetched `choices`
+    """
+    return {
+        str(answer.question_id): _snapshot_item(
+            answer.pk, answer.text, answer.choice_id,
+            sorted(choice.pk for choice in answer.choices.all())
+        )
+        for answer in form_answers
+    }
+
+
+def refresh_form_snapshot(form_pk, snapshot: dict = None) -> dict:
+    forms = Form.objects.filter(pk=form_pk)
+    if snapshot is not None:
+        forms.update(answers_snapshot=snapshot)
+        return snapshot
+
+    with transaction.atomic():
+        # Refreshes after concurrent answer changes wait for each other,
+        # so the last one builds from all committed answers and writes last
+        list(forms.select_for_update().values_list('pk'))
+        snapshot = build_form_snapshot(form_pk)
+        forms.update(answers_snapshot=snapshot)
+    return snapshot
+
+
+def schedule_snapshot_refresh(form_pk):
+    # After commit the snapshot is built from committed answers only
+    transaction.on_commit(lambda: refresh_form_snapshot(form_pk))
@@ -0,0 +1,223 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+import numpy as np
+
+from apps.surveys.cache import SurveyDefinition, bump_results_version
+from apps.surveys.columnar import SurveySnapshot, delete_survey_snapshot
+from apps.surveys.models import (
+    Survey,
+    Form,
+    FormAnswer,
+    SurveyStats,
+    QuestionStats,
+    AnswerStats,
+)
+
+
+def record_form_submission(form: Form, form_answers: list = None):
+    """ Add answers of a just submitted form to survey counters.
+    Should be called once per form, in the submitting transaction.
+    `form_answers` of the form with prefetched `choices` save queries.
+    """
+    if form_answers is None:
+        answers = list(form.answers.values_list('question_id', 'choice_id'))
+        checkbox_choices = list(
+            FormAnswer.choices.through.objects
+            .filter(formanswer__form=form)
+            .values_list('answer_id', flat=True)
+        )
+    else:
+        answers = [(answer.question_id, answer.choice_id) for answer in form_answers]
+        checkbox_choices = [
+            choice.pk for answer in form_answers for choice in answer.choices.all()
+        ]
+
+    chosen_answers = [choice for _, choice in answers if choice]
+    chosen_answers += checkbox_choices
+
+    _increment(SurveyStats, 'survey_id', 'forms_amount', [form.survey_id])
+    _increment(QuestionStats, 'question_id', 'answers_amount', [question for question, _ in answers])
+    _increment(AnswerStats, 'answer_id', 'chosen_amount', chosen_answers)
+    _bump_results_version([form.survey_id])
+    # Forms of closed surveys can be submitted too
+    survey_id = form.survey_id
+    transaction.on_commit(lambda: delete_survey_snapshot(survey_id))
+
+
+def record_forms_removal(forms):
+    """ Subtract answers of submitted `forms` (a queryset) from survey
+    counters. Should be called before forms are deleted, in the deleting
+    transaction. Not needed for forms deleted with their survey,
+    counters of the survey are deleted too.
+    """
+    forms = forms.filter(submitted=True)
+    forms_amounts = Counter(dict(
+        forms.values_list('survey_id').annotate(Count('pk')).order_by()
+    ))
+    if not forms_amounts:
+        return
+
+    _decrease(SurveyStats, 'survey_id', 'forms_amount', forms_amounts)
+    _subtract_answers(FormAnswer.objects.filter(form__in=forms))
+
+
+def record_form_answer_removal(form_answer: FormAnswer):
+    """ Subtract an answer of a submitted form from survey counters
+    before it is deleted, in the deleting transaction.
+    """
+    _subtract_answers(FormAnswer.objects.filter(pk=form_answer.pk))
+    survey_id = form_answer.form.survey_id
+    _bump_results_version([survey_id])
+    transaction.on_commit(lambda: delete_survey_snapshot(survey_id))
+
+
+def record_form_answers_removal(form_answers, survey_ids: list):
+    """ Subtract answers (a queryset) of submitted forms deleted with
+    their question or chosen answer from survey counters. Should be called
+    before the delete, in the deleting transaction.
+    Counters of deleted questions and answers are deleted with them.
+    """
+    _subtract_answers(form_answers.filter(form__submitted=True))
+    _bump_results_version(survey_ids)
+
+
+def _subtract_answers(form_answers):
+    checkbox_choices = FormAnswer.choices.through.objects.filter(
+        formanswer__in=form_answers
+    )
+    answers_amounts, chosen_amounts = _count_answers(form_answers, checkbox_choices)
+    _decrease(QuestionStats, 'question_id', 'answers_amount', answers_amounts)
+    _decrease(AnswerStats, 'answer_id', 'chosen_amount', chosen_amounts)
+
+
+def _count_answers(form_answers, checkbox_choices) -> tuple:
+    # Amounts of answers by question and of chosen answers by answer
+    answers_amounts = Counter(dict(
+        form_answers.values_list('question_id').annotate(Count('pk')).order_by()
+    ))
+    chosen_amounts = Counter(dict(
+        form_answers
+        .filter(choice__isnull=False)
+        .values_list('choice_id')
+        .annotate(Count('pk'))
+        .order_by()
+    ))
+    chosen_amounts.update(dict(
+        checkbox_choices.values_list('answer_id').annotate(Count('pk')).order_by()
+    ))
+    return answers_amounts, chosen_amounts
+
+
+def _bump_results_version(survey_ids: list):
+    # After commit, so results of the new version include the changes
+    def bump():
+        for survey_id in survey_ids:
+            bump_results_version(survey_id)
+    transaction.on_commit(bump)
+
+
+def _increment(model, key: str, counter: str, pks: list):
+    # Every pk is expected to be unique, so each counter is increased by 1
+    if not pks:
+        return
+
+    model.objects.bulk_create(
+        [model(**{key: pk}) for pk in pks],
+        ignore_conflicts=True
+    )
+    model.objects.filter(**{f'{key}__in': pks}).update(
+        **{counter: F(counter) + 1}
+    )
+
+
+def _decrease(model, key: str, counter: str, amounts: Counter):
+    # One query per distinct amount, usually a single one
+    pks_by_amount = defaultdict(list)
+    for pk, amount in amounts.items():
+        pks_by_amount[amount].append(pk)
+    for amount, pks in pks_by_amount.items():
+        # Counters are unsigned, rows missing before stats were added
+        # shouldn't fail deletes
+        model.objects.filter(**{f'{key}__in': pks}).update(
+            **{counter: Greatest(F(counter) - amount, 0)}
+        )
+
+
+def get_snapshot_stats(definition: SurveyDefinition, snapshot: SurveySnapshot) -> dict:
+    """ Same as `SurveyStatsSerializer` data, counted from a survey snapshot
+    """
+    questions = []
+    for question in definition.questions:
+        answers = question.answers.all()
+        chosen_amounts = [0] * len(answers)
+        if question.pk in snapshot.packed_chosen:
+            chosen_amounts = np.count_nonzero(snapshot.chosen(question.pk), axis=0).tolist()
+        questions.append({
+            'pk': question.pk,
+            'type': question.type,
+            'text': question.text,
+            'answers_amount': int(np.count_nonzero(snapshot.texts[question.pk] >= 0)),
+            'answers': [
+                {'pk': answer.pk, 'text': answer.text, 'chosen_amount': amount}
+                for answer, amount in zip(answers, chosen_amounts)
+            ],
+        })
+    return {
+        'pk': definition.survey.pk,
+        'title': definition.survey.title,
+        'forms_amount': snapshot.forms_amount,
+        'questions': questions,
+    }
+
+
+@transaction.atomic
+def rebuild_stats(survey_ids: list = None):
+    """ Recalculate counters from submitted forms.
+    Rebuilds all surveys if `survey_ids` is not provided.
+    """
+    forms = Form.objects.filter(submitted=True)
+    form_answers = FormAnswer.objects.filter(form__submitted=True)
+    checkbox_choices = FormAnswer.choices.through.objects.filter(
+        formanswer__form__submitted=True
+    )
+    survey_stats = SurveyStats.objects.all()
+    question_stats = QuestionStats.objects.all()
+    answer_stats = AnswerStats.objects.all()
+
+    if survey_ids is not None:
+        forms = forms.filter(survey_id__in=survey_ids)
+        form_answers = form_answers.filter(form__survey_id__in=survey_ids)
+        checkbox_choices = checkbox_choices.filter(
+            formanswer__form__survey_id__in=survey_ids
+        )
+        survey_stats = survey_stats.filter(survey_id__in=survey_ids)
+        question_stats = question_stats.filter(question__survey_id__in=survey_ids)
+        answer_stats = answer_stats.filter(answer__question__survey_id__in=survey_ids)
+
+    survey_stats.delete()
+    question_stats.delete()
+    answer_stats.delete()
+
+    forms_amounts = forms.values_list('survey_id').annotate(Count('pk')).order_by()
+    answers_amounts, chosen_amounts = _count_answers(form_answers, checkbox_choices)
+
+    SurveyStats.objects.bulk_create([
+        SurveyStats(survey_id=pk, forms_amount=amount)
+        for pk, amount in forms_amounts
+    ])
+    QuestionStats.objects.bulk_create([
+        QuestionStats(question_id=pk, answers_amount=amount)
+        for pk, amount in answers_amounts.items()
+    ])
+    AnswerStats.objects.bulk_create([
+        AnswerStats(answer_id=pk, chosen_amount=amount)
+        for pk, amount in chosen_amounts.items()
+    ])
+
+    if survey_ids is None:
+        survey_ids = list(Survey.objects.values_list('pk', flat=True))
+    _bump_results_version(survey_ids)
@@ -0,0 +1,99 @@
+import tempfile
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.surveys import analytics, cache, columnar
+from apps.surveys.models import Survey, Question, Answer, Form
+
+
+def clear_caches():
+    """ In-process and shared caches outlive test transactions
+    and ids of rolled back rows are reused
+    """
+    for local_cache in (cache._local_cache, analytics._local_cache, columnar._local_cache):
+        local_cache.clear()
+    for shared_cache in caches.all():
+        shared_cache.clear()
+
+
+class SurveyTestMixin:
+    """ Survey with a TEXT, a CHOICE and a CHECKBOX question,
+    CHOICE and CHECKBOX ones have 3 answers
+    """
+    def setUp(self):
+        super().setUp()
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+        now = timezone.now()
+        self.survey = Survey.objects.create(
+            title='survey',
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1)
+        )
+        self.text_question = Question.objects.create(
+            survey=self.survey, type=Question.TEXT, text='text'
+        )
+        self.choice_question = Question.objects.create(
+            survey=self.survey, type=Question.CHOICE, text='choice'
+        )
+        self.checkbox_question = Question.objects.create(
+            survey=self.survey, type=Question.CHECKBOX, text='checkbox'
+        )
+        self.choices = [
+            Answer.objects.create(question=self.choice_question, text=f'choice {i}')
+            for i in range(3)
+        ]
+        self.checkboxes = [
+            Answer.objects.create(question=self.checkbox_question, text=f'checkbox {i}')
+            for i in range(3)
+        ]
+
+    def use_snapshots_root(self):
+        """ Columnar snapshots are written to a temporary directory
+        """
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings_override = override_settings(SURVEY_SNAPSHOTS={'ROOT': root.name, 'LOCAL_SIZE': 4})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def close_survey(self):
+        Survey.objects.filter(pk=self.survey.pk).update(end_date=timezone.now() - timedelta(seconds=1))
+        # Surveys are updated without signals
+        cache.bump_version(self.survey.pk)
+
+    def login_admin(self):
+        admin = CustomUser.objects.create_superuser('admin', 'admin@mail.com', 'pass')
+        self.client.force_authenticate(admin)
+        return admin
+
+    def answers_data(self, choice=0, checkboxes=(0, 1), text='text') -> list:
+        return [
+            {'question': self.text_question.pk, 'text': text},
+            {'question': self.choice_question.pk, 'choice': self.choices[choice].pk},
+            {
+                'question': self.checkbox_question.pk,
+                'choices': [self.checkboxes[i].pk for i in checkboxes]
+            },
+        ]
+
+    def submit_form(self, **answers) -> Form:
+        """ Answer all questions of a new form and submit it with API
+        """
+        form = Form.objects.create(survey=self.survey)
+        response = self.client.post(
+            reverse('form_answers', args=[form.pk]),
+            self.answers_data(**answers),
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        response = self.client.put(reverse('form_submit', args=[form.pk]), {}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        form.refresh_from_db()
+        return form
@@ -0,0 +1,166 @@
+from django.urls import reverse
+
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from apps.accounts.models import CustomUser
+from apps.surveys.models import Form, FormAnswer
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class AnalyticsTestMixin(SurveyTestMixin):
+    """ Four submitted forms, respondents are 18, 30, 45 and unknown
+    """
+    def setUp(self):
+        super().setUp()
+        for age, choice, checkboxes in (
+            (18, 0, (0, 1)),
+            (30, 1, (1, 2)),
+            (45, 0, (0, )),
+            (None, 2, (0, 2)),
+        ):
+            self.fill(age, choice, checkboxes)
+        # Not submitted forms are not counted
+        form = Form.objects.create(survey=self.survey)
+        FormAnswer.objects.create(form=form, question=self.choice_question, choice=self.choices[0])
+        self.login_admin()
+
+    def fill(self, age, choice, checkboxes) -> Form:
+        data = {'answers': self.answers_data(choice, checkboxes)}
+        if age is not None:
+            data['respondent'] = {'first_name': 'first', 'last_name': 'last', 'age': age}
+        response = self.client.post(reverse('fill_survey', args=[self.survey.pk]), data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Form.objects.get(pk=response.data['pk'])
+
+    def get(self, **params):
+        return self.client.get(reverse('survey_analytics', args=[self.survey.pk]), params)
+
+    def analytics(self, **params) -> dict:
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def pks(self, answers) -> list:
+        return [answer.pk for answer in answers]
+
+
+class SurveyAnalyticsTestCase(AnalyticsTestMixin, APITestCase):
+    def test_distribution(self):
+        analytics = self.analytics(question=self.choice_question.pk)
+        self.assertEqual(analytics['forms_amount'], 4)
+        self.assertEqual(analytics['answers'], self.pks(self.choices))
+        self.assertEqual(analytics['distribution'], [2, 1, 1])
+        self.assertNotIn('crosstab', analytics)
+        self.assertNotIn('cooccurrence', analytics)
+
+    def test_crosstab(self):
+        analytics = self.analytics(question=self.choice_question.pk, by=self.checkbox_question.pk)
+        self.assertEqual(analytics['columns'], self.pks(self.checkboxes))
+        self.assertEqual(analytics['crosstab'], [[2, 1, 0], [0, 1, 1], [1, 0, 1]])
+
+        # Same as counted by database
+        for row, choice in enumerate(self.choices):
+            for column, checkbox in enumerate(self.checkboxes):
+                amount = Form.objects.filter(
+                    submitted=True, answers__choice=choice
+                ).filter(answers__choices=checkbox).count()
+                self.assertEqual(analytics['crosstab'][row][column], amount)
+
+    def test_age_crosstab(self):
+        analytics = self.analytics(question=self.choice_question.pk, by='age', age_brackets=[20, 40])
+        self.assertEqual(analytics['columns'], ['<20', '20-39', '40+', 'unknown'])
+        self.assertEqual(analytics['crosstab'], [[1, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+
+    def test_cooccurrence(self):
+        analytics = self.analytics(question=self.checkbox_question.pk)
+        self.assertEqual(analytics['distribution'], [3, 2, 2])
+        self.assertEqual(analytics['cooccurrence'], [[3, 1, 1], [1, 2, 1], [1, 1, 2]])
+
+    def test_filters(self):
+        analytics = self.analytics(
+            question=self.choice_question.pk, answers=[self.checkboxes[0].pk], age_min=25
+        )
+        self.assertEqual(analytics['forms_amount'], 1)
+        self.assertEqual(analytics['distribution'], [1, 0, 0])
+
+        # Forms without respondent don't match an age range
+        analytics = self.analytics(question=self.choice_question.pk, age_max=40)
+        self.assertEqual(analytics['distribution'], [1, 1, 0])
+
+        analytics = self.analytics(
+            question=self.choice_question.pk, answers=self.pks(self.checkboxes[1:])
+        )
+        self.assertEqual(analytics['distribution'], [0, 1, 0])
+
+    def test_not_valid_params(self):
+        cases = {
+            'no question': {},
+            'TEXT question': {'question': self.text_question.pk},
+            'unknown question': {'question': self.checkbox_question.pk + 1},
+            'unknown by': {'question': self.choice_question.pk, 'by': 'name'},
+            'TEXT by': {'question': self.choice_question.pk, 'by': self.text_question.pk},
+            'unknown answers': {'question': self.choice_question.pk, 'answers': [self.checkboxes[-1].pk + 1]},
+            'not ascending brackets': {'question': self.choice_question.pk, 'age_brackets': [40, 20]},
+            'age range': {'question': self.choice_question.pk, 'age_min': 40, 'age_max': 20},
+        }
+        for case, params in cases.items():
+            with self.subTest(case):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    def test_not_found(self):
+        response = self.client.get(
+            reverse('survey_analytics', args=[self.survey.pk + 1]), {'question': self.choice_question.pk}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_permissions(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.get(question=self.choice_question.pk).status_code, 401)
+
+        user = CustomUser.objects.create_user('user', 'user@mail.com', 'pass')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.get(question=self.choice_question.pk).status_code, 403)
+
+
+class AnalyticsResultsVersionTestCase(AnalyticsTestMixin, APITransactionTestCase):
+    """ Results version is replaced on commit, so transactions are not rolled back
+    """
+    def test_submit(self):
+        self.assertEqual(self.analytics(question=self.choice_question.pk)['distribution'], [2, 1, 1])
+        self.fill(50, 2, (1, ))
+        self.assertEqual(self.analytics(question=self.choice_question.pk)['distribution'], [2, 1, 2])
+
+    def test_form_delete(self):
+        self.assertEqual(self.analytics(question=self.choice_question.pk)['distribution'], [2, 1, 1])
+        Form.objects.filter(submitted=True, answers__choice=self.choices[0]).delete()
+        self.assertEqual(self.analytics(question=self.choice_question.pk)['distribution'], [0, 1, 1])
+
+    def age_crosstab(self) -> list:
+        return self.analytics(question=self.choice_question.pk, by='age', age_brackets=[20, 40])['crosstab']
+
+    def test_respondent_change(self):
+        form = self.fill(35, 2, (1, ))
+        self.assertEqual(self.age_crosstab()[2], [0, 1, 0, 1])
+
+        response = self.client.put(
+            reverse('form_respondent', args=[form.pk]),
+            {'first_name': 'first', 'last_name': 'last', 'age': 50},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.age_crosstab()[2], [0, 0, 1, 1])
+
+        response = self.client.delete(reverse('form_respondent', args=[form.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.age_crosstab()[2], [0, 0, 0, 2])
+
+    def test_respondent_set(self):
+        form = Form.objects.get(submitted=True, respondent__isnull=True)
+        self.assertEqual(self.age_crosstab()[2], [0, 0, 0, 1])
+        response = self.client.post(
+            reverse('form_respondent', args=[form.pk]),
+            {'first_name': 'first', 'last_name': 'last', 'age': 10},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.age_crosstab()[2], [1, 0, 0, 0])
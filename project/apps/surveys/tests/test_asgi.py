@@ -0,0 +1,87 @@
+import asyncio
+
+from django.core.wsgi import get_wsgi_application
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from apps.surveys.asgi import RespondentApplication
+from apps.surveys.models import Form
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+# Headers which depend on the request or are set by other middlewares
+COMPARED_HEADERS = (
+    'content-type', 'etag', 'cache-control', 'vary',
+    'access-control-allow-origin', 'access-control-allow-credentials',
+)
+
+
+class RespondentApplicationTestCase(SurveyTestMixin, TransactionTestCase):
+    """ Handlers run in threads with their own connections,
+    so data is committed
+    """
+    def setUp(self):
+        super().setUp()
+        self.application = RespondentApplication(get_wsgi_application(), threads=2)
+        self.addCleanup(self.application.executor.shutdown)
+        self.form = Form.objects.create(survey=self.survey)
+
+    def call(self, path: str, headers: dict = None) -> tuple:
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': b'',
+            'headers': [
+                (name.lower().encode(), value.encode())
+                for name, value in (headers or {}).items()
+            ],
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.application(scope, receive, send))
+        start, body = messages
+        headers = {name.decode().lower(): value.decode() for name, value in start['headers']}
+        return start['status'], headers, body['body']
+
+    def assertSameResponse(self, path: str, headers: dict = None):
+        headers = headers or {}
+        status, asgi_headers, body = self.call(path, headers)
+        response = self.client.get(path, **{
+            'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()
+        })
+        self.assertEqual(status, response.status_code)
+        self.assertEqual(body, response.content)
+        for name in COMPARED_HEADERS:
+            with self.subTest(header=name):
+                self.assertEqual(asgi_headers.get(name), response.get(name))
+        return status, asgi_headers
+
+    def test_form_survey(self):
+        status, headers = self.assertSameResponse(reverse('form_survey', args=[self.form.pk]))
+        self.assertEqual(status, 200)
+        self.assertIn('public', headers['cache-control'])
+
+    def test_form_survey_questions(self):
+        self.assertSameResponse(
+            reverse('form_survey_questions', args=[self.form.pk]),
+            {'Origin': 'https://example.com'}
+        )
+
+    def test_not_modified(self):
+        path = reverse('form_survey', args=[self.form.pk])
+        _, headers, _ = self.call(path)
+        status, _ = self.assertSameResponse(path, {'If-None-Match': headers['etag']})
+        self.assertEqual(status, 304)
+
+    def test_not_found(self):
+        self.assertSameResponse(
+            reverse('form_survey', args=['00000000-0000-0000-0000-000000000000']),
+            {'Origin': 'https://example.com'}
+        )
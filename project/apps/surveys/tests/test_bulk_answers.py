@@ -0,0 +1,94 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from apps.surveys.models import Form, FormAnswer, Question
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class BulkAnswersTestCase(SurveyTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(survey=self.survey)
+        self.url = reverse('form_answers', args=[self.form.pk])
+
+    def post(self, data):
+        return self.client.post(self.url, data, format='json')
+
+    def test_create(self):
+        response = self.post(self.answers_data(choice=1, checkboxes=(0, 2)))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data), 3)
+
+        self.form.refresh_from_db()
+        self.assertEqual(self.form.answered_count, 3)
+        checkbox_answer = self.form.answers.get(question=self.checkbox_question)
+        self.assertEqual(
+            set(checkbox_answer.choices.values_list('pk', flat=True)),
+            {self.checkboxes[0].pk, self.checkboxes[2].pk}
+        )
+        self.assertEqual(self.form.answers.get(question=self.choice_question).choice, self.choices[1])
+
+    def test_constant_queries(self):
+        def count_queries(questions_amount: int) -> int:
+            form = Form.objects.create(survey=self.survey)
+            questions = Question.objects.filter(
+                survey=self.survey, type=Question.TEXT
+            )[:questions_amount]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    reverse('form_answers', args=[form.pk]),
+                    [{'question': question.pk, 'text': 'text'} for question in questions],
+                    format='json'
+                )
+            self.assertEqual(response.status_code, 201, response.data)
+            return len(context.captured_queries)
+
+        for i in range(3):
+            Question.objects.create(survey=self.survey, type=Question.TEXT, text=str(i))
+        # Survey definition is cached by the first request
+        count_queries(1)
+        self.assertEqual(count_queries(1), count_queries(4))
+
+    def test_duplicate_choices(self):
+        data = self.answers_data()
+        data[2]['choices'] = [self.checkboxes[1].pk, self.checkboxes[1].pk, self.checkboxes[0].pk]
+        response = self.post(data)
+        self.assertEqual(response.status_code, 201, response.data)
+        checkbox_answer = self.form.answers.get(question=self.checkbox_question)
+        self.assertEqual(checkbox_answer.choices.count(), 2)
+
+    def test_single_answer_duplicate_choices(self):
+        response = self.post({
+            'question': self.checkbox_question.pk,
+            'choices': [self.checkboxes[0].pk, self.checkboxes[0].pk]
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.form.answers.get().choices.count(), 1)
+
+    def test_invalid_answers(self):
+        invalid_items = [
+            {'question': 0, 'text': 'text'},
+            {'question': self.choice_question.pk, 'choice': self.checkboxes[0].pk},
+            {'question': self.checkbox_question.pk, 'choices': [self.choices[0].pk]},
+            {'question': self.text_question.pk},
+            {'question': self.text_question.pk, 'choice': self.choices[0].pk, 'text': 'text'},
+        ]
+        for item in invalid_items:
+            with self.subTest(item=item):
+                response = self.post([item])
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(FormAnswer.objects.exists())
+
+    def test_repeated_question(self):
+        self.assertEqual(self.post(self.answers_data()[:1]).status_code, 201)
+        self.assertEqual(self.post(self.answers_data()[:1]).status_code, 400)
+        response = self.post([self.answers_data()[1], self.answers_data()[1]])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.form.answers.count(), 1)
+
+    def test_submitted_form(self):
+        Form.objects.filter(pk=self.form.pk).update(submitted=True)
+        self.assertEqual(self.post(self.answers_data()).status_code, 400)
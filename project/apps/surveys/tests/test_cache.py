@@ -0,0 +1,59 @@
+import tempfile
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from apps.surveys import cache
+from apps.surveys.checks import check_definition_cache, check_drafts_cache
+from apps.surveys.models import Question
+from apps.surveys.tests.base import SurveyTestMixin, clear_caches
+
+
+class DefinitionVersionTestCase(SurveyTestMixin, TransactionTestCase):
+    """ Versions are bumped after commit of changes
+    """
+    def test_question_change(self):
+        definition = cache.get_survey_definition(self.survey.pk)
+        self.assertEqual(len(definition.questions), 3)
+
+        Question.objects.create(survey=self.survey, type=Question.TEXT, text='new')
+        changed_definition = cache.get_survey_definition(self.survey.pk)
+        self.assertNotEqual(changed_definition.version, definition.version)
+        self.assertEqual(len(changed_definition.questions), 4)
+
+    def test_version_of_other_process(self):
+        """ Definition cached in process is outdated by a version
+        bumped in the shared cache by another process
+        """
+        definition = cache.get_survey_definition(self.survey.pk)
+        Question.objects.filter(pk=self.text_question.pk).update(text='changed')
+        self.assertIs(cache.get_survey_definition(self.survey.pk), definition)
+
+        cache.bump_version(self.survey.pk)
+        changed_definition = cache.get_survey_definition(self.survey.pk)
+        self.assertEqual(changed_definition.questions[0].text, 'changed')
+
+    def test_active_surveys(self):
+        self.assertIn(self.survey.pk, [survey.pk for survey in cache.get_active_surveys().surveys])
+        self.survey.delete()
+        self.assertEqual(cache.get_active_surveys().surveys, [])
+
+
+class SharedCacheChecksTestCase(SimpleTestCase):
+    def tearDown(self):
+        clear_caches()
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_process_cache(self):
+        self.assertEqual([error.id for error in check_definition_cache(None)], ['surveys.W002'])
+        self.assertEqual([error.id for error in check_drafts_cache(None)], ['surveys.W001'])
+
+    def test_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}):
+                self.assertEqual(check_definition_cache(None), [])
+                self.assertEqual(check_drafts_cache(None), [])
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_max_age
+
+from rest_framework.test import APITestCase
+
+from apps.surveys import cache
+from apps.surveys.models import Survey, Form
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+@override_settings(FORM_SURVEY_MAX_AGE=5, CACHE_STALE_WHILE_REVALIDATE=10)
+class PublicCacheControlTestCase(SurveyTestMixin, APITestCase):
+    """ Anonymous reads which nginx may cache
+    """
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(survey=self.survey)
+
+    def assertPublic(self, response, max_age: int):
+        self.assertEqual(response.status_code, 200)
+        cache_control = {value.strip() for value in response['Cache-Control'].split(',')}
+        self.assertIn('public', cache_control)
+        self.assertIn('stale-while-revalidate=10', cache_control)
+        self.assertEqual(get_max_age(response), max_age)
+        vary = {value.strip() for value in response['Vary'].split(',')}
+        # Responses to tokens are not shared
+        self.assertTrue({'Accept', 'Authorization'} <= vary)
+
+    @override_settings(ACTIVE_SURVEYS_MAX_AGE=60)
+    def test_active_surveys(self):
+        self.assertPublic(self.client.get(reverse('all_active_surveys')), 60)
+
+    @override_settings(ACTIVE_SURVEYS_MAX_AGE=60)
+    def test_active_surveys_before_end(self):
+        Survey.objects.filter(pk=self.survey.pk).update(end_date=timezone.now() + timedelta(seconds=30))
+        cache.bump_version(self.survey.pk)
+        response = self.client.get(reverse('all_active_surveys'))
+        self.assertEqual(response.status_code, 200)
+        # Not cached after the survey ends
+        self.assertLessEqual(get_max_age(response), 30)
+
+    def test_form_survey(self):
+        self.assertPublic(self.client.get(reverse('form_survey', args=[self.form.pk])), 5)
+        self.assertPublic(self.client.get(reverse('form_survey_questions', args=[self.form.pk])), 5)
+
+    def test_not_modified(self):
+        url = reverse('form_survey_questions', args=[self.form.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # nginx refreshes its copy from revalidated responses
+        self.assertEqual(get_max_age(response), 5)
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_private_reads(self):
+        response = self.client.get(reverse('form_detail', args=[self.form.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from apps.surveys.models import Answer, Form, Question
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class ChoiceValidationTestCase(SurveyTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(survey=self.survey)
+        self.url = reverse('form_answers', args=[self.form.pk])
+
+    def test_allowed_choices(self):
+        response = self.client.post(self.url, [
+            {'question': self.choice_question.pk, 'choice': self.choices[0].pk},
+            {'question': self.checkbox_question.pk, 'choices': [self.checkboxes[1].pk]},
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_choices_of_other_question(self):
+        for item in (
+            {'question': self.choice_question.pk, 'choice': self.checkboxes[0].pk},
+            {'question': self.checkbox_question.pk, 'choices': [self.checkboxes[0].pk, self.choices[0].pk]},
+            {'question': self.checkbox_question.pk, 'choices': [0]},
+        ):
+            with self.subTest(item=item):
+                self.assertEqual(self.client.post(self.url, item, format='json').status_code, 400)
+        self.assertFalse(self.form.answers.exists())
+
+    def test_answers_are_not_queried(self):
+        """ Allowed answers of bulk payloads are taken from the cached definition
+        """
+        self.client.post(self.url, [{'question': self.text_question.pk, 'text': 'text'}], format='json')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, [
+                {'question': self.choice_question.pk, 'choice': self.choices[0].pk},
+                {'question': self.checkbox_question.pk, 'choices': [self.checkboxes[0].pk]},
+            ], format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        # Choices of created answers are prefetched for the response
+        answer_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "surveys_answer"' in query['sql']
+            and 'surveys_formanswer_choices' not in query['sql']
+        ]
+        self.assertEqual(answer_queries, [])
+
+
+class NewAnswerValidationTestCase(SurveyTestMixin, APITransactionTestCase):
+    """ Definitions are replaced after commit of question changes
+    """
+    def test_added_answer(self):
+        form = Form.objects.create(survey=self.survey)
+        url = reverse('form_answers', args=[form.pk])
+        # Caches the definition
+        self.client.post(url, {'question': self.text_question.pk, 'text': 'text'}, format='json')
+
+        answer = Answer.objects.create(question=self.choice_question, text='new')
+        response = self.client.post(url, {'question': self.choice_question.pk, 'choice': answer.pk}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_added_question(self):
+        form = Form.objects.create(survey=self.survey)
+        url = reverse('form_answers', args=[form.pk])
+        self.client.post(url, {'question': self.text_question.pk, 'text': 'text'}, format='json')
+
+        question = Question.objects.create(survey=self.survey, type=Question.CHOICE, text='new')
+        answer = Answer.objects.create(question=question, text='new')
+        response = self.client.post(url, {'question': question.pk, 'choice': answer.pk}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from rest_framework.test import APITransactionTestCase
+
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.columnar import build_survey_snapshot, get_survey_snapshot
+from apps.surveys.export import iter_survey_responses
+from apps.surveys.models import Answer, Form, FormAnswer
+from apps.surveys.tests.base import SurveyTestMixin, clear_caches
+
+
+class SurveySnapshotTestCase(SurveyTestMixin, APITransactionTestCase):
+    """ Snapshots are deleted on commit, so transactions are not rolled back
+    """
+    def setUp(self):
+        super().setUp()
+        self.use_snapshots_root()
+        self.forms = [
+            self.fill(choice=0, checkboxes=(0, 1), respondent={'first_name': 'first', 'last_name': 'last', 'age': 18}),
+            self.fill(choice=1, checkboxes=(1, ), respondent={'first_name': 'имя', 'last_name': 'last', 'age': 40}),
+            self.fill(choice=2, checkboxes=(2, ), text='текст'),
+        ]
+        # Not submitted forms are not stored
+        Form.objects.create(survey=self.survey)
+        self.close_survey()
+
+    def fill(self, respondent=None, **answers) -> Form:
+        data = {'answers': self.answers_data(**answers)}
+        if respondent is not None:
+            data['respondent'] = respondent
+        response = self.client.post(reverse('fill_survey', args=[self.survey.pk]), data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Form.objects.get(pk=response.data['pk'])
+
+    def definition(self):
+        return get_survey_definition(self.survey.pk)
+
+    def build(self):
+        meta = build_survey_snapshot(self.definition())
+        self.assertIsNotNone(self.snapshot())
+        return meta
+
+    def snapshot(self):
+        return get_survey_snapshot(self.definition())
+
+    def test_build(self):
+        meta = self.build()
+        self.assertEqual(meta['forms_amount'], 3)
+
+        questions = self.definition().questions
+        self.assertEqual(
+            list(self.snapshot().iter_responses(questions, chunk_size=2)),
+            list(iter_survey_responses(self.survey.pk, questions))
+        )
+
+    def test_not_closed_survey(self):
+        self.survey.end_date = self.survey.start_date.replace(year=self.survey.start_date.year + 1)
+        self.survey.save()
+        with self.assertRaises(ValueError):
+            build_survey_snapshot(self.definition())
+        self.assertIsNone(self.snapshot())
+
+    def test_same_responses(self):
+        self.login_admin()
+        requests = [
+            (reverse('survey_stats', args=[self.survey.pk]), {}),
+            (reverse('survey_analytics', args=[self.survey.pk]), {
+                'question': self.checkbox_question.pk, 'by': self.choice_question.pk,
+            }),
+            (reverse('survey_analytics', args=[self.survey.pk]), {
+                'question': self.choice_question.pk, 'by': 'age',
+            }),
+        ]
+        from_database = [self.client.get(url, params).data for url, params in requests]
+        export = b''.join(self.client.get(reverse('survey_export', args=[self.survey.pk])).streaming_content)
+
+        self.build()
+        # Analytics results are cached
+        clear_caches()
+        self.assertEqual([self.client.get(url, params).data for url, params in requests], from_database)
+        self.assertEqual(
+            b''.join(self.client.get(reverse('survey_export', args=[self.survey.pk])).streaming_content),
+            export
+        )
+
+    def test_form_delete(self):
+        self.build()
+        self.forms[0].delete()
+        self.assertIsNone(self.snapshot())
+
+    def test_form_answer_change(self):
+        self.build()
+        form_answer = FormAnswer.objects.get(form=self.forms[0], question=self.text_question)
+        form_answer.text = 'changed'
+        form_answer.save()
+        self.assertIsNone(self.snapshot())
+
+    def test_respondent_change(self):
+        self.build()
+        respondent = self.forms[0].respondent
+        respondent.age = 19
+        respondent.save()
+        self.assertIsNone(self.snapshot())
+
+    def test_respondent_delete(self):
+        self.build()
+        self.forms[1].respondent.delete()
+        self.assertIsNone(self.snapshot())
+
+    def test_respondent_set(self):
+        self.build()
+        response = self.client.post(
+            reverse('form_respondent', args=[self.forms[2].pk]),
+            {'first_name': 'first', 'last_name': 'last', 'age': 30},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNone(self.snapshot())
+
+    def test_definition_change(self):
+        self.build()
+        Answer.objects.create(question=self.choice_question, text='choice 3')
+        # Files are kept, but don't match the definition
+        self.assertIsNone(self.snapshot())
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('build_survey_snapshots', stdout=stdout)
+        self.assertIn(f'Survey {self.survey.pk}: 3 forms', stdout.getvalue())
+        self.assertIsNotNone(self.snapshot())
+
+        # Snapshots which are up to date are not rebuilt
+        stdout = StringIO()
+        call_command('build_survey_snapshots', self.survey.pk, stdout=stdout)
+        self.assertNotIn(f'Survey {self.survey.pk}:', stdout.getvalue())
@@ -0,0 +1,119 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from apps.surveys.drafts import get_drafts, save_drafts
+from apps.surveys.models import Form
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class DraftsTestCase(SurveyTestMixin, APITransactionTestCase):
+    """ Drafts are deleted on commit, so transactions are not rolled back
+    """
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location.name,
+        }})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+        self.form = Form.objects.create(survey=self.survey)
+        self.question_pks = [self.text_question.pk, self.choice_question.pk, self.checkbox_question.pk]
+
+    def save(self, data):
+        return self.client.post(reverse('form_drafts', args=[self.form.pk]), data, format='json')
+
+    def test_save(self):
+        response = self.save(self.answers_data()[::-1])
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.save({'question': self.text_question.pk, 'text': 'changed'})
+        self.assertEqual(response.status_code, 200, response.data)
+
+        response = self.client.get(reverse('form_drafts', args=[self.form.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([draft['question'] for draft in response.data], self.question_pks)
+        self.assertEqual(response.data[0]['text'], 'changed')
+        # Drafts are not saved to database before submit
+        self.assertFalse(self.form.answers.exists())
+
+    def test_invalid_draft(self):
+        response = self.save({'question': self.choice_question.pk, 'choice': self.checkboxes[0].pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_drafts(self.form.pk, self.question_pks), [])
+
+    def test_submit(self):
+        self.save(self.answers_data())
+        response = self.client.put(reverse('form_submit', args=[self.form.pk]), {}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        self.form.refresh_from_db()
+        self.assertTrue(self.form.submitted)
+        self.assertEqual(self.form.answered_count, 3)
+        self.assertEqual(self.form.answers.get(question=self.choice_question).choice, self.choices[0])
+        self.assertEqual(get_drafts(self.form.pk, self.question_pks), [])
+
+    def test_submit_not_valid_draft(self):
+        self.save(self.answers_data())
+        # Answer is deleted after its draft was saved
+        self.choices[0].delete()
+        response = self.client.put(reverse('form_submit', args=[self.form.pk]), {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('drafts', response.data)
+
+        self.form.refresh_from_db()
+        self.assertFalse(self.form.submitted)
+        self.assertFalse(self.form.answers.exists())
+
+    def test_flush_command(self):
+        save_drafts(self.form.pk, [{
+            'question': self.text_question.pk, 'text': 'text', 'choice': None, 'choices': [],
+        }])
+        submitted = Form.objects.create(survey=self.survey, submitted=True)
+        save_drafts(submitted.pk, [{
+            'question': self.text_question.pk, 'text': 'text', 'choice': None, 'choices': [],
+        }])
+
+        stdout = StringIO()
+        call_command('flush_form_drafts', self.survey.pk, stdout=stdout)
+        self.assertIn('Drafts of 1 forms are flushed, 0 failed', stdout.getvalue())
+
+        self.form.refresh_from_db()
+        self.assertFalse(self.form.submitted)
+        self.assertEqual(self.form.answered_count, 1)
+        self.assertEqual(get_drafts(self.form.pk, self.question_pks), [])
+        self.assertFalse(submitted.answers.exists())
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+}})
+class DraftsDisabledTestCase(SurveyTestMixin, APITestCase):
+    """ Drafts in a cache of one process would be lost by others
+    """
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(survey=self.survey)
+
+    def test_view(self):
+        url = reverse('form_drafts', args=[self.form.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.post(url, self.answers_data(), format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_flush_command(self):
+        with self.assertRaises(CommandError):
+            call_command('flush_form_drafts', stdout=StringIO())
+
+    def test_submit(self):
+        form = self.submit_form()
+        self.assertTrue(form.submitted)
+        self.assertEqual(form.answered_count, 3)
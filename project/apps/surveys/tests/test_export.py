@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+from django.db import connection
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from apps.surveys.cache import get_survey_definition
+from apps.surveys.columnar import build_survey_snapshot, get_survey_snapshot
+from apps.surveys.export import _buffered, iter_export, iter_survey_responses
+from apps.surveys.models import Form, Question, Respondent
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class ExportTestCase(SurveyTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.use_snapshots_root()
+        self.answered_form = self.submit_form(choice=2, checkboxes=(0, 2), text='answer')
+        respondent = Respondent.objects.create(first_name='first', last_name='last', age=30)
+        # Forms of questions added after submit have no answers
+        self.empty_form = Form.objects.create(
+            survey=self.survey, respondent=respondent,
+            submitted=True, submitted_date=timezone.now()
+        )
+        Form.objects.create(survey=self.survey)
+
+    def export_rows(self) -> list:
+        return list(csv.reader(io.StringIO(''.join(iter_export(self.survey.pk, 'csv')))))
+
+    def test_cursor_in_transaction(self):
+        # Server-side cursors work behind PgBouncer in transactions only
+        savepoints = len(connection.savepoint_ids)
+        responses = iter_survey_responses(self.survey.pk, get_survey_definition(self.survey.pk).questions)
+        next(responses)
+        self.assertEqual(len(connection.savepoint_ids), savepoints + 1)
+        list(responses)
+        self.assertEqual(len(connection.savepoint_ids), savepoints)
+
+    def test_forms_without_answers(self):
+        responses = dict(
+            (form[0], answers)
+            for form, answers in iter_survey_responses(self.survey.pk, get_survey_definition(self.survey.pk).questions)
+        )
+        self.assertEqual(responses, {
+            self.answered_form.pk: {
+                self.text_question.pk: 'answer',
+                self.choice_question.pk: 'choice 2',
+                self.checkbox_question.pk: ['checkbox 0', 'checkbox 2'],
+            },
+            self.empty_form.pk: {},
+        })
+
+    def test_csv(self):
+        header, *rows = self.export_rows()
+        self.assertEqual(header[:5], ['form', 'submitted_date', 'first_name', 'last_name', 'age'])
+        rows = {row[0]: row for row in rows}
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[str(self.answered_form.pk)][5:], ['answer', 'choice 2', 'checkbox 0; checkbox 2'])
+        self.assertEqual(rows[str(self.empty_form.pk)][2:], ['first', 'last', '30', '', '', ''])
+
+    def test_chunks(self):
+        # Header is sent before rows are read
+        header = next(iter_export(self.survey.pk, 'csv'))
+        self.assertEqual(header, ''.join(iter_export(self.survey.pk, 'csv')).splitlines(True)[0])
+
+        chunks = list(_buffered(['header\n'] + ['row\n'] * 5, rows=2))
+        self.assertEqual(chunks, ['header\n', 'row\nrow\n', 'row\nrow\n', 'row\n'])
+        chunks = list(_buffered(['header\n'] + ['row\n'] * 5, size=8))
+        self.assertEqual(chunks, ['header\n', 'row\nrow\n', 'row\nrow\n', 'row\n'])
+        chunks = list(_buffered(['header\n'] + ['row\n'] * 2, seconds=0))
+        self.assertEqual(chunks, ['header\n', 'row\n', 'row\n'])
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in ''.join(iter_export(self.survey.pk, 'ndjson')).splitlines()]
+        self.assertEqual(
+            {row['form']: row['answers'] for row in rows},
+            {
+                str(self.answered_form.pk): {
+                    str(self.text_question.pk): 'answer',
+                    str(self.choice_question.pk): 'choice 2',
+                    str(self.checkbox_question.pk): ['checkbox 0', 'checkbox 2'],
+                },
+                str(self.empty_form.pk): {},
+            }
+        )
+
+    def test_snapshot_export(self):
+        rows = self.export_rows()
+        self.close_survey()
+        build_survey_snapshot(get_survey_definition(self.survey.pk))
+        self.assertIsNotNone(get_survey_snapshot(get_survey_definition(self.survey.pk)))
+        self.assertEqual(sorted(self.export_rows()[1:]), sorted(rows[1:]))
+
+    def test_snapshot_without_questions(self):
+        Question.objects.filter(survey=self.survey).delete()
+        self.close_survey()
+        definition = get_survey_definition(self.survey.pk)
+        build_survey_snapshot(definition)
+        snapshot = get_survey_snapshot(definition)
+        self.assertEqual(
+            sorted(form[0] for form, answers in snapshot.iter_responses(definition.questions)),
+            sorted([self.answered_form.pk, self.empty_form.pk])
+        )
+        self.assertEqual(len(self.export_rows()), 3)
@@ -0,0 +1,88 @@
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from apps.surveys import cache
+from apps.surveys.models import Form, Question, Answer, SurveyStats, AnswerStats
+from apps.surveys.snapshots import build_form_snapshot
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class SurveyFillTestCase(SurveyTestMixin, APITestCase):
+    def fill(self, answers=None, respondent=None, survey_pk=None):
+        data = {'answers': self.answers_data() if answers is None else answers}
+        if respondent is not None:
+            data['respondent'] = respondent
+        return self.client.post(
+            reverse('fill_survey', args=[survey_pk or self.survey.pk]), data, format='json'
+        )
+
+    def test_fill(self):
+        response = self.fill(respondent={'first_name': 'first', 'last_name': 'last', 'age': 30})
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(response.data['submitted'])
+        self.assertNotIn('answers', response.data)
+
+        form = Form.objects.get(pk=response.data['pk'])
+        self.assertTrue(form.submitted)
+        self.assertIsNotNone(form.submitted_date)
+        self.assertEqual(form.respondent.age, 30)
+        self.assertEqual(form.answered_count, 3)
+        self.assertEqual(form.answers_snapshot, build_form_snapshot(form.pk))
+
+        self.assertEqual(SurveyStats.objects.get(survey=self.survey).forms_amount, 1)
+        self.assertEqual(
+            dict(AnswerStats.objects.filter(chosen_amount__gt=0).values_list('answer_id', 'chosen_amount')),
+            {self.choices[0].pk: 1, self.checkboxes[0].pk: 1, self.checkboxes[1].pk: 1}
+        )
+
+    def test_fill_without_respondent(self):
+        response = self.fill()
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNone(Form.objects.get(pk=response.data['pk']).respondent)
+
+    def test_not_valid_answers(self):
+        cases = {
+            'unanswered question': self.answers_data()[:2],
+            'repeated question': self.answers_data() + self.answers_data()[:1],
+            'choice of other question': self.answers_data()[:1] + [
+                {'question': self.choice_question.pk, 'choice': self.checkboxes[0].pk},
+            ] + self.answers_data()[2:],
+            'choice to text question': [
+                {'question': self.text_question.pk, 'choice': self.choices[0].pk},
+            ] + self.answers_data()[1:],
+        }
+        for case, answers in cases.items():
+            with self.subTest(case):
+                response = self.fill(answers)
+                self.assertEqual(response.status_code, 400, response.data)
+        self.assertFalse(Form.objects.exists())
+        self.assertFalse(SurveyStats.objects.filter(forms_amount__gt=0).exists())
+
+    def test_not_active_survey(self):
+        self.close_survey()
+        response = self.fill()
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Form.objects.exists())
+
+    def test_not_found(self):
+        self.assertEqual(self.fill(survey_pk=self.survey.pk + 1).status_code, 404)
+
+    def test_queries(self):
+        # Warm survey definition cache
+        self.fill()
+        with self.assertNumQueries(19):
+            self.fill(respondent={'first_name': 'first', 'last_name': 'last', 'age': 30})
+
+        question = Question.objects.create(survey=self.survey, type=Question.CHECKBOX, text='more')
+        answers = [Answer.objects.create(question=question, text=f'more {i}') for i in range(3)]
+        # Bumped on commit otherwise
+        cache.bump_version(self.survey.pk)
+        self.fill(self.answers_data() + [{'question': question.pk, 'choices': [answers[0].pk]}])
+        # Amount of queries doesn't depend on amount of questions
+        with self.assertNumQueries(19):
+            response = self.fill(
+                self.answers_data() + [{'question': question.pk, 'choices': [answer.pk for answer in answers]}],
+                respondent={'first_name': 'first', 'last_name': 'last', 'age': 30}
+            )
+        self.assertEqual(response.status_code, 201, response.data)
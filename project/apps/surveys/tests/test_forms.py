@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from apps.surveys.models import Survey, Form, FormAnswer
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class FormAnswersDeleteTestCase(SurveyTestMixin, APITestCase):
+    def answer_form(self) -> Form:
+        form = Form.objects.create(survey=self.survey)
+        FormAnswer.objects.bulk_create_for_form(form, [
+            {'question': self.text_question, 'text': 'text'},
+            {'question': self.choice_question, 'choice': self.choices[0]},
+            {'question': self.checkbox_question, 'choices': self.checkboxes[:2]},
+        ])
+        Form.objects.filter(pk=form.pk).update(answers_snapshot={})
+        return form
+
+    def test_question_delete(self):
+        form = self.answer_form()
+        self.checkbox_question.delete()
+        form.refresh_from_db()
+        self.assertEqual(form.answered_count, 2)
+        self.assertIsNone(form.answers_snapshot)
+
+    def test_chosen_answer_delete(self):
+        form = self.answer_form()
+        self.choices[0].delete()
+        self.checkboxes[0].delete()
+        form.refresh_from_db()
+        self.assertEqual(form.answered_count, 2)
+        self.assertEqual(form.answered_count, form.answers.count())
+        self.assertIsNone(form.answers_snapshot)
+
+    def test_form_answer_delete(self):
+        form = self.answer_form()
+        form.answers.filter(question=self.text_question).delete()
+        form.answers.get(question=self.choice_question).delete()
+        form.refresh_from_db()
+        self.assertEqual(form.answered_count, 1)
+
+    def test_survey_delete_queries(self):
+        """ Answers and their choices are deleted in batches
+        """
+        def count_delete_queries(forms_amount: int) -> int:
+            self.setUp()
+            for _ in range(forms_amount):
+                self.answer_form()
+            with CaptureQueriesContext(connection) as context:
+                Survey.objects.get(pk=self.survey.pk).delete()
+            self.assertFalse(FormAnswer.objects.exists())
+            return len(context.captured_queries)
+
+        self.assertEqual(count_delete_queries(1), count_delete_queries(3))
+
+
+class RespondentTestCase(SurveyTestMixin, APITestCase):
+    def test_respondent_save_keeps_form_counters(self):
+        form = Form.objects.create(survey=self.survey)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse('form_respondent', args=[form.pk]),
+                {'first_name': 'first', 'last_name': 'last', 'age': 30},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        form_updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "surveys_form"')
+        ]
+        self.assertEqual(len(form_updates), 1)
+        self.assertNotIn('answered_count', form_updates[0])
+        self.assertNotIn('answers_snapshot', form_updates[0])
+        form.refresh_from_db()
+        self.assertEqual(form.respondent.first_name, 'first')
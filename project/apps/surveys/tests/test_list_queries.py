@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import CustomUser
+from apps.surveys.models import (
+    Survey,
+    Question,
+    Answer,
+    Form,
+    FormAnswer
+)
+
+
+class ListQueriesTestCase(APITestCase):
+    """ List endpoints should make the same amount of queries
+    regardless of amount of listed rows
+    """
+    def setUp(self):
+        admin = CustomUser.objects.create_superuser('admin', 'admin@mail.com', 'pass')
+        self.client.force_authenticate(admin)
+
+        now = timezone.now()
+        self.survey = Survey.objects.create(
+            title='survey',
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1)
+        )
+        self.form = Form.objects.create(survey=self.survey)
+
+    def add_rows(self):
+        text_question = Question.objects.create(
+            survey=self.survey, type=Question.TEXT, text='text'
+        )
+        checkbox_question = Question.objects.create(
+            survey=self.survey, type=Question.CHECKBOX, text='checkbox'
+        )
+        answers = [
+            Answer.objects.create(question=checkbox_question, text=str(i))
+            for i in range(3)
+        ]
+        FormAnswer.objects.create(form=self.form, question=text_question, text='text')
+        form_answer = FormAnswer.objects.create(form=self.form, question=checkbox_question)
+        form_answer.choices.set(answers)
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url: str):
+        self.add_rows()
+        queries_amount = self.count_queries(url)
+        for _ in range(3):
+            self.add_rows()
+        self.assertEqual(self.count_queries(url), queries_amount)
+
+    def test_survey_questions(self):
+        self.assertConstantQueries(reverse('survey_questions', args=[self.survey.pk]))
+
+    def test_questions(self):
+        self.assertConstantQueries(reverse('all_questions'))
+
+    def test_answers(self):
+        self.assertConstantQueries('/api/v1/answers/')
+
+    def test_forms(self):
+        self.assertConstantQueries(reverse('all_forms'))
+
+    def test_form_answers(self):
+        self.assertConstantQueries(reverse('form_answers', args=[self.form.pk]))
+
+    def test_all_form_answers(self):
+        self.assertConstantQueries('/api/v1/forms/answers/')
@@ -0,0 +1,70 @@
+import json
+from base64 import urlsafe_b64encode
+
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from apps.surveys.models import Form
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+def encode_cursor(values) -> str:
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+class KeysetPaginationTestCase(SurveyTestMixin, APITestCase):
+    """ Forms are listed by `-submitted_date`, `-pk`,
+    not submitted forms without date go last
+    """
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+        now = timezone.now()
+        submitted = [
+            Form.objects.create(survey=self.survey, submitted=True, submitted_date=now)
+            for _ in range(3)
+        ]
+        not_submitted = [Form.objects.create(survey=self.survey) for _ in range(2)]
+        self.ordered_pks = [
+            str(form.pk) for form in
+            sorted(submitted, key=lambda form: form.pk, reverse=True) +
+            sorted(not_submitted, key=lambda form: form.pk, reverse=True)
+        ]
+
+    def get(self, **params):
+        return self.client.get(reverse('all_forms'), params)
+
+    def test_pages(self):
+        pks = []
+        response = self.get(page_size=2)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pks += [form['pk'] for form in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(pks, self.ordered_pks)
+
+    def test_invalid_cursors(self):
+        cursors = [
+            'not base64 json',
+            encode_cursor({'pk': 1}),
+            encode_cursor([None]),
+            encode_cursor(['abc', 'abc']),
+            encode_cursor([[1], [1]]),
+            encode_cursor([{}, None]),
+            encode_cursor([None, 'not uuid']),
+            encode_cursor([None, 1.5]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.get(cursor=cursor).status_code, 404)
+
+    def test_invalid_integer_cursor(self):
+        # Form answers are listed by integer `pk`
+        for values in (['abc'], [[1]], [True, 1]):
+            with self.subTest(values=values):
+                response = self.client.get('/api/v1/forms/answers/', {'cursor': encode_cursor(values)})
+                self.assertEqual(response.status_code, 404)
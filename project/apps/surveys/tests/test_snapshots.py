@@ -0,0 +1,72 @@
+from django.urls import reverse
+
+from rest_framework.test import APITransactionTestCase
+
+from apps.surveys.models import Form, FormAnswer
+from apps.surveys.snapshots import build_form_snapshot
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class AnswersSnapshotTestCase(SurveyTestMixin, APITransactionTestCase):
+    """ Snapshots are refreshed on commit, so transactions are not rolled back
+    """
+    def test_submit(self):
+        form = self.submit_form(checkboxes=(2, 0))
+        self.assertEqual(form.answers_snapshot, build_form_snapshot(form.pk))
+
+        choice_answer = form.answers.get(question=self.choice_question)
+        self.assertEqual(form.answers_snapshot[str(self.choice_question.pk)], {
+            'pk': choice_answer.pk, 'text': '', 'choice': self.choices[0].pk, 'choices': [],
+        })
+        self.assertEqual(
+            form.answers_snapshot[str(self.checkbox_question.pk)]['choices'],
+            [self.checkboxes[0].pk, self.checkboxes[2].pk]
+        )
+
+    def test_answer_change(self):
+        form = Form.objects.create(survey=self.survey)
+        self.client.post(reverse('form_answers', args=[form.pk]), self.answers_data(), format='json')
+        text_answer = FormAnswer.objects.get(form=form, question=self.text_question)
+
+        response = self.client.patch(
+            f'/api/v1/forms/answers/{text_answer.pk}/', {'text': 'changed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        form.refresh_from_db()
+        self.assertEqual(form.answers_snapshot[str(self.text_question.pk)]['text'], 'changed')
+
+        response = self.client.delete(f'/api/v1/forms/answers/{text_answer.pk}/')
+        self.assertEqual(response.status_code, 204)
+        # Reset on delete and rebuilt on read
+        form.refresh_from_db()
+        self.assertIsNone(form.answers_snapshot)
+        response = self.client.get(reverse('form_full', args=[form.pk]))
+        self.assertIsNone(response.data['questions'][0]['answer'])
+
+    def test_full(self):
+        form = self.submit_form()
+        # Warm survey definition cache
+        self.client.get(reverse('form_full', args=[form.pk]))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('form_full', args=[form.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['submitted'])
+        self.assertEqual(response.data['survey']['pk'], self.survey.pk)
+        self.assertEqual(
+            [question['answer'] for question in response.data['questions']],
+            [form.answers_snapshot[str(question.pk)] for question in (
+                self.text_question, self.choice_question, self.checkbox_question
+            )]
+        )
+
+    def test_full_without_snapshot(self):
+        form = self.submit_form()
+        # Forms answered before snapshots were added
+        Form.objects.filter(pk=form.pk).update(answers_snapshot=None)
+
+        response = self.client.get(reverse('form_full', args=[form.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['questions'][0]['answer']['text'], 'text')
+        form.refresh_from_db()
+        self.assertEqual(form.answers_snapshot, build_form_snapshot(form.pk))
@@ -0,0 +1,113 @@
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from apps.surveys.models import (
+    Question,
+    Answer,
+    Form,
+    FormAnswer,
+    SurveyStats,
+    QuestionStats,
+    AnswerStats,
+)
+from apps.surveys.stats import rebuild_stats
+from apps.surveys.tests.base import SurveyTestMixin
+
+
+class StatsCountersTestCase(SurveyTestMixin, APITestCase):
+    """ Counters updated on submit and delete should be equal
+    to counters rebuilt from submitted forms
+    """
+    def counters(self) -> tuple:
+        # Rebuild doesn't create zero counters
+        return (
+            dict(SurveyStats.objects.filter(forms_amount__gt=0).values_list('survey_id', 'forms_amount')),
+            dict(QuestionStats.objects.filter(answers_amount__gt=0).values_list('question_id', 'answers_amount')),
+            dict(AnswerStats.objects.filter(chosen_amount__gt=0).values_list('answer_id', 'chosen_amount')),
+        )
+
+    def assertCountersRebuilt(self):
+        counters = self.counters()
+        rebuild_stats([self.survey.pk])
+        self.assertEqual(counters, self.counters())
+
+    def test_submit(self):
+        self.submit_form(choice=0, checkboxes=(0, 1))
+        self.submit_form(choice=1, checkboxes=(1, 2))
+        self.assertEqual(self.survey.stats.forms_amount, 2)
+        self.assertCountersRebuilt()
+
+    def test_form_delete(self):
+        form = self.submit_form(choice=0, checkboxes=(0, 1))
+        self.submit_form(choice=1, checkboxes=(1, 2))
+        form.delete()
+        self.assertEqual(self.counters()[0], {self.survey.pk: 1})
+        self.assertCountersRebuilt()
+
+    def test_queryset_delete(self):
+        self.submit_form(choice=0, checkboxes=(0, 1))
+        self.submit_form(choice=0, checkboxes=(0, 2))
+        self.submit_form(choice=1, checkboxes=(1, ))
+        Form.objects.filter(answers__choice=self.choices[0]).delete()
+        self.assertEqual(self.counters()[0], {self.survey.pk: 1})
+        self.assertCountersRebuilt()
+
+    def test_unsubmitted_form_delete(self):
+        self.submit_form()
+        counters = self.counters()
+        Form.objects.create(survey=self.survey).delete()
+        self.assertEqual(self.counters(), counters)
+
+    def test_form_answer_delete(self):
+        form = self.submit_form()
+        form.answers.get(question=self.checkbox_question).delete()
+        self.assertCountersRebuilt()
+
+    def test_survey_delete(self):
+        self.submit_form()
+        self.survey.delete()
+        self.assertEqual(self.counters(), ({}, {}, {}))
+
+    def assertEndpointRebuilt(self):
+        url = reverse('survey_stats', args=[self.survey.pk])
+        data = self.client.get(url).data
+        rebuild_stats([self.survey.pk])
+        self.assertEqual(data, self.client.get(url).data)
+
+    def test_chosen_answer_delete(self):
+        self.login_admin()
+        self.submit_form(choice=0, checkboxes=(0, 1))
+        self.submit_form(choice=1, checkboxes=(1, 2))
+        self.choices[0].delete()
+        self.checkboxes[1].delete()
+        self.assertEqual(self.counters()[1][self.choice_question.pk], 1)
+        self.assertEndpointRebuilt()
+
+    def test_answers_queryset_delete(self):
+        self.login_admin()
+        self.submit_form(choice=0, checkboxes=(0, 1))
+        self.submit_form(choice=1, checkboxes=(1, 2))
+        Answer.objects.filter(pk__in=[self.choices[1].pk, self.checkboxes[2].pk]).delete()
+        self.assertEqual(self.counters()[1][self.choice_question.pk], 1)
+        self.assertEndpointRebuilt()
+
+    def test_question_delete(self):
+        self.login_admin()
+        self.submit_form()
+        self.submit_form(choice=1)
+        self.choice_question.delete()
+        Question.objects.filter(pk=self.checkbox_question.pk).delete()
+        self.assertEndpointRebuilt()
+
+    def test_submitted_answers_are_not_changed(self):
+        form = self.submit_form()
+        self.login_admin()
+        form_answer = form.answers.get(question=self.choice_question)
+        url = reverse('answer_detail', args=[form_answer.pk])
+
+        response = self.client.patch(url, {'choice': self.choices[1].pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(FormAnswer.objects.filter(pk=form_answer.pk, choice=self.choices[0]).exists())
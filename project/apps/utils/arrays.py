@@ -0,0 +1,12 @@
+import numpy as np
+
+
+def positions(keys, values) -> np.ndarray:
+    """ Index of every value in not empty `keys` or -1 if it's not there
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=keys.dtype)
+    order = np.argsort(keys)
+    found = np.searchsorted(keys, values, sorter=order).clip(max=len(keys) - 1)
+    found = order[found]
+    return np.where(keys[found] == values, found, -1)
@@ -0,0 +1,135 @@
+""" Helpers to serve Django 2.2 (which has no ASGI support) from an ASGI server.
+"""
+import asyncio
+import io
+import sys
+
+from django.db import close_old_connections
+
+
+async def read_body(receive) -> bytes:
+    body = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(body)
+
+
+async def send_response(send, status: int, body: bytes = b'', headers: list = ()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin1'), value.encode('latin1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def run_with_connections(function, *args):
+    """ Run `function` in a worker thread closing expired and broken
+    database connections of this thread like Django request signals do
+    """
+    close_old_connections()
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+def build_environ(scope: dict, body: bytes) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        # PEP 3333 strings are latin1 decoded bytes
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+    return environ
+
+
+class WSGIFallback:
+    """ Serve a WSGI application using threads of `executor`.
+
+    Unlike `asgiref.wsgi.WsgiToAsgi` requests are not run in a single
+    shared thread. The whole request, including iteration over streaming
+    responses, runs in one thread, since Django database connections
+    can't be shared between threads.
+    """
+    def __init__(self, wsgi_application, executor):
+        self.wsgi_application = wsgi_application
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        body = await read_body(receive)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.run, scope, body, send, loop)
+
+    def run(self, scope: dict, body: bytes, send, loop):
+        def sync_send(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        start = {}
+
+        def start_response(status, headers, exc_info=None):
+            start['status'] = int(status.split(' ', 1)[0])
+            start['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in headers
+            ]
+
+        def send_start():
+            sync_send({'type': 'http.response.start', **start})
+
+        response = self.wsgi_application(build_environ(scope, body), start_response)
+        try:
+            started = False
+            for chunk in response:
+                if not started:
+                    send_start()
+                    started = True
+                if chunk:
+                    sync_send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                send_start()
+            sync_send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Sends `request_finished` which closes database connections
+            if hasattr(response, 'close'):
+                response.close()
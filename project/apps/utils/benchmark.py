@@ -0,0 +1,74 @@
+import math
+
+from apps.utils.asgi import build_environ
+
+
+def percentile(values: list, percent: float) -> float:
+    """ Nearest-rank percentile of not empty `values`
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings: list) -> dict:
+    """ Latency percentiles of `timings` (seconds) in milliseconds
+    """
+    return {
+        'p50': percentile(timings, 50) * 1000,
+        'p95': percentile(timings, 95) * 1000,
+        'p99': percentile(timings, 99) * 1000,
+        'max': max(timings) * 1000,
+    }
+
+
+def format_table(headers: list, rows: list) -> str:
+    rows = [
+        [f'{value:.2f}' if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [
+        max(len(str(header)), *(len(row[i]) for row in rows)) if rows else len(str(header))
+        for i, header in enumerate(headers)
+    ]
+    lines = [
+        '  '.join(str(header).ljust(width) for header, width in zip(headers, widths)),
+        '  '.join('-' * width for width in widths),
+    ]
+    for row in rows:
+        lines.append('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+    return '\n'.join(lines)
+
+
+def http_scope(path: str, query_string: str = '') -> dict:
+    """ ASGI scope of GET request
+    """
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query_string.encode('latin1'),
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def call_wsgi(application, path: str, query_string: str = '') -> int:
+    """ Make GET request to WSGI application like a server does
+    (unlike test client, request signals close database connections),
+    return response status
+    """
+    statuses = []
+    response = application(
+        build_environ(http_scope(path, query_string), b''),
+        lambda status, headers, exc_info=None: statuses.append(status)
+    )
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split(' ', 1)[0])
@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# Backends which keep items in the current process only
+_PROCESS_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+def is_shared_cache(alias: str) -> bool:
+    """ Whether items set to cache `alias` by one process
+    are seen by others
+    """
+    backend = settings.CACHES[alias]['BACKEND']
+    return backend.rsplit('.', 1)[-1] not in _PROCESS_BACKENDS
+
+
+class LRUCache:
+    """ Thread safe in-process cache which keeps
+    `maxsize` recently used items
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+            return self._items[key]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,39 @@
+class ConnectionHealthCheckMixin:
+    """ Check persistent connections before they are reused
+    by a request (`CONN_HEALTH_CHECKS` of Django 4.1).
+
+    Connections kept by `CONN_MAX_AGE` may be closed by the database,
+    a pooler or a network in between. A connection is pinged once per
+    request, before its first use outside of a transaction, and a new one
+    is opened if it doesn't respond, instead of failing the request.
+    """
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self) -> bool:
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Called at start and end of every request
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        self.close_if_health_check_failed()
+        super().ensure_connection()
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or self.health_check_done
+            or not self.health_check_enabled
+            or self.in_atomic_block
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from apps.utils.db.health import ConnectionHealthCheckMixin
+
+
+class DatabaseWrapper(ConnectionHealthCheckMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,32 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class JSONTextField(models.TextField):
+    """ JSON stored as text, so it works with every database
+    (`JSONField` of Django 2.2 requires PostgreSQL).
+    Values can't be filtered by their content.
+    """
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def to_python(self, value):
+        if not isinstance(value, str):
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise ValidationError('Value should be valid JSON', code='invalid')
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return json.dumps(value, cls=DjangoJSONEncoder)
+
+    def value_to_string(self, obj):
+        return self.get_prep_value(self.value_from_object(obj))
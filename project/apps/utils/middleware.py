@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of request duration histogram, seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class MetricsRegistry:
+    """ Per view counters of this process.
+    Every gunicorn worker has its own counters, labeled by `worker` pid,
+    so series of workers don't mix when scrapes reach different ones.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name: str, duration: float, queries: int, db_duration: float, render_duration: float):
+        with self._lock:
+            view = self._views.setdefault(view_name, {
+                'requests': 0,
+                'duration': 0.0,
+                'queries': 0,
+                'db_duration': 0.0,
+                'render_duration': 0.0,
+                'buckets': [0] * len(DURATION_BUCKETS),
+            })
+            view['requests'] += 1
+            view['duration'] += duration
+            view['queries'] += queries
+            view['db_duration'] += db_duration
+            view['render_duration'] += render_duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    view['buckets'][i] += 1
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            views = {name: dict(view, buckets=list(view['buckets'])) for name, view in self._views.items()}
+
+        # Read on every call, workers are forked after import
+        worker = os.getpid()
+        lines = [
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for name, view in sorted(views.items()):
+            labels = f'worker="{worker}",view="{name}"'
+            for bound, amount in zip(DURATION_BUCKETS, view['buckets']):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {amount}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {view["requests"]}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {view["duration"]}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {view["requests"]}')
+
+        for metric, key, kind in (
+            ('db_queries_total', 'queries', 'counter'),
+            ('db_query_duration_seconds_total', 'db_duration', 'counter'),
+            ('render_duration_seconds_total', 'render_duration', 'counter'),
+        ):
+            lines.append(f'# TYPE {metric} {kind}')
+            for name, view in sorted(views.items()):
+                lines.append(f'{metric}{{worker="{worker}",view="{name}"}} {view[key]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """ Database `execute_wrapper` timing queries of one request.
+    Queries of a request may run in several threads (see `apps.surveys.asgi`)
+    """
+    def __init__(self, slow_query_ms: int):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            with self.lock:
+                self.count += 1
+                self.duration += duration
+                if duration >= self.slow_query_seconds:
+                    self.slow_queries.append((duration, sql))
+
+
+def format_server_timing(timer: QueryTimer, render_duration: float, duration: float) -> str:
+    return ', '.join([
+        f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"',
+        f'render;dur={render_duration * 1000:.2f}',
+        f'total;dur={duration * 1000:.2f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """ Measure queries, SQL time, rendering time and total time of requests.
+
+    Results are added to `Server-Timing` header, collected per URL name
+    for `metrics_view` and logged when `REQUEST_METRICS` thresholds are exceeded.
+    Content of streaming responses is produced after this middleware,
+    so its queries are not counted.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = settings.REQUEST_METRICS
+
+    def __call__(self, request):
+        timer = QueryTimer(self.config['SLOW_QUERY_MS'])
+        request._render_duration = 0.0
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view_name = self.get_view_name(request)
+        registry.observe(
+            view_name, duration, timer.count, timer.duration, request._render_duration
+        )
+
+        if self.config['SERVER_TIMING']:
+            response['Server-Timing'] = format_server_timing(
+                timer, request._render_duration, duration
+            )
+
+        for query_duration, sql in timer.slow_queries:
+            logger.warning(
+                'Slow query %.2fms in %s: %s',
+                query_duration * 1000, view_name, sql[:2000]
+            )
+        if duration * 1000 >= self.config['SLOW_REQUEST_MS']:
+            logger.warning(
+                'Slow request %.2fms %s %s (%s) status %s: %s queries in %.2fms, render %.2fms',
+                duration * 1000, request.method, request.path, view_name,
+                response.status_code, timer.count, timer.duration * 1000,
+                request._render_duration * 1000
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to JSON) after this hook
+        render_started = time.perf_counter()
+
+        def finish_render(rendered_response):
+            request._render_duration = time.perf_counter() - render_started
+
+        response.add_post_render_callback(finish_render)
+        return response
+
+    def get_view_name(self, request) -> str:
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unresolved'
+        return resolver_match.view_name or resolver_match._func_path
@@ -0,0 +1,191 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, QuerySet
+
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Pages of unordered querysets may overlap
+        if isinstance(queryset, QuerySet) and not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetPagination(pagination.BasePagination):
+    """ Paginate by values of the last row of previous page
+    instead of OFFSET, so every page costs the same.
+
+    Rows are ordered by `keyset_ordering` of the view (or `ordering`),
+    which should end with a unique field. Nulls go last.
+    Only `next` link is provided.
+    """
+    ordering = ('pk',)
+    page_size = pagination.PageNumberPagination.page_size
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.get_order_by(queryset.model))
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            try:
+                queryset = queryset.filter(self.get_after_filter(queryset.model, cursor))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        if self.has_next:
+            self.next_values = [
+                getattr(page[-1], field.lstrip('-')) for field in self.ordering
+            ]
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_order_by(self, model) -> list:
+        order_by = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Explicit NULLS LAST doesn't match plain indexes
+            nulls_last = _get_model_field(model, name).null or None
+            if field.startswith('-'):
+                order_by.append(F(name).desc(nulls_last=nulls_last))
+            else:
+                order_by.append(F(name).asc(nulls_last=nulls_last))
+        return order_by
+
+    def get_after_filter(self, model, values: list) -> Q:
+        """ Rows after (f1, f2, ...) = (v1, v2, ...):
+        f1 after v1 OR (f1 = v1 AND f2 after v2) OR ...
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        conditions = []
+        equal_conditions = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            model_field = _get_model_field(model, name)
+            if value is not None:
+                # Invalid values fail here instead of in the query
+                value = model_field.to_python(value)
+            if value is None:
+                # Nulls are last, nothing goes after them
+                after = None
+                equal = Q(**{f'{name}__isnull': True})
+            else:
+                lookup = 'lt' if field.startswith('-') else 'gt'
+                after = Q(**{f'{name}__{lookup}': value})
+                if model_field.null:
+                    after |= Q(**{f'{name}__isnull': True})
+                equal = Q(**{name: value})
+
+            if after is not None:
+                conditions.append(reduce(and_, equal_conditions, after))
+            equal_conditions.append(equal)
+
+        if not conditions:
+            # Last row of the table
+            return Q(pk__in=[])
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # Only values of `encode_cursor`
+        if not isinstance(values, list) or not all(
+            value is None or isinstance(value, (str, int, float)) for value in values
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, values: list) -> str:
+        # `isoformat` keeps microseconds unlike `DjangoJSONEncoder`
+        data = json.dumps(
+            values,
+            default=lambda obj: obj.isoformat() if hasattr(obj, 'isoformat') else str(obj)
+        )
+        return urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(self.next_values)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+def _get_model_field(model, name: str):
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
@@ -0,0 +1,39 @@
+""" JSON renderer using `orjson`, which is several times faster than
+stdlib `json` on large lists. DRF renderer is used if `orjson`
+is not installed.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """ Same output as `JSONRenderer` (compact, UTF-8, U+2028 and U+2029
+    escaped), except datetimes that are not rendered by serializer
+    fields keep microseconds like serializer fields do.
+    UUIDs and timezone-aware datetimes are encoded by `orjson`,
+    other types (lazy strings, decimals, querysets) by DRF encoder.
+    """
+    options = 0 if orjson is None else orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # `orjson` indents by 2 spaces only, used by browsable API
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=_encode_default, option=self.options)
+        # Line separators are valid JSON but not valid JavaScript
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -1,3 +1,80 @@
-from django.test import TestCase
+import io
+import os
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.utils.middleware import MetricsRegistry
+from apps.utils.parsers import ORJSONParser
+from apps.utils.renderers import ORJSONRenderer
+
+
+class MetricsTestCase(SimpleTestCase):
+    def test_endpoint_is_disabled_by_default(self):
+        self.assertFalse(settings.REQUEST_METRICS['ENDPOINT'])
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    def test_endpoint(self):
+        with override_settings(REQUEST_METRICS=dict(settings.REQUEST_METRICS, ENDPOINT=True)):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+    def test_worker_label(self):
+        registry = MetricsRegistry()
+        registry.observe('view', 0.02, 3, 0.01, 0.005)
+        text = registry.to_prometheus()
+        self.assertIn(f'http_request_duration_seconds_count{{worker="{os.getpid()}",view="view"}} 1', text)
+        self.assertIn(f'db_queries_total{{worker="{os.getpid()}",view="view"}} 3', text)
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    def test_same_as_drf(self):
+        data = {
+            'pk': uuid.UUID('0187a0c4-4d5e-7000-8000-000000000000'),
+            'text': 'line\u2028separator\u2029и',
+            'lazy': gettext_lazy('text'),
+            'decimal': Decimal('1.50'),
+            'nested': [{1: None, 'float': 0.5, 'bool': True}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_datetime(self):
+        data = {'date': datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)}
+        self.assertEqual(ORJSONRenderer().render(data), b'{"date":"2020-01-02T03:04:05.678901Z"}')
+
+    def test_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent(self):
+        data = {'list': [1, 2]}
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+
+
+class ORJSONParserTestCase(SimpleTestCase):
+    def parse(self, body: bytes, encoding='utf-8'):
+        return ORJSONParser().parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parse(self):
+        body = '{"text": "и", "list": [1, 0.5, null]}'.encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body)))
+
+    def test_errors(self):
+        for body in (b'{"text": ', b'{"number": NaN}', b'[Infinity]'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_other_charset(self):
+        self.assertEqual(self.parse('{"text": "é"}'.encode('latin-1'), 'latin-1'), {'text': 'é'})
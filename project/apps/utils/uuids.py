@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last = (0, 0)
+
+
+def uuid7() -> uuid.UUID:
+    """ Time-ordered UUID of version 7 (RFC 9562): Unix time in milliseconds,
+    12 bits of sub-millisecond time and 62 random bits.
+
+    Values made later by the process are greater, so rows keyed by them
+    are appended to the end of B-tree indexes instead of random pages.
+    """
+    global _last
+
+    nanoseconds = time.time_ns()
+    milliseconds, fraction = divmod(nanoseconds, 1_000_000)
+    sequence = fraction * 4096 // 1_000_000
+    with _lock:
+        # Same or earlier time (clock resolution or adjustment)
+        if (milliseconds, sequence) <= _last:
+            milliseconds, sequence = _last
+            sequence += 1
+            if sequence == 4096:
+                milliseconds, sequence = milliseconds + 1, 0
+        _last = (milliseconds, sequence)
+
+    random_bits = int.from_bytes(os.urandom(8), 'big') & (2 ** 62 - 1)
+    value = (
+        (milliseconds & (2 ** 48 - 1)) << 80 |
+        0x7 << 76 |
+        sequence << 64 |
+        0b10 << 62 |
+        random_bits
+    )
+    return uuid.UUID(int=value)
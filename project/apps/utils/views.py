@@ -1,3 +1,108 @@
-from django.shortcuts import render
+import hashlib
+from calendar import timegm
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from apps.utils.middleware import registry
+
+
+class RelatedQuerysetMixin:
+    """ Apply `select_related` and `prefetch_related` declared 
+    in serializer `Meta` to the view queryset, so related fields 
+    don't make a query per serialized object.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+
+        select_related = getattr(meta, 'select_related', ())
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        prefetch_related = getattr(meta, 'prefetch_related', ())
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+
+def make_etag(state, renderer_format: str) -> str:
+    return quote_etag(hashlib.md5(repr((state, renderer_format)).encode()).hexdigest())
+
+
+def patch_public_cache_control(response, max_age: int):
+    """ Let clients and shared caches (nginx) reuse response 
+    for `max_age` seconds
+    """
+    patch_cache_control(
+        response, public=True, max_age=max_age,
+        stale_while_revalidate=settings.CACHE_STALE_WHILE_REVALIDATE
+    )
+    # Responses to tokens are not shared
+    patch_vary_headers(response, ['Accept', 'Authorization'])
+
+
+def patch_conditional_headers(response, etag: str, last_modified: int = None, max_age: int = None):
+    """ Validators and `Cache-Control` of conditional GET responses,
+    revalidated on every use unless `max_age` is given
+    """
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    if max_age is None:
+        # Clients store responses, but check them on every use
+        patch_cache_control(response, no_cache=True)
+    else:
+        patch_public_cache_control(response, max_age)
+
+
+class ConditionalGetMixin:
+    """ Answer GET requests with `304 Not Modified` if `If-None-Match`
+    or `If-Modified-Since` of a client match, without building the body.
+
+    Views define `get_conditional_state` returning values which change 
+    with the response content (update times and amounts of rows, 
+    versions) and optionally `get_last_modified`. Both should be cheaper 
+    than serialization. Permissions are checked before.
+    Responses are revalidated by clients unless `get_max_age` is defined.
+    """
+    def get_conditional_state(self):
+        raise NotImplementedError
+
+    def get_last_modified(self):
+        return None
+
+    def get_max_age(self):
+        return None
+
+    def get_object(self):
+        # State of detail views is usually taken from the object
+        if not hasattr(self, '_conditional_object'):
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def get(self, request, *args, **kwargs):
+        etag = make_etag(self.get_conditional_state(), request.accepted_renderer.format)
+        last_modified = self.get_last_modified()
+        timestamp = last_modified and timegm(last_modified.utctimetuple())
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        patch_conditional_headers(response, etag, timestamp, self.get_max_age())
+        return response
+
+
+def metrics_view(request):
+    """ Request metrics of this process in Prometheus text format
+    """
+    if not settings.REQUEST_METRICS['ENDPOINT']:
+        raise Http404
+    return HttpResponse(
+        registry.to_prometheus(),
+        content_type='text/plain; version=0.0.4'
+    )
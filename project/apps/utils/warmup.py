@@ -0,0 +1,50 @@
+import logging
+
+from django.apps import apps
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_views(pattern.url_patterns)
+        else:
+            # DRF and Django class based views
+            view = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+            if view is not None:
+                yield view
+
+
+def warm_up():
+    """ Do work that is otherwise done by the first requests of a worker:
+    build URL resolver lookups, model `_meta` caches and serializer
+    fields of every view (which imports lazily imported modules).
+
+    Database connections opened here are closed, so they aren't shared
+    with forked workers.
+    """
+    resolver = get_resolver()
+    # Compiles patterns and fills reverse lookups
+    resolver.reverse_dict
+
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+    serializer_classes = set()
+    for view in _iter_views(resolver.url_patterns):
+        serializer_class = getattr(view, 'serializer_class', None)
+        if serializer_class is not None:
+            serializer_classes.add(serializer_class)
+
+    for serializer_class in serializer_classes:
+        try:
+            serializer_class().fields
+        except Exception:
+            logger.warning('Failed to warm up %s', serializer_class.__name__, exc_info=True)
+
+    connections.close_all()
+    logger.info('Warmed up %s serializers', len(serializer_classes))
@@ -3,14 +3,22 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+Django 2.2 has no ASGI handler, so respondent survey reads are served by
+`apps.surveys.asgi.RespondentApplication` and other requests by the WSGI
+application in its thread pool. Run with
+``gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker``.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+# Sets up Django, so should go before project imports
+wsgi_application = get_wsgi_application()
+
+from apps.surveys.asgi import RespondentApplication  # noqa: E402
+
+application = RespondentApplication(wsgi_application, settings.ASGI_THREADS)
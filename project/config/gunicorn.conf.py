@@ -0,0 +1,57 @@
+""" Gunicorn configuration, every setting can be overridden by environment.
+
+Workers are forked from a master that has imported and warmed up
+the project (`preload_app`), so code and caches are shared copy-on-write.
+Workers are recycled after `max_requests` with jitter, so they don't
+restart all at once.
+"""
+import os
+
+
+def _cpu_count() -> int:
+    # Respects CPUs assigned to the container
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# `gthread` keeps a worker responsive while threads wait for database,
+# `gevent` requires gevent installed and psycopg2 patched (psycogreen)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Every thread may keep a database connection (`CONN_MAX_AGE`),
+# `workers * threads` of all containers should fit PgBouncer or Postgres
+workers = int(os.environ.get('GUNICORN_WORKERS', _cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+preload_app = bool(int(os.environ.get('GUNICORN_PRELOAD', 1)))
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Should be longer than nginx `keepalive_timeout` of upstream connections
+# (60s by default), so nginx closes idle connections first
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 75))
+
+# Heartbeat files in memory instead of container overlay filesystem
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm')
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+
+
+def when_ready(server):
+    # With preload the application is imported by master before workers are forked
+    if server.cfg.preload_app:
+        from apps.utils.warmup import warm_up
+        warm_up()
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from apps.utils.warmup import warm_up
+        warm_up()
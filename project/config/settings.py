@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.utils.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 
     'django.middleware.security.SecurityMiddleware',
@@ -73,9 +74,63 @@ DATABASES = {
         "PASSWORD": os.environ.get("SQL_PASSWORD", "pass"),
         "HOST": os.environ.get("SQL_HOST", "localhost"),
         "PORT": os.environ.get("SQL_PORT", "5432"),
+        # Seconds to keep a connection between requests, 0 closes it after every request
+        "CONN_MAX_AGE": int(os.environ.get("SQL_CONN_MAX_AGE", 60)),
+        # Used by backends of `apps.utils.db`
+        "CONN_HEALTH_CHECKS": bool(int(os.environ.get("SQL_CONN_HEALTH_CHECKS", 1))),
+        # Server-side cursors of `.iterator()` are only used in transactions
+        # (export, analytics, snapshots), so they work behind PgBouncer
+        # in transaction pooling mode and keep memory of export bounded
+        "DISABLE_SERVER_SIDE_CURSORS": bool(int(os.environ.get("SQL_DISABLE_SERVER_SIDE_CURSORS", 0))),
     }
 }
 
+# Processes share survey versions, drafts and revoked tokens through
+# `default` cache, production uses Redis (see `.env.prod-sample`).
+# `LocMemCache` is only fine for a single development process
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Definitions of surveys (survey, questions and answers) used by respondents.
+# Versions are kept in `ALIAS` cache, which should be shared between
+# processes (Redis) in production. `SHARED` also stores
+# definitions there in addition to the in-process LRU of `LOCAL_SIZE` items.
+SURVEY_DEFINITION_CACHE = {
+    'ALIAS': os.environ.get('SURVEY_CACHE_ALIAS', 'default'),
+    'LOCAL_SIZE': int(os.environ.get('SURVEY_CACHE_LOCAL_SIZE', 256)),
+    'SHARED': bool(int(os.environ.get('SURVEY_CACHE_SHARED', 0))),
+    'TIMEOUT': int(os.environ.get('SURVEY_CACHE_TIMEOUT', 60 * 60)),
+}
+
+# Breakdowns of submitted forms, see `apps.surveys.analytics`.
+# Loaded forms of `LOCAL_SIZE` surveys are kept in process, computed
+# results in `SURVEY_DEFINITION_CACHE['ALIAS']` cache for `TIMEOUT`.
+SURVEY_ANALYTICS = {
+    'LOCAL_SIZE': int(os.environ.get('SURVEY_ANALYTICS_LOCAL_SIZE', 8)),
+    'TIMEOUT': int(os.environ.get('SURVEY_ANALYTICS_TIMEOUT', 60 * 60)),
+    'AGE_BRACKETS': [18, 25, 35, 45, 55, 65],
+}
+
+# Seconds clients and proxies may reuse active surveys list,
+# changes of surveys can't be seen by them earlier
+ACTIVE_SURVEYS_MAX_AGE = int(os.environ.get('ACTIVE_SURVEYS_MAX_AGE', 60))
+# Same for survey and questions of a form, 0 makes clients revalidate every time
+FORM_SURVEY_MAX_AGE = int(os.environ.get('FORM_SURVEY_MAX_AGE', 5))
+# Seconds a shared cache (nginx) may send expired public responses
+# while it fetches a new one
+CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('CACHE_STALE_WHILE_REVALIDATE', 10))
+
+# Not submitted answers, see `apps.surveys.drafts`.
+# The cache should be shared by all processes.
+SURVEY_DRAFTS = {
+    'ALIAS': os.environ.get('SURVEY_DRAFTS_ALIAS', 'default'),
+    'TIMEOUT': int(os.environ.get('SURVEY_DRAFTS_TIMEOUT', 7 * 24 * 60 * 60)),
+}
+
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -109,19 +164,80 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Columnar files of closed surveys, see `apps.surveys.columnar`.
+# `ROOT` should not be served (nginx denies it under `MEDIA_ROOT`),
+# opened snapshots of `LOCAL_SIZE` surveys are kept in process.
+SURVEY_SNAPSHOTS = {
+    'ROOT': os.environ.get('SURVEY_SNAPSHOTS_ROOT', MEDIA_ROOT / 'survey_snapshots'),
+    'LOCAL_SIZE': int(os.environ.get('SURVEY_SNAPSHOTS_LOCAL_SIZE', 32)),
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # User flags are read from token, see `apps.accounts.tokens`
+        'apps.accounts.authentication.ClaimsJWTAuthentication',
+    ),
+    # `orjson` based, stdlib `json` is used if it is not installed.
+    # DRF classes can be set back here
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.utils.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.utils.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'apps.utils.pagination.PageNumberPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
 }
+
+# Users whose tokens are revoked after change of their flags.
+# The cache should be shared by all processes.
+TOKEN_DENYLIST = {
+    'ALIAS': os.environ.get('TOKEN_DENYLIST_ALIAS', 'default'),
+}
+
+# Query count and timings of requests, see `apps.utils.middleware`
+REQUEST_METRICS = {
+    'SLOW_REQUEST_MS': int(os.environ.get('SLOW_REQUEST_MS', 500)),
+    'SLOW_QUERY_MS': int(os.environ.get('SLOW_QUERY_MS', 100)),
+    'SERVER_TIMING': bool(int(os.environ.get('SERVER_TIMING', 1))),
+    # `metrics/` endpoint, off by default and denied by nginx, enable it
+    # for scrapes from internal network. Counters are kept per worker
+    # process: a scrape gets one worker's counters, labeled by its pid
+    'ENDPOINT': bool(int(os.environ.get('METRICS_ENDPOINT', 0))),
+}
+
+# Threads of `config.asgi` application for database, cache and WSGI calls.
+# Every thread may keep its own database connection, so processes keep up
+# to `workers * ASGI_THREADS` of them (see `.env.prod-sample`)
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'apps': {
+            'handlers': ['console'],
+            'level': os.environ.get('APPS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # Docs
 SPECTACULAR_SETTINGS = {
     'SCHEMA_PATH_PREFIX': '/api/v[0-9]',
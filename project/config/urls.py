@@ -3,6 +3,8 @@ from django.urls import path, include
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from apps.utils.views import metrics_view
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +16,8 @@ urlpatterns = [
         ])),
     ])),
 
+    path('metrics/', metrics_view, name='metrics'),
+
     # Docs
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     path('schema/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),